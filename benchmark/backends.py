@@ -0,0 +1,195 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from detect.backend import BACKENDS, exported_path, runtime_available
+from detect.utils import iter_frames, preprocess_detection_result
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU between (N, 4) and (M, 4) boxes in xyxy format"""
+    boxes_a = np.asarray(boxes_a, dtype=float).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=float).reshape(-1, 4)
+    tl = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    br = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def average_precision(recall, precision):
+    """Area under the precision/recall curve with all-point interpolation (VOC 2010+)"""
+    recall = np.concatenate([[0.0], recall, [1.0]])
+    precision = np.concatenate([[1.0], precision, [0.0]])
+    precision = np.flip(np.maximum.accumulate(np.flip(precision)))
+    changes = np.where(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[changes + 1] - recall[changes]) * precision[changes + 1]))
+
+
+def mean_average_precision(predictions, references, iou_threshold=0.5):
+    """mAP of per-frame predictions against per-frame references
+
+    Args:
+        predictions (list): (N, 6) detections (x1, y1, x2, y2, conf, cls) of every frame
+        references (list): (M, 6) reference boxes of every frame, the confidence column is ignored
+        iou_threshold (float, optional): IoU for a prediction to match a reference. Defaults to 0.5.
+
+    Returns:
+        float: mean over the reference classes of the average precision
+    """
+    classes = np.unique(np.concatenate([ref[:, 5] for ref in references])) if references else []
+    aps = []
+    for cls in classes:
+        scores, hits, num_refs = [], [], 0
+        for pred, ref in zip(predictions, references):
+            pred = pred[pred[:, 5] == cls]
+            ref = ref[ref[:, 5] == cls]
+            num_refs += len(ref)
+            if len(pred) == 0:
+                continue
+            pred = pred[np.argsort(-pred[:, 4])]
+            matched = np.zeros(len(ref), dtype=bool)
+            ious = box_iou(pred[:, :4], ref[:, :4]) if len(ref) else np.zeros((len(pred), 0))
+            for i in range(len(pred)):
+                # Greedy matching by confidence, each reference matched once
+                candidates = np.where(~matched & (ious[i] >= iou_threshold))[0]
+                hit = len(candidates) > 0
+                if hit:
+                    matched[candidates[np.argmax(ious[i, candidates])]] = True
+                scores.append(pred[i, 4])
+                hits.append(hit)
+        if num_refs == 0:
+            continue
+        order = np.argsort(-np.asarray(scores))
+        tp = np.cumsum(np.asarray(hits, dtype=float)[order])
+        fp = np.cumsum(1.0 - np.asarray(hits, dtype=float)[order])
+        aps.append(average_precision(tp / num_refs, tp / np.maximum(tp + fp, 1e-9)) if len(tp) else 0.0)
+    return float(np.mean(aps)) if aps else 0.0
+
+
+def run_backend(model, frames, warmup=5, **kwargs):
+    """Detect every frame one at a time
+
+    Returns:
+        (detections, latencies): per-frame (N, 6) detections and per-frame latency in ms
+    """
+    for frame in frames[:warmup]:
+        model(frame, **kwargs)
+
+    detections, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        result = model(frame, **kwargs)[0]
+        latencies.append(1000 * (time.perf_counter() - start))
+        detections.append(preprocess_detection_result(result)[1])
+    return detections, np.asarray(latencies)
+
+
+def read_clip(data_path, num_frames):
+    """First num_frames frames of a clip"""
+    frames = []
+    for frame in iter_frames(data_path):
+        frames.append(frame)
+        if len(frames) >= num_frames:
+            break
+    if not frames:
+        raise ValueError(f"No frame could be read from {data_path}")
+    return frames
+
+
+def benchmark_models(variants, frames, reference, loader, **kwargs):
+    """Latency of every model variant and mAP of its detections against the reference variant
+
+    Args:
+        variants (dict): {label: model path}, paths that do not exist are skipped
+        frames (list): frames to detect
+        reference (str): label of the variant whose detections are the ground truth
+        loader (Callable): called as loader(path, task='detect', verbose=False)
+
+    Returns:
+        dict: {label: row} with frames, mean_ms, p50_ms, p95_ms, fps, mAP50 and mAP50-95
+    """
+    outputs = {}
+    for label, path in variants.items():
+        if not os.path.exists(path):
+            print(f"Skipping {label}: {path} not found")
+            continue
+        model = loader(path, task='detect', verbose=False)
+        outputs[label] = run_backend(model, frames, **kwargs)
+
+    reference_dets = outputs[reference][0] if reference in outputs else None
+    rows = {}
+    for label, (detections, latencies) in outputs.items():
+        row = {
+            'frames': len(latencies),
+            'mean_ms': latencies.mean(),
+            'p50_ms': np.percentile(latencies, 50),
+            'p95_ms': np.percentile(latencies, 95),
+            'fps': 1000 / latencies.mean(),
+        }
+        if reference_dets is not None:
+            row['mAP50'] = mean_average_precision(detections, reference_dets, 0.5)
+            row['mAP50-95'] = np.mean([mean_average_precision(detections, reference_dets, t) for t in np.arange(0.5, 0.96, 0.05)])
+        rows[label] = row
+    return rows
+
+
+def benchmark_backends(weights, data_path, backends=BACKENDS, num_frames=200, device='cpu',
+                       conf_threshold=0.25, iou_threshold=0.5, imgsz=640, classes=None, loader=None):
+    """Compare latency and accuracy of the exported backends of a model on a recorded clip
+
+    The PyTorch detections are the reference: mAP50 / mAP50-95 measure how closely every
+    backend reproduces them (1.0 means identical detections). Backends that are not
+    exported or whose runtime is missing are skipped.
+
+    Returns:
+        pd.DataFrame: one row per backend
+    """
+    if loader is None:
+        from ultralytics import YOLO
+        loader = YOLO
+
+    variants = {}
+    for backend in ['torch'] + [b for b in backends if b != 'torch']:
+        if not runtime_available(backend):
+            print(f"Skipping {backend}: runtime not installed")
+            continue
+        variants[backend] = exported_path(weights, backend)
+
+    frames = read_clip(data_path, num_frames)
+    kwargs = dict(conf=conf_threshold, iou=iou_threshold, imgsz=imgsz, classes=classes, device=device, verbose=False)
+    rows = benchmark_models(variants, frames, 'torch', loader, **kwargs)
+    return pd.DataFrame([{'backend': label, **row} for label, row in rows.items()])
+
+
+def compare_precisions(weights, data_path, backends=('onnx', 'openvino'), num_frames=100, device='cpu',
+                       conf_threshold=0.25, iou_threshold=0.5, imgsz=640, classes=None, loader=None):
+    """Speedup and accuracy drop of the INT8 models against FP32, per backend
+
+    For every backend the FP32 export is the reference, so the INT8 row's mAP50 is the
+    fraction of the FP32 detections it reproduces and ``mAP50_drop`` = 1 - mAP50.
+
+    Returns:
+        pd.DataFrame: one row per backend and precision
+    """
+    if loader is None:
+        from ultralytics import YOLO
+        loader = YOLO
+
+    frames = read_clip(data_path, num_frames)
+    kwargs = dict(conf=conf_threshold, iou=iou_threshold, imgsz=imgsz, classes=classes, device=device, verbose=False)
+    table = []
+    for backend in backends:
+        if not runtime_available(backend):
+            print(f"Skipping {backend}: runtime not installed")
+            continue
+        variants = {precision: exported_path(weights, backend, precision) for precision in ('fp32', 'int8')}
+        rows = benchmark_models(variants, frames, 'fp32', loader, **kwargs)
+        for precision, row in rows.items():
+            row = {'backend': backend, 'precision': precision, **row}
+            if 'fp32' in rows:
+                row['speedup'] = rows['fp32']['mean_ms'] / row['mean_ms']
+                row['mAP50_drop'] = 1.0 - row['mAP50']
+            table.append(row)
+    return pd.DataFrame(table)
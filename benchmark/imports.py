@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+import pandas as pd
+
+# What a tool imports, against importing everything the package exposes
+DEFAULT_STATEMENTS = {
+    'evaluate.py': 'from benchmark.metrics import evaluate; from utils import parse_args_eval',
+    'utils: one helper': 'from utils import parse_args_eval',
+    'utils: everything': 'from utils import *',
+    'track: SORT': 'from track import SORT',
+    'track: everything': 'from track import *',
+    'core.traffic_system': 'import core.traffic_system',
+    'deferred: torch + ultralytics': 'import torch, ultralytics',
+}
+HEAVY_MODULES = ('torch', 'ultralytics', 'supervision', 'boto3', 'scipy', 'cv2', 'pandas')
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(statement, repeats=5, cwd=None):
+    """Wall time of an import statement in fresh interpreters
+
+    Args:
+        statement (str): python code to time, e.g. 'from utils import parse_args_eval'
+        repeats (int, optional): number of interpreters started. Defaults to 5.
+        cwd (str, optional): directory the interpreters run in. Defaults to the repository root.
+
+    Returns:
+        (seconds, loaded): per-run import time and the heavy modules the statement loaded
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = _PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    seconds, loaded = [], []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-c', probe], cwd=cwd, capture_output=True, text=True, check=True)
+        row = json.loads(out.stdout.strip().splitlines()[-1])
+        seconds.append(row['seconds'])
+        loaded = row['loaded']
+    return np.asarray(seconds), loaded
+
+
+def benchmark_imports(statements=None, repeats=5):
+    """Import time of the entry points of the CLI tools and packages
+
+    Returns:
+        pd.DataFrame: one row per statement with the median / min time in ms and the heavy modules loaded
+    """
+    statements = DEFAULT_STATEMENTS if statements is None else statements
+    rows = []
+    for label, statement in statements.items():
+        seconds, loaded = time_import(statement, repeats=repeats)
+        rows.append({
+            'import': label,
+            'median_ms': 1000 * np.median(seconds),
+            'min_ms': 1000 * seconds.min(),
+            'heavy_modules': ','.join(loaded),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,65 @@
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from utils.storage import LocalStorage, MemoryStorage, get_storage
+
+
+def make_backend(name, threads=8, fsync_batch=32, root=None):
+    """Storage backend to benchmark: 'memory', 'local' (in root, a temporary directory by default) or 'minio'"""
+    if name == 'memory':
+        return MemoryStorage(upload_threads=threads)
+    if name == 'local':
+        return LocalStorage(root or tempfile.mkdtemp(prefix="storage_bench_"), fsync_batch=fsync_batch, upload_threads=threads)
+    if name == 'minio':
+        return get_storage('minio')
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+def time_uploads(storage, objects=200, size_kb=256, prefix="benchmark/", seed=0):
+    """Upload objects of size_kb random bytes concurrently and flush
+
+    Returns:
+        dict: wall 'seconds', 'mb_per_s', 'objects_per_s' and per-object latency 'mean_ms' / 'p95_ms'
+    """
+    rng = np.random.default_rng(seed)
+    # Random bytes do not compress, the same as JPEG and MP4 evidence
+    payload = rng.integers(0, 256, size_kb * 1024, dtype=np.uint8).tobytes()
+    uploads = [{'bucket': 'proofs', 'key': f"{prefix}{i:06d}.bin", 'body': payload,
+                'content_type': 'application/octet-stream'} for i in range(objects)]
+    before = storage.upload_meter.stats()
+
+    start = time.perf_counter()
+    results = storage.upload_many(uploads)
+    storage.flush()
+    seconds = time.perf_counter() - start
+
+    stats = storage.upload_meter.stats()
+    return {
+        'objects': objects,
+        'failed': objects - sum(results),
+        'seconds': seconds,
+        'mb_per_s': objects * len(payload) / 1024 / 1024 / seconds,
+        'objects_per_s': objects / seconds,
+        'mean_ms': stats['mean_ms'] if not before['uploads'] else np.nan,
+        'p95_ms': stats['p95_ms'] if not before['uploads'] else np.nan,
+    }
+
+
+def benchmark_storage(backends=('memory', 'local'), objects=200, size_kb=256, threads=8, fsync_batches=(1, 32), root=None):
+    """Throughput of the storage backends on the same upload workload
+
+    The local backend runs once per fsync batch size, to show what batching the fsyncs saves.
+
+    Returns:
+        pd.DataFrame: one row per backend configuration
+    """
+    rows = []
+    for name in backends:
+        for fsync_batch in (fsync_batches if name == 'local' else (None,)):
+            storage = make_backend(name, threads=threads, fsync_batch=fsync_batch, root=root and os.path.join(root, f"fsync_{fsync_batch}"))
+            row = {'backend': name, 'fsync_batch': fsync_batch, 'size_kb': size_kb}
+            row.update(time_uploads(storage, objects=objects, size_kb=size_kb))
+            rows.append(row)
+    return pd.DataFrame(rows)
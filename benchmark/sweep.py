@@ -0,0 +1,124 @@
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from benchmark.metrics import evaluate_predictions, DEFAULT_METRICS, GT_COLS, PRED_COLS
+
+# Used when no grid file is given
+DEFAULT_GRID = {
+    'sort': {
+        'cost_function': ['iou', 'diou', 'ciou'],
+        'iou_threshold': [0.3, 0.5],
+        'max_age': [30, 60],
+        'min_hits': [3, 5],
+    },
+    'bytetrack': {
+        'cost_function': ['iou', 'diou', 'ciou'],
+        'high_conf_iou_threshold': [0.3, 0.5],
+        'max_age': [30, 60],
+        'min_hits': [3, 5],
+    },
+}
+
+# Metrics where lower is better, used for ranking
+LOWER_IS_BETTER = {'motp', 'mostly_lost', 'num_false_positives', 'num_misses', 'num_switches', 'num_fragmentations', 'idfp', 'idfn'}
+
+
+def expand_grid(grid, base_config):
+    """Expand a parameter grid into one full tracker configuration per combination
+
+    Args:
+        grid (dict): {tracker_name: {param: [values, ...]}}
+        base_config (dict): the 'tracking' section of config.yaml, used for parameters not in the grid
+
+    Returns:
+        list: (tracker_name, params) for every combination
+    """
+    runs = []
+    for tracker_name, params in grid.items():
+        keys = list(params.keys())
+        values = [v if isinstance(v, (list, tuple)) else [v] for v in params.values()]
+        for combination in itertools.product(*values):
+            cfg = dict(base_config.get(tracker_name, {}))
+            cfg.update(dict(zip(keys, combination)))
+            runs.append((tracker_name, cfg))
+    return runs
+
+
+def track_cached_detections(cache_path, tracker_name, params):
+    """Run one tracker configuration over cached detections
+
+    Returns:
+        pd.DataFrame: tracker output with the prediction csv columns
+    """
+    from detect.cache import DetectionCache
+    from track.builder import build_tracker
+    from track.kalman_box_tracker import KalmanBoxTracker
+
+    KalmanBoxTracker.count = 0
+    tracker = build_tracker(tracker_name, params)
+    rows = []
+    for frame_num, det in enumerate(DetectionCache(cache_path).iter_detections(params.get('conf_threshold')), start=1):
+        for obj in tracker.update(dets=det):
+            x1, y1, x2, y2 = obj.get_state()[0]
+            rows.append((frame_num, x1, y1, x2, y2, obj.id, 0))
+    return pd.DataFrame(rows, columns=PRED_COLS)
+
+
+def run_trial(cache_path, gt_path, tracker_name, params, min_vis=0, iou_threshold=0.5, metrics=DEFAULT_METRICS):
+    """Track and score one configuration. Runs inside a worker process.
+
+    Returns:
+        dict: tracker name, parameters and metric values
+    """
+    pred_data = track_cached_detections(cache_path, tracker_name, params)
+    gt_data = pd.read_csv(gt_path, names=GT_COLS)
+    summary = evaluate_predictions(pred_data, gt_data, min_vis=min_vis, iou_threshold=iou_threshold, metrics=metrics)
+
+    result = {'tracker': tracker_name}
+    result.update({key: value for key, value in params.items() if not isinstance(value, (list, dict))})
+    result.update(summary.iloc[0].to_dict())
+    return result
+
+
+def run_sweep(cache_path, gt_path, grid, base_config, workers=None, rank_by='idf1',
+              min_vis=0, iou_threshold=0.5, metrics=DEFAULT_METRICS, verbose=True):
+    """Evaluate every configuration of the grid in a process pool and rank the results
+
+    Args:
+        cache_path (str): detection cache directory (see detect.cache)
+        gt_path (str): MOT ground truth file
+        grid (dict): {tracker_name: {param: [values, ...]}}
+        base_config (dict): the 'tracking' section of config.yaml
+        workers (int, optional): number of processes. Defaults to the number of CPUs.
+        rank_by (str, optional): metric used to sort the table. Defaults to 'idf1'.
+
+    Returns:
+        pd.DataFrame: one row per configuration, best first
+    """
+    if rank_by not in metrics:
+        metrics = list(metrics) + [rank_by]
+
+    runs = expand_grid(grid, base_config)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_trial, cache_path, gt_path, tracker_name, params, min_vis, iou_threshold, metrics): (tracker_name, params)
+            for tracker_name, params in runs
+        }
+        for i, future in enumerate(as_completed(futures), start=1):
+            tracker_name, params = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"\nTrial {tracker_name} {params} failed: {e}")
+            if verbose:
+                print(f"\r[Sweep] {i}/{len(runs)} trials done", end="", flush=True)
+    if verbose:
+        print()
+
+    table = pd.DataFrame(results)
+    if len(table) > 0:
+        table = table.sort_values(rank_by, ascending=rank_by in LOWER_IS_BETTER, kind='stable').reset_index(drop=True)
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
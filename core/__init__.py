@@ -0,0 +1,27 @@
+"""
+Core package of the Traffic Violation Detection System.
+
+Names are imported from their submodule on first access: ``from core import Vehicle``
+does not import torch and ultralytics through core.traffic_system.
+"""
+
+from utils.lazy import lazy_attributes
+
+_ATTRIBUTES = {
+    'TrafficSystem': 'core.traffic_system',
+    'Vehicle': 'core.vehicle',
+    'Violation': 'core.violation',
+    'RedLightViolation': 'core.violation',
+    'ViolationManager': 'core.violation_manager',
+    'LicensePlateRecognizer': 'core.license_plate_recognizer',
+    'LightSignalDetector': 'core.light_signal_detector',
+    'LightSignalFSM': 'core.light_signal_FSM',
+    'Pipeline': 'core.pipeline',
+    'Stage': 'core.pipeline',
+    'ModelLoader': 'core.model_loader',
+    'LazyModel': 'core.model_loader',
+}
+
+__getattr__, __dir__ = lazy_attributes(__name__, _ATTRIBUTES)
+
+__all__ = list(_ATTRIBUTES)
@@ -15,7 +15,7 @@ class LicensePlateRecognizer:
         Detect + OCR license plate for a single vehicle
         Returns candidate license plate string (NOT final)
         """
-        if frame is None:
+        if frame is None or self.license_model is None:
             return None
 
         x1, y1, x2, y2 = map(int, state)
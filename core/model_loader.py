@@ -0,0 +1,150 @@
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LazyModel:
+    """Handle to a model that is loaded on a background thread or on first use.
+
+    Attribute access and calls are forwarded to the loaded model, so the handle can be
+    given to code that expects the model itself (e.g. LicensePlateRecognizer); the first
+    use blocks until loading has finished.
+    """
+    def __init__(self, name, factory, warmup=None):
+        """
+        Args:
+            name (str): component name used in the startup report
+            factory (Callable): builds the model, called once without arguments
+            warmup (Callable, optional): called with the loaded model to run a first dummy inference. Defaults to None.
+        """
+        self.name = name
+        self.factory = factory
+        self.warmup = warmup
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._model = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    @property
+    def loaded(self):
+        return self._loaded.is_set()
+
+    def load(self):
+        """Load (and warm up) the model once, concurrent callers wait for the first one"""
+        with self._lock:
+            if self._loaded.is_set():
+                return
+            try:
+                start = time.perf_counter()
+                self._model = self.factory()
+                self.load_seconds = time.perf_counter() - start
+            except Exception as e:
+                self._error = e
+                self._loaded.set()
+                return
+            if self.warmup is not None:
+                # A failed warm-up only costs the first real call its initialisation
+                try:
+                    start = time.perf_counter()
+                    self.warmup(self._model)
+                    self.warmup_seconds = time.perf_counter() - start
+                except Exception as e:
+                    print(f"Warm-up of {self.name} failed: {e}")
+            self._loaded.set()
+
+    def get(self):
+        """The loaded model, loading it in the calling thread if no background load was started"""
+        if not self._loaded.is_set():
+            self.load()
+        if self._error is not None:
+            raise RuntimeError(f"Loading {self.name} failed: {self._error}") from self._error
+        return self._model
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self.get()(*args, **kwargs)
+
+
+class ModelLoader:
+    """Load the components of the system concurrently on a thread pool.
+
+    Model loading is mostly file I/O and native runtime initialisation (torch,
+    onnxruntime), both of which release the GIL, so threads overlap well.
+
+    Example:
+        loader = ModelLoader(workers=3)
+        vehicle_model = loader.add('vehicle', lambda: YOLO('models/detect_gtvn.pt'))
+        ocr = loader.add('ocr', make_ocr, background=False)  # loaded on first use
+        vehicle_model.get()  # waits for the background load
+        print(loader.format_report())
+    """
+    def __init__(self, workers=3):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="model-loader")
+        self.components = {}
+
+    def add(self, name, factory, warmup=None, background=True):
+        """Register a component
+
+        Args:
+            name (str): component name
+            factory (Callable): builds the component
+            warmup (Callable, optional): dummy inference run after loading. Defaults to None.
+            background (bool, optional): start loading now on the pool, otherwise load on first use. Defaults to True.
+
+        Returns:
+            LazyModel: handle to the component
+        """
+        handle = LazyModel(name, factory, warmup=warmup)
+        self.components[name] = handle
+        if background:
+            self.executor.submit(handle.load)
+        return handle
+
+    def wait(self, names=None):
+        """Block until the given components (all by default) are loaded"""
+        for name in names if names is not None else list(self.components):
+            self.components[name].get()
+
+    def report(self):
+        """{name: {'loaded', 'load_s', 'warmup_s'}} of every component"""
+        return {
+            name: {
+                'loaded': handle.loaded,
+                'load_s': handle.load_seconds,
+                'warmup_s': handle.warmup_seconds,
+            }
+            for name, handle in self.components.items()
+        }
+
+    def format_report(self):
+        """One line per component, e.g. 'vehicle: 1.20s (+0.31s warm-up)'"""
+        lines = []
+        for name, row in self.report().items():
+            if row['load_s'] is None:
+                lines.append(f"{name}: {'failed' if row['loaded'] else 'not loaded yet'}")
+                continue
+            line = f"{name}: {row['load_s']:.2f}s"
+            if row['warmup_s'] is not None:
+                line += f" (+{row['warmup_s']:.2f}s warm-up)"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait)
+
+
+def warmup_detector(model, imgsz=640, device='cpu'):
+    """One detection on a blank image, so the first real frame does not pay for the runtime initialisation"""
+    model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, device=device, verbose=False)
+
+
+def warmup_ocr(model):
+    """One OCR call on a blank plate-sized crop"""
+    model.run(np.zeros((64, 128, 3), dtype=np.uint8))
@@ -0,0 +1,228 @@
+"""
+Pipelined stage executor.
+
+Each stage runs in its own worker thread(s) and stages are connected by bounded
+queues, so stages that release the GIL (decoding, inference, OpenCV drawing)
+overlap and the end-to-end throughput is set by the slowest stage.
+"""
+
+import heapq
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+_END = object()
+
+
+class Stage:
+    """One step of a Pipeline.
+
+    A stateful stage (e.g. tracking) must keep ``workers=1``. A stateless stage can run
+    several workers; its outputs are put back in frame order before the next stage.
+    """
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1):
+        """
+        Args:
+            name: Stage name, used in the stats
+            fn: Called with the output of the previous stage, returns the input of the next one
+            workers: Number of worker threads. Defaults to 1.
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+
+        self.processed = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+        self._pending = []
+        self._next_seq = 0
+        self._workers_done = 0
+
+
+class Pipeline:
+    """Run a source iterable through a chain of stages.
+
+    Iterating the pipeline yields the output of the last stage for every source item,
+    in source order. The source is consumed on its own thread, so a generator doing
+    decoding/inference runs concurrently with the stages. Exceptions raised by the
+    source or a stage stop the pipeline and are re-raised in the consuming thread.
+
+    Example:
+        pipeline = Pipeline(dets, [Stage("track", track_fn), Stage("render", render_fn, workers=2)])
+        for frame in pipeline:
+            cv2.imshow(window_name, frame)
+    """
+    def __init__(self, source: Iterable, stages: List[Stage], queue_size: int = 4):
+        """
+        Args:
+            source: Input items, e.g. the (frame, result) generator of the detector
+            stages: Stages applied in order
+            queue_size: Capacity of every inter-stage queue. Defaults to 4.
+        """
+        self.source = source
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=max(1, int(queue_size))) for _ in range(len(stages) + 1)]
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._threads: List[threading.Thread] = []
+        self._started = False
+
+        self.source_processed = 0
+        self.source_busy_time = 0.0
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        # Poll so close() can interrupt a worker blocked on a full queue
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, error: BaseException):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _run_source(self):
+        try:
+            iterator = iter(self.source)
+            seq = 0
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self.source_busy_time += time.perf_counter() - start
+                self.source_processed += 1
+                if not self._put(self.queues[0], (seq, item)):
+                    return
+                seq += 1
+        except BaseException as e:
+            self._fail(e)
+            return
+        self._put(self.queues[0], _END)
+
+    def _emit(self, stage: Stage, out_queue: queue.Queue, seq: int, item) -> bool:
+        if stage.workers == 1:
+            return self._put(out_queue, (seq, item))
+
+        # Reorder: release results strictly by sequence number
+        with stage._lock:
+            heapq.heappush(stage._pending, (seq, item))
+            while stage._pending and stage._pending[0][0] == stage._next_seq:
+                ready_seq, ready = heapq.heappop(stage._pending)
+                if not self._put(out_queue, (ready_seq, ready)):
+                    return False
+                stage._next_seq += 1
+        return True
+
+    def _run_stage(self, stage: Stage, in_queue: queue.Queue, out_queue: queue.Queue):
+        while True:
+            entry = self._get(in_queue)
+            if entry is _END:
+                # Hand the end marker on to the sibling workers, the last one forwards it
+                with stage._lock:
+                    stage._workers_done += 1
+                    last = stage._workers_done == stage.workers
+                if last:
+                    self._put(out_queue, _END)
+                else:
+                    self._put(in_queue, _END)
+                return
+
+            seq, item = entry
+            start = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except BaseException as e:
+                self._fail(e)
+                return
+            with stage._lock:
+                stage.busy_time += time.perf_counter() - start
+                stage.processed += 1
+            if not self._emit(stage, out_queue, seq, result):
+                return
+
+    def start(self):
+        """Start the source and stage threads. Called by the first iteration."""
+        if self._started:
+            return
+        self._started = True
+        self._threads.append(threading.Thread(target=self._run_source, name="pipeline-source", daemon=True))
+        for i, stage in enumerate(self.stages):
+            for w in range(stage.workers):
+                self._threads.append(threading.Thread(
+                    target=self._run_stage, args=(stage, self.queues[i], self.queues[i + 1]),
+                    name=f"pipeline-{stage.name}-{w}", daemon=True
+                ))
+        for thread in self._threads:
+            thread.start()
+
+    def __iter__(self):
+        self.start()
+        try:
+            while True:
+                entry = self._get(self.queues[-1])
+                if entry is _END:
+                    break
+                yield entry[1]
+        finally:
+            self.close()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Stop every worker, dropping the items still in flight"""
+        self._stop.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+
+    def queue_depths(self) -> dict:
+        """Number of items waiting in front of every stage ('output' waits for the consumer)"""
+        names = [stage.name for stage in self.stages] + ['output']
+        return {name: q.qsize() for name, q in zip(names, self.queues)}
+
+    def stats(self) -> dict:
+        """Per-stage queue depth, processed items and mean processing time in milliseconds
+
+        'source' is the time spent producing items (decoding and detection for the detector
+        generator), its queue is the one in front of the first stage.
+        """
+        depths = self.queue_depths()
+        stats = {
+            'source': {
+                'queue': self.queues[0].qsize(),
+                'processed': self.source_processed,
+                'ms_per_item': 1000 * self.source_busy_time / self.source_processed if self.source_processed else 0.0,
+            }
+        }
+        stats.update({
+            stage.name: {
+                'queue': depths[stage.name],
+                'processed': stage.processed,
+                'ms_per_item': 1000 * stage.busy_time / stage.processed if stage.processed else 0.0,
+            }
+            for stage in self.stages
+        })
+        return stats
+
+    def format_stats(self) -> str:
+        """One line summary, e.g. 'source 30.2ms | track q=2 11.3ms | render q=0 4.1ms | output q=1'"""
+        stats = self.stats()
+        parts = [f"source {stats.pop('source')['ms_per_item']:.1f}ms"]
+        parts += [f"{name} q={s['queue']} {s['ms_per_item']:.1f}ms" for name, s in stats.items()]
+        parts.append(f"output q={self.queues[-1].qsize()}")
+        return " | ".join(parts)
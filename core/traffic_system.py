@@ -1,30 +1,47 @@
-import torch
 import numpy as np
 import supervision as sv
-from collections import deque
-import queue
 import threading
-from ultralytics import YOLO
-from fast_plate_ocr import LicensePlateRecognizer as FastRecognizer
+import itertools
+from functools import partial
 import cv2
 
 from track.sort import SORT
 from track.bytetrack import ByteTrack
-from detect.detect import inference_video
+from detect.detect import inference_video, inference_video_strided, inference_video_batched
+from detect.stride import AdaptiveDetectionStride
+from detect.roi import RegionOfInterest, ROIModel
+from detect.motion import MotionGate, MotionGatedModel
+from detect.backend import ModelRegistry
+from core.model_loader import ModelLoader, warmup_detector, warmup_ocr
 from core.vehicle import Vehicle
 from core.violation import RedLightViolation
 from core.violation_manager import ViolationManager
 from core.license_plate_recognizer import LicensePlateRecognizer
 from core.light_signal_detector import LightSignalDetector
 from core.light_signal_FSM import LightSignalFSM
+from core.pipeline import Pipeline, Stage
 from utils import (
     load_config,
     violation_save_worker,
     load_zones,
     render_frame,
-    MinioClient
+    track_labels,
+    configure_storage,
+    get_storage,
+    ViolationQueue,
+    share_frame,
+    copy_frame,
+    frame_copy_meter,
+    ProofFrameBuffer,
+    BboxTimeline
 ) 
 from detect.utils import preprocess_detection_result
+from utils.lazy import LazyImport
+
+# Imported when the first TrafficSystem is built, not when this module is imported
+torch = LazyImport('torch')
+YOLO = LazyImport('ultralytics', 'YOLO')
+FastRecognizer = LazyImport('fast_plate_ocr', 'LicensePlateRecognizer')
 
 class TrafficSystem:
     def __init__(self, config_path="config.yaml"):
@@ -32,25 +49,51 @@ class TrafficSystem:
         self.config = load_config(config_path)
         
         # Load models
-        print("Loading models...")
         self.device = self.config.get('system', {}).get('device', 'cuda') if torch.cuda.is_available() else 'cpu'
         
         self.vehicle_model_path = self.config.get('system', {}).get('vehicle_model', "models/detect_gtvn.pt")
         self.license_model_path = self.config.get('system', {}).get('license_model', "models/lp_yolo11s.pt")
         # self.character_model_path = self.config.get('system', {}).get('character_model', "models/yolo11s.pt") # Unused?
         
-        self.vehicle_model = YOLO(self.vehicle_model_path, task='detect', verbose=False)
-        self.license_model = YOLO(self.license_model_path, task='detect', verbose=False)
-        self.character_model = FastRecognizer('cct-xs-v1-global-model', providers=['CUDAExecutionProvider', 'CPUExecutionProvider'])
+        # ONNX / OpenVINO exports are preferred on CPU when present (see scripts/export_models.py)
+        self.models = ModelRegistry.from_config(self.config, device=self.device, loader=YOLO)
+
+        # Models and the storage backend load in parallel on background threads, the handles
+        # block on first use. The plate and OCR models are only needed on the first
+        # violation: they are either preloaded and warmed up, or loaded on that violation.
+        startup_cfg = self.config.get('startup', {})
+        warmup = startup_cfg.get('warmup', True)
+        preload = startup_cfg.get('preload_plate_models', True)
+        imgsz = self.config.get('detections', {}).get('imgsz', 640)
+        self.loader = ModelLoader(workers=startup_cfg.get('workers', 3))
+        configure_storage(self.config.get('storage', {}))
+        self.loader.add('storage', get_storage)
+        self.vehicle_model = self.loader.add(
+            'vehicle', lambda: self.models.get('vehicle'),
+            warmup=partial(warmup_detector, imgsz=imgsz, device=self.device) if warmup else None
+        )
+        self.license_model = self.loader.add(
+            'license_plate', lambda: self.models.get('license_plate'),
+            warmup=partial(warmup_detector, imgsz=imgsz, device=self.device) if warmup else None,
+            background=preload
+        )
+        self.character_model = self.loader.add(
+            'ocr', lambda: FastRecognizer('cct-xs-v1-global-model', providers=['CUDAExecutionProvider', 'CPUExecutionProvider']),
+            warmup=warmup_ocr if warmup else None,
+            background=preload
+        )
         
         self.tracker_instance = None
         self.violation_manager = None
         self.polygon_zone = None
-        self.violation_queue = queue.Queue()
+        # Bounded by count and bytes, stats() exposes the policy counters
+        self.violation_queue = ViolationQueue.from_config(self.config.get('violation', {}).get('queue'))
         self.worker_thread = None
         
         self.running = False
         self.generator = None
+        self.pipeline = None
+        self.motion_gate = None
         
         # Annotators
         self.box_annotator = sv.BoxAnnotator(thickness=2)
@@ -68,9 +111,10 @@ class TrafficSystem:
 
     def start_worker(self):
         if self.worker_thread is None or not self.worker_thread.is_alive():
-            # Start Minio client
-            _ = MinioClient()
-            self.worker_thread = threading.Thread(target=violation_save_worker, args=(self.violation_queue,), daemon=True)
+            # The MinIO client is created by the loader, the worker waits for it on first use
+            self.worker_thread = threading.Thread(target=violation_save_worker,
+                                                  args=(self.violation_queue, self.config.get('violation', {}).get('saver')),
+                                                  daemon=True)
             self.worker_thread.start()
 
     def update_config(self, new_config):
@@ -90,7 +134,9 @@ class TrafficSystem:
                 max_age=cfg['max_age'], 
                 min_hits=cfg['min_hits'], 
                 iou_threshold=cfg['iou_threshold'], 
-                tracker_class=Vehicle
+                tracker_class=Vehicle,
+                gating=cfg.get('gating', False),
+                assignment_workers=cfg.get('assignment_workers', 0)
             )
             conf_threshold = cfg['conf_threshold']
         elif self.tracker_name == 'bytetrack':
@@ -103,7 +149,9 @@ class TrafficSystem:
                 low_conf_threshold=cfg['low_conf_threshold'],
                 high_conf_iou_threshold=cfg['high_conf_iou_threshold'],
                 low_conf_iou_threshold=cfg['low_conf_iou_threshold'],
-                tracker_class=Vehicle
+                tracker_class=Vehicle,
+                gating=cfg.get('gating', False),
+                assignment_workers=cfg.get('assignment_workers', 0)
             )
             conf_threshold = cfg['conf_threshold']
         
@@ -133,7 +181,7 @@ class TrafficSystem:
             if obj.bboxes_buffer is not None:
                 obj.bboxes_buffer.append((frame_counter, obj.get_state()[0]))
             else:
-                obj.bboxes_buffer = deque(maxlen=buffer_maxlen)
+                obj.bboxes_buffer = BboxTimeline(maxlen=buffer_maxlen)
                 obj.bboxes_buffer.append((frame_counter, obj.get_state()[0]))
 
         visualized_tracked_objs = [obj for obj in tracked_objs if obj.is_being_tracked]
@@ -196,86 +244,163 @@ class TrafficSystem:
         conf_threshold = self.init_tracker()
         
         # Inference generator
-        dets = inference_video(
-            model=self.vehicle_model,
-            data_path=source_path,
-            output_path=None,
-            device=self.device,
-            stream=True,
-            conf_threshold=conf_threshold,
-            classes=self.config['detections']['classes'],
-            imgsz=self.config['detections']['imgsz'],
-            iou_threshold=self.config['detections']['iou_threshold'],
-            stream_buffer=False,
-            verbose=True
-        )
+        stride_cfg = self.config['detections'].get('stride', {})
+        batch_cfg = self.config['detections'].get('batch', {})
+        roi_cfg = self.config['detections'].get('roi', {})
+        roi = None
+        # Blocks until the background load has finished
+        vehicle_model = self.vehicle_model.get()
+        print(f"Model backends: {self.models.backends}")
+        print(f"Startup times:\n{self.loader.format_report()}")
+        detector = vehicle_model
+        if roi_cfg.get('enabled', False):
+            # Only the polygon zone (plus a margin) is sent to the detector, set once the zone is known
+            roi = RegionOfInterest(margin=roi_cfg.get('margin', 32))
+            detector = ROIModel(vehicle_model, roi, imgsz=roi_cfg.get('imgsz'))
+        motion_cfg = self.config['detections'].get('motion_gate', {})
+        motion_gate = None
+        if motion_cfg.get('enabled', False):
+            # Skip the detector on static scenes without any live track
+            motion_gate = MotionGate(
+                width=motion_cfg.get('width', 320),
+                pixel_threshold=motion_cfg.get('pixel_threshold', 25),
+                min_motion_ratio=motion_cfg.get('min_motion_ratio', 0.002),
+                hold_frames=motion_cfg.get('hold_frames', 5)
+            )
+            detector = MotionGatedModel(detector, motion_gate)
+        # Gate decisions are exposed through self.motion_gate.stats()
+        self.motion_gate = motion_gate
+        stride = None
+        if stride_cfg.get('enabled', False):
+            # Run the detector every k frames, Kalman-only tracking in between
+            stride = AdaptiveDetectionStride(
+                min_stride=stride_cfg.get('min_stride', 1),
+                max_stride=stride_cfg.get('max_stride', 3),
+                max_displacement=stride_cfg.get('max_displacement', 20),
+                line_margin=stride_cfg.get('line_margin', 80)
+            )
+            dets = inference_video_strided(
+                model=detector,
+                data_path=source_path,
+                stride=stride,
+                device=self.device,
+                conf_threshold=conf_threshold,
+                classes=self.config['detections']['classes'],
+                imgsz=self.config['detections']['imgsz'],
+                iou_threshold=self.config['detections']['iou_threshold'],
+                verbose=False
+            )
+        elif batch_cfg.get('enabled', False) or roi is not None or motion_gate is not None:
+            # Decode ahead on a background thread and detect groups of frames in one call
+            # (ROI crops and the motion gate need the decoded frames, without batching they are detected one by one)
+            dets = inference_video_batched(
+                model=detector,
+                data_path=source_path,
+                batch_size=batch_cfg.get('size', 8) if batch_cfg.get('enabled', False) else 1,
+                max_latency=batch_cfg.get('max_latency_ms', 50) / 1000,
+                queue_size=batch_cfg.get('queue_size', 32),
+                device=self.device,
+                conf_threshold=conf_threshold,
+                classes=self.config['detections']['classes'],
+                imgsz=self.config['detections']['imgsz'],
+                iou_threshold=self.config['detections']['iou_threshold'],
+                verbose=False
+            )
+        else:
+            dets = inference_video(
+                model=vehicle_model,
+                data_path=source_path,
+                output_path=None,
+                device=self.device,
+                stream=True,
+                conf_threshold=conf_threshold,
+                classes=self.config['detections']['classes'],
+                imgsz=self.config['detections']['imgsz'],
+                iou_threshold=self.config['detections']['iou_threshold'],
+                stream_buffer=False,
+                verbose=True
+            )
+            dets = ((result.orig_img, result) for result in dets)
 
-        first_run = True
-        FPS = 30
-        frame_buffer = None
-        
-        for result in dets:
-            if not self.running:
-                break
-                
-            if first_run:
-                self.first_frame = result.orig_img
-                FPS = self.config['violation']['fps'] if self.config['violation']['fps'] is not None else 30
-                
-                # Load zones 
-                zones = load_zones()
-                polygon_points = zones.get("polygon", [])
-                lines_config = zones.get("lines_config", {}) # Expecting a dict of categories now
-                # Backward compatibility or fallback if 'lines' exists as a flat list
-                if "lines" in zones and not lines_config:
-                     # Default to violation_lines
-                     lines_config["violation_lines"] = zones["lines"]
-                
-                # Default polygon if none
-                if len(polygon_points) < 3:
-                     # Fallback to full frame or center?
-                     # Let's just default to a small box if missing
-                     h, w = self.first_frame.shape[:2]
-                     polygon_points = [[w//4, h//4], [w*3//4, h//4], [w*3//4, h*3//4], [w//4, h*3//4]]
-
-                polygon_points = np.array(polygon_points, dtype=int)
-                self.polygon_zone = sv.PolygonZone(polygon_points, triggering_anchors=[sv.Position.CENTER])
-                
-                # Frame buffer
-                buffer_duration = self.config['violation']['video_proof_duration']
-                buffer_maxlen = int(FPS * buffer_duration)
-                frame_buffer = deque(maxlen=buffer_maxlen)
-                
-                # Initialize Violation Manager
-                violations = [RedLightViolation(polygon_points=polygon_points, lines=lines_config, frame=self.first_frame, window_name="Traffic Violation")]
-                licensePlate_recognizer = LicensePlateRecognizer(license_model=self.license_model, character_model=self.character_model)
-                self.violation_manager = ViolationManager(violations=violations, recognizer=licensePlate_recognizer)
-                
-                # Initialize Light Signal Detector from saved zones
-                light_zones_config = zones.get("light_zones", {})
-                h, w = self.first_frame.shape[:2]
-                light_detector = self._init_light_detector(h, w, light_zones_config)
-                light_fsm = None
-                if light_detector is not None:
-                    initial_light_list = light_detector.detect_light_signals(self.first_frame)
-                    processed_initial_lights = []
-                    for light in initial_light_list:
-                        if light is None:
-                            processed_initial_lights.append(light)
-                        else:
-                            processed_initial_lights.append(light[0])  # Extract only the state
-                    light_fsm = LightSignalFSM(initial_states=processed_initial_lights)
-                
-                frame_counter = 0
-                first_run = False
-            
-            # Preprocess
-            frame, det = preprocess_detection_result(result)
+        dets = iter(dets)
+        first = next(dets, None)
+        if first is None:
+            return
+
+        self.first_frame = first[0]
+        FPS = self.config['violation']['fps'] if self.config['violation']['fps'] is not None else 30
+
+        # Load zones 
+        zones = load_zones()
+        polygon_points = zones.get("polygon", [])
+        lines_config = zones.get("lines_config", {}) # Expecting a dict of categories now
+        # Backward compatibility or fallback if 'lines' exists as a flat list
+        if "lines" in zones and not lines_config:
+             # Default to violation_lines
+             lines_config["violation_lines"] = zones["lines"]
+
+        # Default polygon if none
+        if len(polygon_points) < 3:
+             # Fallback to full frame or center?
+             # Let's just default to a small box if missing
+             h, w = self.first_frame.shape[:2]
+             polygon_points = [[w//4, h//4], [w*3//4, h//4], [w*3//4, h*3//4], [w//4, h*3//4]]
+
+        polygon_points = np.array(polygon_points, dtype=int)
+        self.polygon_zone = sv.PolygonZone(polygon_points, triggering_anchors=[sv.Position.CENTER])
+
+        # Frame buffer
+        buffer_duration = self.config['violation']['video_proof_duration']
+        buffer_maxlen = int(FPS * buffer_duration)
+        frame_buffer = ProofFrameBuffer.from_config(self.config, maxlen=buffer_maxlen)
+
+        # Initialize Violation Manager
+        violations = [RedLightViolation(polygon_points=polygon_points, lines=lines_config, frame=self.first_frame, window_name="Traffic Violation")]
+        licensePlate_recognizer = LicensePlateRecognizer(license_model=self.license_model, character_model=self.character_model)
+        self.violation_manager = ViolationManager(violations=violations, recognizer=licensePlate_recognizer)
+        if stride is not None:
+            stride.set_lines(violations[0].line_segments())
+        if roi is not None:
+            roi.set_polygon(polygon_points)
+        if motion_gate is not None:
+            motion_gate.set_polygon(polygon_points)
+
+        # Initialize Light Signal Detector from saved zones
+        light_zones_config = zones.get("light_zones", {})
+        h, w = self.first_frame.shape[:2]
+        light_detector = self._init_light_detector(h, w, light_zones_config)
+        light_fsm = None
+        if light_detector is not None:
+            initial_light_list = light_detector.detect_light_signals(self.first_frame)
+            processed_initial_lights = []
+            for light in initial_light_list:
+                if light is None:
+                    processed_initial_lights.append(light)
+                else:
+                    processed_initial_lights.append(light[0])  # Extract only the state
+            light_fsm = LightSignalFSM(initial_states=processed_initial_lights)
+
+        frame_counter = 0
+
+        def track_step(item):
+            """Tracking, zone filtering, light states and violation checks of one frame"""
+            nonlocal frame_counter
+            frame, result = item
+            frame = share_frame(frame)
             frame_counter += 1
-            
-            # Tracking
-            tracked_objs = self.tracker_instance.update(dets=det)
+            frame_copy_meter.count_frame()
+
+            # Tracking (Kalman prediction only on frames skipped by the detector)
+            if result is not None:
+                frame, det = preprocess_detection_result(result)
+                tracked_objs = self.tracker_instance.update(dets=det)
+            else:
+                tracked_objs = self.tracker_instance.predict()
             all_tracked_objs = self.tracker_instance.get_tracked_objects()
+            if stride is not None:
+                stride.update(tracked_objs)
+            if motion_gate is not None:
+                motion_gate.update(all_tracked_objs)
             
             states = [obj.get_state()[0] for obj in tracked_objs]
             ids = [obj.id for obj in tracked_objs] 
@@ -296,7 +421,7 @@ class TrafficSystem:
             visualized_tracked_objs, visualized_sv_detections = self.filter_vehicles_in_zone(tracked_objs, all_tracked_objs, sv_detections, frame_counter, buffer_maxlen)
 
             # Update frame buffer
-            frame_buffer.append((frame_counter, frame.copy()))
+            frame_buffer.append((frame_counter, frame))
             
             # Detect traffic light states
             if light_detector is not None and light_fsm is not None:
@@ -320,12 +445,43 @@ class TrafficSystem:
                 fps=FPS, 
                 save_queue=self.violation_queue
             )
-            
-            # Draw
-            annotated_frame = render_frame(visualized_tracked_objs, frame, visualized_sv_detections, self.box_annotator, self.label_annotator)
+
+            # Labels are taken now, the tracked objects keep changing while the frame is drawn
+            labels = track_labels(visualized_tracked_objs)
+            return frame, visualized_tracked_objs, visualized_sv_detections, labels, stats
+
+        def render_step(item):
+            frame, visualized_tracked_objs, visualized_sv_detections, labels, stats = item
+            # The shared frame stays clean for the proof buffer, boxes are drawn on a copy
+            annotated_frame = render_frame(visualized_tracked_objs, copy_frame(frame), visualized_sv_detections, self.box_annotator, self.label_annotator, labels=labels)
             annotated_frame = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-            
-            yield annotated_frame, stats
+            return annotated_frame, stats
+
+        frames = itertools.chain([first], dets)
+        pipeline_cfg = self.config.get('pipeline', {})
+        if pipeline_cfg.get('enabled', False):
+            # Detection, tracking and drawing of consecutive frames overlap
+            self.pipeline = Pipeline(frames, [
+                Stage("track", track_step),
+                Stage("render", render_step, workers=pipeline_cfg.get('render_workers', 1)),
+            ], queue_size=pipeline_cfg.get('queue_size', 4))
+            steps = iter(self.pipeline)
+        else:
+            self.pipeline = None
+            steps = (render_step(track_step(item)) for item in frames)
+
+        try:
+            for annotated_frame, stats in steps:
+                if not self.running:
+                    break
+                yield annotated_frame, stats
+        finally:
+            if self.pipeline is not None:
+                self.pipeline.close()
+            # Queued violations may still read their clip from the buffer
+            frame_buffer.flush()
+            self.violation_queue.join()
+            frame_buffer.close()
 
     def get_latest_frame(self):
         if self.generator:
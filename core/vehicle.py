@@ -1,6 +1,6 @@
 from track.kalman_box_tracker import KalmanBoxTracker
 import time
-from utils import MinioClient, load_config
+from utils import load_config
 
 # Load config once
 config = load_config()
@@ -16,7 +16,8 @@ class Vehicle(KalmanBoxTracker):
         self.going_straight = True
         self.frame_of_violation = None
         self.state_when_violation = None
-        self.bboxes_buffer = []
+        # BboxTimeline, created on the first tracked frame
+        self.bboxes_buffer = None
         self.violation_type = []
         self.violation_time = []
 
@@ -41,6 +42,15 @@ class Vehicle(KalmanBoxTracker):
         return self.license_plate
     
 
+    @staticmethod
+    def _proof_clip(frame_buffer):
+        """Snapshot of the proof buffer for the save worker, frames stay encoded until the clip is written"""
+        if not frame_buffer:
+            return []
+        if hasattr(frame_buffer, 'snapshot'):
+            return frame_buffer.snapshot()
+        return list(frame_buffer)
+
     def mark_violation(self, violation_type, frame=None, padding=None,
                        frame_buffer=None, bboxes_buffer=None, fps=30, state=None, save_queue=None):
 
@@ -74,12 +84,15 @@ class Vehicle(KalmanBoxTracker):
                     'vehicle_id': self.id,
                     'identifier': final_lp,
                     'violation_type': violation_type,
-                    'frame': frame.copy(),
+                    # Frames are shared read-only, references are enough
+                    'frame': frame,
                     'bbox': (x1, y1, x2, y2),
-                    'bboxes': bboxes_buffer,
-                    'frame_buffer': list(frame_buffer) if frame_buffer else [],
+                    # The tracking loop keeps appending to the vehicle's timeline
+                    'bboxes': bboxes_buffer.copy() if bboxes_buffer is not None else None,
+                    'frame_buffer': self._proof_clip(frame_buffer),
                     'fps': fps,
-                    'proof_crop': self.proof
+                    'proof_crop': self.proof,
+                    'queued_at': self.violation_time[-1]
                 }
                 if save_queue is not None:
                     save_queue.put(violation_data)
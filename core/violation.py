@@ -126,14 +126,14 @@ class RedLightViolation(Violation):
             if violated_mask[i] and straight_light == 'RED':
                 vehicle.has_violated = True
                 vehicle.straight_light_signal_when_crossing = straight_light
-                vehicle.frame_of_violation = frame.copy()
+                vehicle.frame_of_violation = frame
                 vehicle.state_when_violation = vehicle.get_state()[0]
 
             # Special violations (e.g., no U-turn) are always violations regardless of light
             if special_violated_mask[i]:
                 vehicle.has_violated = True
                 vehicle.going_straight = False
-                vehicle.frame_of_violation = frame.copy()
+                vehicle.frame_of_violation = frame
                 vehicle.state_when_violation = vehicle.get_state()[0]
 
             # Allow exceptions: clear violation if crossing exception lines (legal turn)
@@ -147,7 +147,7 @@ class RedLightViolation(Violation):
             # Mark as turning (but still violated) if crossing blocked turn lines
             if turning_blocked_mask[i] and vehicle.has_violated:
                 vehicle.going_straight = False
-                vehicle.frame_of_violation = frame.copy()
+                vehicle.frame_of_violation = frame
                 vehicle.state_when_violation = vehicle.get_state()[0]
 
             # Finalize violation when leaving the polygon zone
@@ -163,6 +163,16 @@ class RedLightViolation(Violation):
 
         return violated_vehicles
 
+    def line_segments(self):
+        """Return the end points of every configured line as an (L, 2, 2) array"""
+        segments = []
+        for lines in (self.violation_lines, self.special_violation_lines, self.left_exception_lines,
+                      self.right_exception_lines, self.other_exception_lines):
+            for line in lines:
+                segments.append([[line.vector.start.x, line.vector.start.y],
+                                 [line.vector.end.x, line.vector.end.y]])
+        return np.array(segments, dtype=float).reshape(-1, 2, 2)
+
     def load_lines_from_config(self, lines_config):
         """Load lines from configuration dictionary"""
         categories = [
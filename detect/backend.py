@@ -0,0 +1,155 @@
+import os
+import importlib.util
+
+# Fastest first on CPU
+BACKENDS = ('openvino', 'onnx', 'torch')
+RUNTIME_MODULES = {'openvino': 'openvino', 'onnx': 'onnxruntime', 'torch': 'torch'}
+EXPORT_FORMATS = {'openvino': 'openvino', 'onnx': 'onnx'}
+PRECISIONS = ('fp32', 'int8')
+
+
+def exported_path(weights, backend, precision='fp32'):
+    """Path of the exported model, following the ultralytics export naming
+
+    Args:
+        weights (str): path to the .pt weights, e.g. models/detect_gtvn.pt
+        backend (str): 'torch', 'onnx' or 'openvino'
+        precision (str, optional): 'fp32' or 'int8' (see detect/quantize.py). Defaults to 'fp32'.
+
+    Returns:
+        str: e.g. models/detect_gtvn.onnx, models/detect_gtvn_int8.onnx or models/detect_gtvn_int8_openvino_model
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}. Choose from {PRECISIONS}")
+    stem, _ = os.path.splitext(weights)
+    suffix = '_int8' if precision == 'int8' else ''
+    if backend == 'torch':
+        if precision == 'int8':
+            raise ValueError("There is no INT8 PyTorch model, quantize to onnx or openvino")
+        return weights
+    if backend == 'onnx':
+        return stem + suffix + '.onnx'
+    if backend == 'openvino':
+        return stem + suffix + '_openvino_model'
+    raise ValueError(f"Unknown backend: {backend}. Choose from {BACKENDS}")
+
+
+def runtime_available(backend):
+    """Whether the runtime of a backend is installed"""
+    return importlib.util.find_spec(RUNTIME_MODULES[backend]) is not None
+
+
+def export_model(weights, backends=('onnx', 'openvino'), imgsz=640, dynamic=True, half=False):
+    """Export .pt weights to ONNX and/or OpenVINO IR next to the weights
+
+    Args:
+        weights (str): path to the .pt weights
+        backends (tuple, optional): export targets. Defaults to ('onnx', 'openvino').
+        imgsz (int, optional): export image size. Defaults to 640.
+        dynamic (bool, optional): dynamic batch and image size, needed for batched inference. Defaults to True.
+        half (bool, optional): FP16 weights. Defaults to False.
+
+    Returns:
+        dict: {backend: exported path}
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(weights, task='detect')
+    paths = {}
+    for backend in backends:
+        if backend not in EXPORT_FORMATS:
+            raise ValueError(f"Cannot export to {backend}. Choose from {tuple(EXPORT_FORMATS)}")
+        paths[backend] = model.export(format=EXPORT_FORMATS[backend], imgsz=imgsz, dynamic=dynamic, half=half)
+    return paths
+
+
+def resolve_backend(weights, device='cpu', backend='auto', precision='fp32'):
+    """Choose the runtime a model is loaded with
+
+    With backend='auto', CUDA devices use the PyTorch weights. On CPU the first of
+    BACKENDS that is both exported and installed is used, falling back to PyTorch.
+    With precision='int8' the INT8 variants are looked for first; if none exists
+    the FP32 choice is used.
+
+    Returns:
+        (backend, path): the chosen backend and the model path to load
+    """
+    if backend != 'auto':
+        path = exported_path(weights, backend, precision)
+        if not os.path.exists(path):
+            script = 'scripts/quantize.py' if precision == 'int8' else 'scripts/export_models.py'
+            raise FileNotFoundError(f"No {precision} {backend} model at {path}. Create it with {script}")
+        return backend, path
+
+    if not str(device).startswith('cpu'):
+        return 'torch', weights
+    if precision == 'int8':
+        for candidate in BACKENDS[:-1]:
+            path = exported_path(weights, candidate, 'int8')
+            if os.path.exists(path) and runtime_available(candidate):
+                return candidate, path
+        print(f"No INT8 model found for {weights}, using FP32")
+    for candidate in BACKENDS:
+        path = exported_path(weights, candidate)
+        if os.path.exists(path) and runtime_available(candidate):
+            return candidate, path
+    return 'torch', weights
+
+
+class ModelRegistry:
+    """Named detection models (vehicle, license plate) loaded once with the fastest available runtime.
+
+    Example:
+        registry = ModelRegistry(device='cpu')
+        registry.register('vehicle', 'models/detect_gtvn.pt')
+        vehicle_model = registry.get('vehicle')
+    """
+    def __init__(self, device='cpu', backend='auto', precision='fp32', loader=None):
+        """
+        Args:
+            device (str, optional): inference device. Defaults to 'cpu'.
+            backend (str, optional): 'auto', 'torch', 'onnx' or 'openvino'. Defaults to 'auto'.
+            precision (str, optional): 'fp32' or 'int8'. Defaults to 'fp32'.
+            loader (Callable, optional): called as loader(path, task='detect', verbose=False). Defaults to ultralytics.YOLO.
+        """
+        if loader is None:
+            from ultralytics import YOLO
+            loader = YOLO
+        self.device = device
+        self.backend = backend
+        self.precision = precision
+        self.loader = loader
+        self.weights = {}
+        self.models = {}
+        self.backends = {}
+
+    def register(self, name, weights):
+        """Register .pt weights under a name, dropping the model previously loaded under it"""
+        self.weights[name] = weights
+        self.models.pop(name, None)
+        self.backends.pop(name, None)
+
+    def resolve(self, name):
+        """(backend, path) the model registered under name would be loaded from"""
+        if name not in self.weights:
+            raise KeyError(f"No model registered as '{name}'. Registered: {list(self.weights)}")
+        return resolve_backend(self.weights[name], device=self.device, backend=self.backend, precision=self.precision)
+
+    def get(self, name):
+        """The loaded model registered under name, loaded on first use"""
+        if name not in self.models:
+            backend, path = self.resolve(name)
+            self.models[name] = self.loader(path, task='detect', verbose=False)
+            is_int8 = backend != 'torch' and path == exported_path(self.weights[name], backend, 'int8')
+            self.backends[name] = f"{backend}-int8" if is_int8 else backend
+        return self.models[name]
+
+    @classmethod
+    def from_config(cls, config, device='cpu', loader=None):
+        """Registry with the 'vehicle' and 'license_plate' models of the system section of config.yaml"""
+        system_cfg = config.get('system', {})
+        registry = cls(device=device, backend=system_cfg.get('backend', 'auto'),
+                       precision=system_cfg.get('precision', 'fp32'), loader=loader)
+        registry.register('vehicle', system_cfg.get('vehicle_model', "models/detect_gtvn.pt"))
+        registry.register('license_plate', system_cfg.get('license_model', "models/lp_yolo11s.pt"))
+        return registry
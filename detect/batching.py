@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+
+_END = object()
+
+
+class DecodeAheadReader:
+    """Decode frames on a background thread into a bounded queue.
+
+    The decoder stays at most ``queue_size`` frames ahead of the consumer, so memory is
+    bounded while inference never waits on decoding as long as the decoder keeps up.
+    Exceptions raised by the decoder are re-raised in the consuming thread.
+    """
+    def __init__(self, frames, queue_size=32):
+        """
+        Args:
+            frames (Iterable): frame source, e.g. detect.utils.iter_frames(data_path)
+            queue_size (int, optional): Max number of decoded frames waiting for inference. Defaults to 32.
+        """
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._stop = threading.Event()
+        self._error = None
+        self._finished = False
+        self._thread = threading.Thread(target=self._decode, args=(frames,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        # Poll so close() can interrupt a decoder blocked on a full queue
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self, frames):
+        try:
+            for frame in frames:
+                if not self._put(frame):
+                    return
+        except Exception as e:
+            self._error = e
+        self._put(_END)
+
+    def get(self, timeout=None):
+        """Next decoded frame
+
+        Args:
+            timeout (float, optional): seconds to wait, None blocks until a frame is decoded.
+
+        Raises:
+            queue.Empty: no frame was decoded within timeout
+            StopIteration: the source is exhausted
+        """
+        if self._finished:
+            raise StopIteration
+        item = self.queue.get(timeout=timeout)
+        if item is _END:
+            self._finished = True
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        return item
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.get()
+
+    def close(self):
+        """Stop the decoder thread, dropping frames not consumed yet"""
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+
+def iter_batches(reader, batch_size=8, max_latency=0.05):
+    """Group decoded frames into batches
+
+    A batch is emitted as soon as it holds ``batch_size`` frames or ``max_latency`` seconds
+    have passed since its first frame arrived, whichever comes first, so a slow live source
+    never holds a frame back for longer than ``max_latency``.
+
+    Args:
+        reader (DecodeAheadReader): decoded frames
+        batch_size (int, optional): Max frames per batch. Defaults to 8.
+        max_latency (float, optional): Max seconds to wait for a batch to fill up,
+            None waits for full batches. Defaults to 0.05.
+
+    Yields:
+        list: frames of the batch, in decoding order
+    """
+    batch_size = max(1, int(batch_size))
+    while True:
+        try:
+            batch = [reader.get()]
+        except StopIteration:
+            return
+
+        deadline = time.monotonic() + max_latency if max_latency is not None else None
+        exhausted = False
+        while len(batch) < batch_size:
+            # Frames already decoded are always taken, only waiting is bounded
+            remaining = max(deadline - time.monotonic(), 0) if deadline is not None else None
+            try:
+                batch.append(reader.get(timeout=remaining))
+            except queue.Empty:
+                break
+            except StopIteration:
+                exhausted = True
+                break
+        yield batch
+        if exhausted:
+            return
@@ -0,0 +1,227 @@
+import os
+import json
+import glob
+import hashlib
+import numpy as np
+
+CACHE_VERSION = 1
+HASH_BLOCK = 8 * 1024 * 1024
+
+
+def hash_video(data_path):
+    """Fingerprint a video file (size + first/last 8MB) or a folder of images (names + sizes)
+
+    Args:
+        data_path (str): path to the video file or image folder
+
+    Returns:
+        str: hex digest
+    """
+    sha = hashlib.sha1()
+    if os.path.isdir(data_path):
+        for name in sorted(os.listdir(data_path)):
+            sha.update(name.encode())
+            sha.update(str(os.path.getsize(os.path.join(data_path, name))).encode())
+        return sha.hexdigest()
+
+    if not os.path.isfile(data_path):
+        raise ValueError(f"Detection cache needs a video file or an image folder, got: {data_path}")
+
+    size = os.path.getsize(data_path)
+    sha.update(str(size).encode())
+    with open(data_path, "rb") as f:
+        sha.update(f.read(HASH_BLOCK))
+        if size > HASH_BLOCK:
+            f.seek(max(HASH_BLOCK, size - HASH_BLOCK))
+            sha.update(f.read(HASH_BLOCK))
+    return sha.hexdigest()
+
+
+def cache_key(data_path, model_path, iou_threshold, imgsz, classes):
+    """Key identifying the detections of one video under one model and NMS setting
+
+    The confidence threshold is not part of the key: a cache built with a low threshold
+    can serve every higher threshold by filtering at read time.
+    """
+    params = {
+        "video": hash_video(data_path),
+        "model": os.path.basename(str(model_path)),
+        "iou_threshold": float(iou_threshold),
+        "imgsz": imgsz,
+        "classes": sorted(classes) if classes is not None else None,
+        "version": CACHE_VERSION,
+    }
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class DetectionCacheWriter:
+    """Write per-frame detections (x1, y1, x2, y2, conf, cls) into chunked columnar .npz files
+
+    Layout of a cache directory:
+        meta.json            key parameters, frame count, chunk list
+        chunk_00000.npz      boxes (N, 4) float32, conf (N,) float32, cls (N,) int16,
+                             offsets (frames + 1,) int64 into the columns
+    """
+    def __init__(self, cache_dir, conf_threshold, chunk_size=1000, **meta):
+        self.cache_dir = cache_dir
+        self.conf_threshold = float(conf_threshold)
+        self.chunk_size = chunk_size
+        self.meta = meta
+        self.num_frames = 0
+        self.chunks = []
+        self._pending = []
+        os.makedirs(cache_dir, exist_ok=True)
+        # An existing meta.json would mark a half rewritten cache as complete
+        meta_path = os.path.join(cache_dir, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+    def append(self, det):
+        """Add the detections of the next frame
+
+        Args:
+            det (ArrayLike): (N, 6) detections as returned by preprocess_detection_result
+        """
+        self._pending.append(np.asarray(det, dtype=np.float32).reshape(-1, 6))
+        self.num_frames += 1
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        lengths = [len(d) for d in self._pending]
+        dets = np.concatenate(self._pending, axis=0) if sum(lengths) > 0 else np.empty((0, 6), dtype=np.float32)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+        name = f"chunk_{len(self.chunks):05d}.npz"
+        np.savez(os.path.join(self.cache_dir, name),
+                 boxes=dets[:, :4], conf=dets[:, 4], cls=dets[:, 5].astype(np.int16), offsets=offsets)
+        self.chunks.append({"file": name, "frames": len(lengths)})
+        self._pending = []
+
+    def close(self):
+        """Flush pending frames and write meta.json, which marks the cache as complete"""
+        self._flush()
+        meta = dict(self.meta)
+        meta.update({
+            "version": CACHE_VERSION,
+            "conf_threshold": self.conf_threshold,
+            "num_frames": self.num_frames,
+            "chunks": self.chunks,
+        })
+        with open(os.path.join(self.cache_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=4)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+class DetectionCache:
+    """Read detections back from a cache directory written by DetectionCacheWriter"""
+    def __init__(self, cache_dir):
+        meta_path = os.path.join(cache_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Detection cache not found or incomplete: {cache_dir}")
+        with open(meta_path, "r") as f:
+            self.meta = json.load(f)
+        self.cache_dir = cache_dir
+
+    def __len__(self):
+        return self.meta["num_frames"]
+
+    @property
+    def conf_threshold(self):
+        return self.meta["conf_threshold"]
+
+    def iter_detections(self, conf_threshold=None):
+        """Yield the (N, 6) detections of every frame, optionally filtered by a higher confidence threshold
+        """
+        for chunk in self.meta["chunks"]:
+            with np.load(os.path.join(self.cache_dir, chunk["file"])) as data:
+                dets = np.hstack([data["boxes"], data["conf"][:, np.newaxis], data["cls"][:, np.newaxis]]).astype(float)
+                offsets = data["offsets"]
+            for i in range(len(offsets) - 1):
+                det = dets[offsets[i]:offsets[i + 1]]
+                if conf_threshold is not None:
+                    det = det[det[:, 4] >= conf_threshold]
+                yield det
+
+    def __iter__(self):
+        return self.iter_detections()
+
+    @staticmethod
+    def cache_dir_for(cache_root, key, conf_threshold):
+        return os.path.join(cache_root, f"{key}_conf{float(conf_threshold):.3f}")
+
+    @classmethod
+    def find(cls, cache_root, key, conf_threshold):
+        """Find a complete cache for ``key`` built with a confidence threshold <= conf_threshold
+
+        Returns:
+            DetectionCache or None
+        """
+        best = None
+        for cache_dir in glob.glob(os.path.join(cache_root, f"{key}_conf*")):
+            try:
+                cache = cls(cache_dir)
+            except FileNotFoundError:
+                continue
+            if cache.conf_threshold <= conf_threshold + 1e-9 and (best is None or cache.conf_threshold > best.conf_threshold):
+                best = cache
+        return best
+
+
+def build_detection_cache(model, data_path, cache_dir, conf_threshold=0.25, iou_threshold=0.5,
+                          imgsz=640, classes=None, device='cpu', batch_size=1, **meta):
+    """Run the detector once over a video and store every frame's detections in cache_dir
+
+    Args:
+        model (YOLO): the detection model
+        data_path (str): path to the video file or image folder
+        cache_dir (str): output cache directory
+        batch_size (int, optional): frames per model call, > 1 decodes ahead and batches. Defaults to 1.
+
+    Returns:
+        DetectionCache: the complete cache
+    """
+    from detect.detect import inference_video, inference_video_batched
+    from detect.utils import preprocess_detection_result
+
+    if batch_size > 1:
+        # Offline job: no latency constraint, always wait for full batches
+        results = (result for _, result in inference_video_batched(
+            model=model,
+            data_path=data_path,
+            batch_size=batch_size,
+            max_latency=None,
+            queue_size=4 * batch_size,
+            device=device,
+            conf_threshold=conf_threshold,
+            iou_threshold=iou_threshold,
+            classes=classes,
+            imgsz=imgsz,
+            verbose=False
+        ))
+    else:
+        results = inference_video(
+            model=model,
+            data_path=data_path,
+            device=device,
+            stream=True,
+            conf_threshold=conf_threshold,
+            iou_threshold=iou_threshold,
+            classes=classes,
+            imgsz=imgsz,
+            verbose=False
+        )
+    meta.update({"data_path": data_path, "iou_threshold": iou_threshold, "imgsz": imgsz, "classes": classes})
+    with DetectionCacheWriter(cache_dir, conf_threshold, **meta) as writer:
+        for result in results:
+            _, det = preprocess_detection_result(result)
+            writer.append(det)
+    return DetectionCache(cache_dir)
@@ -1,6 +1,10 @@
-from ultralytics.engine.results import Results
 import os
-from typing import Optional, List
+from typing import Optional, List, TYPE_CHECKING
+from detect.utils import iter_frames
+from detect.batching import DecodeAheadReader, iter_batches
+
+if TYPE_CHECKING:
+    from ultralytics.engine.results import Results
 
 def inference_video(
         model,
@@ -12,7 +16,7 @@ def inference_video(
         iou_threshold = 0.5,
         classes: Optional[List[int]] = None,
         **kwargs
-) -> Results:
+) -> "Results":
     """Run object detection model and return results
 
     Args:
@@ -44,4 +48,82 @@ def inference_video(
         **kwargs
     )
 
-    return results
\ No newline at end of file
+    return results
+
+def inference_video_strided(
+        model,
+        data_path,
+        stride,
+        device: str = 'cpu',
+        conf_threshold = 0.25,
+        iou_threshold = 0.5,
+        classes: Optional[List[int]] = None,
+        **kwargs
+):
+    """Run the detection model only on the frames selected by a stride controller
+
+    Args:
+        model (YOLO): the detection model
+        data_path (str): path to input data (video, stream URL or folder of images)
+        stride (AdaptiveDetectionStride): decides on which frames the detector runs
+        conf_threshold (float, optional): confidence threshold for box results. Defaults to 0.25.
+        iou_threshold (float, optional): IoU threshold for NMS. Defaults to 0.5.
+
+    Yields:
+        (frame, result): the decoded frame and its YOLO result, or None when detection was skipped
+    """
+    for frame_idx, frame in enumerate(iter_frames(data_path)):
+        if stride.should_detect(frame_idx):
+            result = model(
+                frame,
+                conf=conf_threshold,
+                iou=iou_threshold,
+                device=device,
+                classes=classes,
+                **kwargs
+            )[0]
+        else:
+            result = None
+        yield frame, result
+
+def inference_video_batched(
+        model,
+        data_path,
+        batch_size: int = 8,
+        max_latency: float = 0.05,
+        queue_size: int = 32,
+        device: str = 'cpu',
+        conf_threshold = 0.25,
+        iou_threshold = 0.5,
+        classes: Optional[List[int]] = None,
+        **kwargs
+):
+    """Run the detection model on batches of frames decoded ahead by a background thread
+
+    Args:
+        model (YOLO): the detection model
+        data_path (str): path to input data (video, stream URL or folder of images)
+        batch_size (int, optional): Max frames per model call. Defaults to 8.
+        max_latency (float, optional): Max seconds to wait for a batch to fill up. Defaults to 0.05.
+        queue_size (int, optional): Max decoded frames waiting for inference. Defaults to 32.
+        conf_threshold (float, optional): confidence threshold for box results. Defaults to 0.25.
+        iou_threshold (float, optional): IoU threshold for NMS. Defaults to 0.5.
+
+    Yields:
+        (frame, result): the decoded frame and its YOLO result, in decoding order
+    """
+    reader = DecodeAheadReader(iter_frames(data_path), queue_size=queue_size)
+    try:
+        for frames in iter_batches(reader, batch_size=batch_size, max_latency=max_latency):
+            results = model(
+                frames,
+                conf=conf_threshold,
+                iou=iou_threshold,
+                device=device,
+                classes=classes,
+                **kwargs
+            )
+            for frame, result in zip(frames, results):
+                yield frame, result
+    finally:
+        reader.close()
@@ -0,0 +1,137 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide whether a frame needs the vehicle detector.
+
+    Consecutive frames are downscaled, converted to gray and differenced inside the
+    polygon zone. Detection is skipped only when nothing moves in the zone and no track
+    is alive, e.g. an empty road at night. After motion is seen, detection keeps running
+    for ``hold_frames`` frames so a vehicle stopping at the line is not dropped.
+    """
+    def __init__(self, width=320, pixel_threshold=25, min_motion_ratio=0.002, hold_frames=5, polygon_points=None):
+        """
+        Args:
+            width (int, optional): Width of the downscaled frames. Defaults to 320.
+            pixel_threshold (int, optional): Gray level change for a pixel to count as moving. Defaults to 25.
+            min_motion_ratio (float, optional): Fraction of moving pixels in the zone to count as motion. Defaults to 0.002.
+            hold_frames (int, optional): Frames to keep detecting after the last motion. Defaults to 5.
+            polygon_points (ArrayLike, optional): (N, 2) polygon zone in full frame pixels. Defaults to None (full frame).
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_motion_ratio = min_motion_ratio
+        self.hold_frames = hold_frames
+        self.set_polygon(polygon_points)
+
+        self.active_tracks = 0
+        self._previous = None
+        self._hold = 0
+
+        # Metrics
+        self.frames = 0
+        self.skipped = 0
+
+    def set_polygon(self, polygon_points):
+        """Restrict motion analysis to the polygon zone, fewer than 3 points uses the full frame"""
+        if polygon_points is None or len(polygon_points) < 3:
+            self.polygon = None
+        else:
+            self.polygon = np.asarray(polygon_points, dtype=float).reshape(-1, 2)
+        self._mask = None
+        self._mask_key = None
+
+    def _downscale(self, frame):
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.width / float(w))
+        small = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0), scale
+
+    def _zone_mask(self, shape, scale):
+        if self.polygon is None:
+            return None
+        if self._mask_key != (shape, scale):
+            mask = np.zeros(shape, dtype=np.uint8)
+            cv2.fillPoly(mask, [np.round(self.polygon * scale).astype(np.int32)], 1)
+            self._mask = mask.astype(bool)
+            self._mask_key = (shape, scale)
+        return self._mask
+
+    def motion_ratio(self, frame):
+        """Fraction of zone pixels that changed since the previous frame (1.0 for the first frame)"""
+        small, scale = self._downscale(frame)
+        previous, self._previous = self._previous, small
+        if previous is None or previous.shape != small.shape:
+            return 1.0
+
+        moving = cv2.absdiff(small, previous) > self.pixel_threshold
+        mask = self._zone_mask(small.shape, scale)
+        if mask is not None:
+            area = mask.sum()
+            return float((moving & mask).sum()) / area if area > 0 else 0.0
+        return float(moving.mean())
+
+    def update(self, tracked_objs):
+        """Record the tracks alive after the last tracking step, detection is never skipped while any remains"""
+        self.active_tracks = len(tracked_objs)
+
+    def should_detect(self, frame):
+        """Whether the detector has to run on this frame"""
+        if self.motion_ratio(frame) >= self.min_motion_ratio:
+            self._hold = self.hold_frames
+            motion = True
+        else:
+            motion = self._hold > 0
+            self._hold = max(0, self._hold - 1)
+
+        detect = motion or self.active_tracks > 0
+        self.frames += 1
+        if not detect:
+            self.skipped += 1
+        return detect
+
+    def stats(self):
+        """Gate decisions so far: frames seen, detector calls skipped and the skipped ratio"""
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / self.frames if self.frames else 0.0,
+        }
+
+
+class MotionGatedModel:
+    """Wrap a detection model so it only runs on frames the MotionGate lets through.
+
+    Skipped frames get an empty result, which the trackers handle like a frame where
+    nothing was detected. The gate only skips frames without any live track, so nothing
+    is lost.
+    """
+    def __init__(self, model, gate):
+        """
+        Args:
+            model (YOLO): the detection model (or another wrapper such as ROIModel)
+            gate (MotionGate): decides which frames are detected
+        """
+        self.model = model
+        self.gate = gate
+
+    @property
+    def names(self):
+        return getattr(self.model, 'names', {})
+
+    def __call__(self, frames, **kwargs):
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        detect = [self.gate.should_detect(frame) for frame in frames]
+
+        to_detect = [frame for frame, keep in zip(frames, detect) if keep]
+        results = iter(self.model(to_detect, **kwargs) if to_detect else [])
+        return [next(results) if keep else self._empty_result(frame) for frame, keep in zip(frames, detect)]
+
+    def _empty_result(self, frame):
+        import torch
+        from ultralytics.engine.results import Results
+        return Results(orig_img=frame, path="", names=self.names, boxes=torch.empty((0, 6)))
@@ -0,0 +1,165 @@
+import os
+import cv2
+import yaml
+import numpy as np
+from detect.backend import exported_path
+from detect.utils import iter_frames, IMAGE_EXTENSIONS
+
+
+def collect_calibration_images(source, output_dir, num_images=300):
+    """Draw a calibration set from our own footage
+
+    Args:
+        source (str): a video file, or a folder of images searched recursively, e.g. a dump of
+            the retraining bucket or the images/ folder written by detect/convert.py
+        output_dir (str): the images are copied to output_dir/images
+        num_images (int, optional): Size of the calibration set, sampled evenly. Defaults to 300.
+
+    Returns:
+        list: paths of the calibration images
+    """
+    image_dir = os.path.join(output_dir, "images")
+    os.makedirs(image_dir, exist_ok=True)
+
+    if os.path.isdir(source):
+        images = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        step = max(1, len(images) // num_images)
+        frames = (cv2.imread(path) for path in images[::step][:num_images])
+    else:
+        cap = cv2.VideoCapture(source)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        step = max(1, total // num_images) if total > 0 else 1
+        frames = (frame for i, frame in enumerate(iter_frames(source)) if i % step == 0)
+
+    paths = []
+    for frame in frames:
+        if frame is None:
+            continue
+        path = os.path.join(image_dir, f"calib_{len(paths):05d}.jpg")
+        cv2.imwrite(path, frame)
+        paths.append(path)
+        if len(paths) >= num_images:
+            break
+    if not paths:
+        raise ValueError(f"No calibration image could be read from {source}")
+    return paths
+
+
+def write_calibration_yaml(output_dir, names):
+    """data.yaml pointing train and val at the calibration images, as the ultralytics INT8 export expects"""
+    data_yaml_path = os.path.join(output_dir, "data.yaml")
+    with open(data_yaml_path, "w") as f:
+        yaml.safe_dump({
+            "path": os.path.abspath(output_dir),
+            "train": "images",
+            "val": "images",
+            "nc": len(names),
+            "names": {int(k): v for k, v in names.items()},
+        }, f)
+    return data_yaml_path
+
+
+def letterbox(image, imgsz=640, color=114):
+    """Resize keeping the aspect ratio and pad to imgsz x imgsz, as YOLO preprocessing does"""
+    h, w = image.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    resized = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    out = np.full((imgsz, imgsz, 3), color, dtype=np.uint8)
+    out[top:top + nh, left:left + nw] = resized
+    return out
+
+
+class CalibrationReader:
+    """Feed calibration images to onnxruntime static quantization, one NCHW float32 image at a time"""
+    def __init__(self, image_paths, input_name, imgsz=640):
+        self.image_paths = list(image_paths)
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._index = 0
+
+    def get_next(self):
+        while self._index < len(self.image_paths):
+            image = cv2.imread(self.image_paths[self._index])
+            self._index += 1
+            if image is None:
+                continue
+            image = letterbox(image, self.imgsz)[:, :, ::-1].transpose(2, 0, 1)
+            return {self.input_name: np.ascontiguousarray(image, dtype=np.float32)[np.newaxis] / 255.0}
+        return None
+
+    def rewind(self):
+        self._index = 0
+
+
+def quantize_onnx(onnx_path, output_path, image_paths, imgsz=640):
+    """Static INT8 quantization of an exported ONNX detector with onnxruntime
+
+    Only Conv/Gemm/MatMul nodes are quantized: the detection head decodes box pixels
+    (0-640) and class scores (0-1) into the same tensor, and a single INT8 scale over
+    both would round every score to zero.
+
+    Returns:
+        str: output_path
+    """
+    import onnx
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType
+
+    graph = onnx.load(onnx_path).graph
+    input_name = graph.input[0].name
+    exclude = [node.name for node in graph.node if node.op_type not in {"Conv", "Gemm", "MatMul"}]
+    del graph
+
+    quantize_static(
+        onnx_path,
+        output_path,
+        CalibrationReader(image_paths, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        nodes_to_exclude=exclude,
+    )
+    return output_path
+
+
+def quantize_model(weights, calibration_source, output_dir, backends=('onnx', 'openvino'),
+                   imgsz=640, num_images=300):
+    """Produce the INT8 variants of a detector next to its weights
+
+    Args:
+        weights (str): path to the .pt weights
+        calibration_source (str): video or image folder from our own footage
+        output_dir (str): where the calibration set is written
+        backends (tuple, optional): INT8 targets. Defaults to ('onnx', 'openvino').
+        imgsz (int, optional): inference size. Defaults to 640.
+        num_images (int, optional): calibration set size. Defaults to 300.
+
+    Returns:
+        dict: {backend: INT8 model path}
+    """
+    from ultralytics import YOLO
+    from detect.backend import export_model
+
+    image_paths = collect_calibration_images(calibration_source, output_dir, num_images=num_images)
+    paths = {}
+    for backend in backends:
+        if backend == 'onnx':
+            onnx_path = exported_path(weights, 'onnx')
+            if not os.path.exists(onnx_path):
+                export_model(weights, backends=('onnx',), imgsz=imgsz)
+            paths['onnx'] = quantize_onnx(onnx_path, exported_path(weights, 'onnx', precision='int8'), image_paths, imgsz)
+        elif backend == 'openvino':
+            # NNCF post-training quantization through the ultralytics exporter
+            model = YOLO(weights, task='detect')
+            data_yaml = write_calibration_yaml(output_dir, model.names)
+            paths['openvino'] = model.export(format='openvino', int8=True, data=data_yaml, imgsz=imgsz, dynamic=True)
+        else:
+            raise ValueError(f"Cannot quantize for {backend}. Choose from ('onnx', 'openvino')")
+    return paths
@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class RegionOfInterest:
+    """Axis aligned crop around the polygon zone.
+
+    Vehicles outside the polygon are never checked for violations, so the detector
+    only needs to see the polygon's bounding rectangle. ``margin`` pixels are kept
+    around it so vehicles entering the zone are already tracked when they cross its border.
+    """
+    def __init__(self, polygon_points=None, margin=32):
+        """
+        Args:
+            polygon_points (ArrayLike, optional): (N, 2) polygon zone points. Defaults to None (full frame).
+            margin (int, optional): Pixels added around the polygon's bounding rectangle. Defaults to 32.
+        """
+        self.margin = int(margin)
+        self.set_polygon(polygon_points)
+
+    def set_polygon(self, polygon_points):
+        """Set the polygon zone, fewer than 3 points disables cropping"""
+        if polygon_points is None or len(polygon_points) < 3:
+            self.bounds = None
+            return
+        points = np.asarray(polygon_points, dtype=float).reshape(-1, 2)
+        x1, y1 = np.floor(points.min(axis=0)).astype(int) - self.margin
+        x2, y2 = np.ceil(points.max(axis=0)).astype(int) + self.margin
+        self.bounds = (x1, y1, x2, y2)
+
+    def crop_box(self, frame_shape):
+        """Crop rectangle (x1, y1, x2, y2) clipped to a frame of shape (H, W, ...), or None for the full frame
+        """
+        if self.bounds is None:
+            return None
+        h, w = frame_shape[:2]
+        x1, y1, x2, y2 = self.bounds
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 <= x1 or y2 <= y1 or (x1, y1, x2, y2) == (0, 0, w, h):
+            return None
+        return x1, y1, x2, y2
+
+    def crop(self, frame):
+        """Crop a frame (a view, nothing is copied)
+
+        Returns:
+            (crop, offset): the cropped frame and the (x, y) of its top left corner in the frame
+        """
+        box = self.crop_box(frame.shape)
+        if box is None:
+            return frame, (0, 0)
+        x1, y1, x2, y2 = box
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def area_ratio(self, frame_shape):
+        """Fraction of the frame area the detector still processes"""
+        box = self.crop_box(frame_shape)
+        if box is None:
+            return 1.0
+        x1, y1, x2, y2 = box
+        return (x2 - x1) * (y2 - y1) / float(frame_shape[0] * frame_shape[1])
+
+
+def to_frame_result(result, frame, offset):
+    """Map a YOLO result computed on a crop back to full frame coordinates
+
+    Args:
+        result (Results): result of the crop
+        frame (ArrayLike): the full frame
+        offset (tuple): (x, y) of the crop in the frame
+
+    Returns:
+        Results: the same result, with orig_img = frame and shifted boxes
+    """
+    result.orig_img = frame
+    result.orig_shape = frame.shape[:2]
+    if result.boxes is None:
+        return result
+
+    data = result.boxes.data
+    data = data.clone() if hasattr(data, "clone") else data.copy()
+    data[:, [0, 2]] += offset[0]
+    data[:, [1, 3]] += offset[1]
+    result.update(boxes=data)
+    return result
+
+
+class ROIModel:
+    """Wrap a detection model so it only runs on the region of interest of every frame.
+
+    Called like the YOLO model on a frame or a list of frames; returns results in full
+    frame coordinates with ``orig_img`` set to the full frame, so the rest of the
+    pipeline (preprocess_detection_result, tracking, rendering) is unchanged.
+    """
+    def __init__(self, model, roi, imgsz=None):
+        """
+        Args:
+            model (YOLO): the detection model
+            roi (RegionOfInterest): crop applied to every frame
+            imgsz (int, optional): inference size for the crops, overrides the caller's imgsz. Defaults to None.
+        """
+        self.model = model
+        self.roi = roi
+        self.imgsz = imgsz
+
+    @property
+    def names(self):
+        return getattr(self.model, 'names', {})
+
+    def __call__(self, frames, **kwargs):
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        if self.imgsz is not None and self.roi.bounds is not None:
+            kwargs['imgsz'] = self.imgsz
+
+        crops, offsets = zip(*(self.roi.crop(frame) for frame in frames))
+        results = self.model(list(crops), **kwargs)
+        return [to_frame_result(result, frame, offset) for result, frame, offset in zip(results, frames, offsets)]
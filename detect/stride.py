@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class AdaptiveDetectionStride:
+    """Decide on which frames the vehicle detector has to run.
+
+    The detector runs every k frames. In between, trackers are only advanced with
+    Kalman predictions. k adapts to the scene:
+        - the faster the fastest tracked vehicle moves, the smaller k, so no vehicle
+          moves more than ``max_displacement`` pixels between two detections
+        - as soon as a tracked vehicle is within ``line_margin`` pixels of a
+          violation line, k drops to ``min_stride`` so crossings are observed by the detector
+    """
+    def __init__(self, min_stride=1, max_stride=3, max_displacement=20.0, line_margin=80.0, lines=None):
+        """
+        Args:
+            min_stride (int, optional): Smallest stride, used near violation lines. Defaults to 1.
+            max_stride (int, optional): Largest stride, used on slow or empty scenes. Defaults to 3.
+            max_displacement (float, optional): Max motion in pixels allowed between two detections. Defaults to 20.
+            line_margin (float, optional): Distance to a line under which every frame is detected. Defaults to 80.
+            lines (ArrayLike, optional): (L, 2, 2) line segments [[x1, y1], [x2, y2]]. Defaults to None.
+        """
+        self.min_stride = max(1, int(min_stride))
+        self.max_stride = max(self.min_stride, int(max_stride))
+        self.max_displacement = max_displacement
+        self.line_margin = line_margin
+        self.set_lines(lines)
+
+        self.stride = self.min_stride
+        self.last_detection_frame = None
+
+    def set_lines(self, lines):
+        """Set the line segments (L, 2, 2) near which every frame should be detected
+        """
+        if lines is None or len(lines) == 0:
+            self.lines = np.empty((0, 2, 2))
+        else:
+            self.lines = np.asarray(lines, dtype=float).reshape(-1, 2, 2)
+
+    def should_detect(self, frame_idx):
+        """Return True if the detector must run on this frame
+        """
+        if self.last_detection_frame is None or frame_idx - self.last_detection_frame >= self.stride:
+            self.last_detection_frame = frame_idx
+            return True
+        return False
+
+    def update(self, tracked_objs):
+        """Recompute the stride from the current Kalman states of the tracked objects
+
+        Args:
+            tracked_objs (list): tracked objects exposing the Kalman state ``x``
+                (x, y, s, r, vx, vy, vs)
+
+        Returns:
+            int: the new stride
+        """
+        if len(tracked_objs) == 0:
+            self.stride = self.max_stride
+            return self.stride
+
+        states = np.array([obj.x for obj in tracked_objs])
+        centers = states[:, :2]
+        speed = np.hypot(states[:, 4], states[:, 5]).max()
+
+        if speed > 0:
+            stride = int(np.floor(self.max_displacement / speed))
+        else:
+            stride = self.max_stride
+        stride = int(np.clip(stride, self.min_stride, self.max_stride))
+
+        if len(self.lines) > 0 and self._distance_to_lines(centers).min() <= self.line_margin:
+            stride = self.min_stride
+
+        self.stride = stride
+        return self.stride
+
+    def _distance_to_lines(self, points):
+        """Distance of every point to its closest line segment
+
+        Args:
+            points (ArrayLike): (N, 2) points
+
+        Returns:
+            ArrayLike: (N,) distances
+        """
+        start = self.lines[:, 0][np.newaxis]            # (1, L, 2)
+        direction = (self.lines[:, 1] - self.lines[:, 0])[np.newaxis]
+        rel = points[:, np.newaxis] - start             # (N, L, 2)
+
+        length_sq = np.maximum((direction ** 2).sum(-1), 1e-6)
+        t = np.clip((rel * direction).sum(-1) / length_sq, 0.0, 1.0)
+        closest = start + t[..., np.newaxis] * direction
+        return np.linalg.norm(points[:, np.newaxis] - closest, axis=-1).min(axis=1)
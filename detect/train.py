@@ -1,5 +1,7 @@
 from ultralytics import YOLO
 import argparse
+from utils import load_config, configure_storage, get_storage
+from utils.shards import list_shards, iter_samples, write_yolo_dataset
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="YOLOv12 Object Detection")
@@ -13,8 +15,20 @@ if __name__ == "__main__":
     parser.add_argument("--lrf", type=float, default=0.01, help="Final learning rate")
     parser.add_argument("--optimizer", type=str, default="AdamW", help="Optimizer to use for training")
     parser.add_argument("--name", type=str, default="object_tracking", help="Name of the training run")
+    parser.add_argument("--shards", type=str, default=None,
+                        help="Train on the retraining shards stored under this prefix (e.g. shards/) instead of --data")
+    parser.add_argument("--shards_dir", type=str, default="output/retraining_dataset",
+                        help="Directory the shards are unpacked into")
+    parser.add_argument("--config", type=str, default="config.yaml", help="Config with the storage section")
     args = parser.parse_args()
-    
+
+    if args.shards:
+        configure_storage(load_config(args.config).get('storage'))
+        storage = get_storage()
+        shards = list_shards(storage, prefix=args.shards)
+        args.data, counts = write_yolo_dataset(iter_samples(storage, shards), args.shards_dir)
+        print(f"Unpacked {len(shards)} shards: {counts['train']} train, {counts['val']} val samples")
+
     model = YOLO(args.model)  # load a pretrained YOLO model
 
     model.train(data=args.data,
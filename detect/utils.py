@@ -1,8 +1,10 @@
 import os
 import shutil
+import cv2
 import configparser
 import supervision as sv
 import numpy as np
+from utils.frames import share_frame
 
 CLASS_ID = 0
 
@@ -119,10 +121,10 @@ def preprocess_detection_result(result):
         polygon_zone (sv.PolygonZone): The region of interest to filter out detection results
 
     Return:
-        frame (ArrayLike): The original frame
+        frame (ArrayLike): The original frame, shared read-only (not copied)
         det (ArrayLike): The preprocessed detection result (x1, y1, x2, y2, conf, cls_id)
     """
-    frame = result.orig_img.copy()
+    frame = share_frame(result.orig_img)
 
     dets = sv.Detections.from_ultralytics(result)
     boxes = dets.xyxy
@@ -134,3 +136,35 @@ def preprocess_detection_result(result):
     else:
         det = np.empty((0, 6))
     return frame, det
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+def iter_frames(data_path):
+    """Decode frames from a video file, stream URL or a folder of images (e.g. MOT img1)
+
+    Args:
+        data_path (str): path to input data
+
+    Yields:
+        frame (ArrayLike): BGR frame
+    """
+    if os.path.isdir(data_path):
+        images = sorted(i for i in os.listdir(data_path) if i.lower().endswith(IMAGE_EXTENSIONS))
+        for image in images:
+            frame = cv2.imread(os.path.join(data_path, image))
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(data_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Cannot open video source: {data_path}")
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        cap.release()
@@ -2,13 +2,20 @@ from ultralytics import YOLO
 from fast_plate_ocr import LicensePlateRecognizer as FastRecognizer
 from track.sort import SORT
 from track.bytetrack import ByteTrack
-from detect.detect import inference_video
+from detect.detect import inference_video, inference_video_strided, inference_video_batched
+from detect.stride import AdaptiveDetectionStride
+from detect.roi import RegionOfInterest, ROIModel
+from detect.motion import MotionGate, MotionGatedModel
+from detect.backend import ModelRegistry
+from core.model_loader import ModelLoader, warmup_detector, warmup_ocr
 from core.vehicle import Vehicle
 from utils import (
     parse_args_tracking,
-    draw_polygon_zone, render_frame,
+    draw_polygon_zone, render_frame, track_labels,
     handle_result_filename, violation_save_worker,
-    load_config, MinioClient
+    load_config, configure_storage, get_storage,
+    share_frame, copy_frame, frame_copy_meter,
+    ProofFrameBuffer, BboxTimeline, ViolationQueue
 )
 from detect.utils import preprocess_detection_result
 from core.violation import RedLightViolation
@@ -16,15 +23,16 @@ from core.violation_manager import ViolationManager
 from core.license_plate_recognizer import LicensePlateRecognizer
 from core.light_signal_detector import LightSignalDetector
 from core.light_signal_FSM import LightSignalFSM
+from core.pipeline import Pipeline, Stage
 import cv2
 import numpy as np
 import supervision as sv
 import os
 import csv
 import threading
-import queue
 import time
-from collections import deque
+import itertools
+from functools import partial
 import line_profiler
 
 @line_profiler.profile
@@ -57,7 +65,9 @@ def main():
             max_age=cfg['max_age'], 
             min_hits=cfg['min_hits'], 
             iou_threshold=cfg['iou_threshold'], 
-            tracker_class=Vehicle
+            tracker_class=Vehicle,
+            gating=cfg.get('gating', False),
+            assignment_workers=cfg.get('assignment_workers', 0)
         )
         conf_threshold = cfg['conf_threshold']
     elif args.tracker == 'bytetrack':
@@ -70,25 +80,45 @@ def main():
             low_conf_threshold=cfg['low_conf_threshold'],
             high_conf_iou_threshold=cfg['high_conf_iou_threshold'],
             low_conf_iou_threshold=cfg['low_conf_iou_threshold'],
-            tracker_class=Vehicle
+            tracker_class=Vehicle,
+            gating=cfg.get('gating', False),
+            assignment_workers=cfg.get('assignment_workers', 0)
         )
         conf_threshold = cfg['conf_threshold']
     else:
         raise ValueError(f"Unknown tracker: {args.tracker}")
 
     data_path = args.data_path
-    vehicle_model = YOLO(args.vehicle_model, task='detect', verbose=False)
-    license_model = YOLO(args.license_model, task='detect', verbose=False)
-    character_model = FastRecognizer('cct-xs-v1-global-model', providers=['CUDAExecutionProvider', 'CPUExecutionProvider'])
-    
     device = args.device
+
+    # ONNX / OpenVINO exports are preferred on CPU when present (see scripts/export_models.py)
+    models = ModelRegistry(device=device, backend=args.backend, precision=args.precision, loader=YOLO)
+    models.register('vehicle', args.vehicle_model)
+    models.register('license_plate', args.license_model)
+
+    # Models and the storage backend load in parallel, the plate and OCR models warm up
+    # in the background while the first frames are read
+    startup_cfg = config.get('startup', {})
+    warmup = startup_cfg.get('warmup', True)
+    preload = startup_cfg.get('preload_plate_models', True)
+    warmup_detector_fn = partial(warmup_detector, imgsz=config['detections']['imgsz'], device=device) if warmup else None
+    loader = ModelLoader(workers=startup_cfg.get('workers', 3))
+    configure_storage(config.get('storage', {}))
+    loader.add('storage', get_storage)
+    vehicle_handle = loader.add('vehicle', lambda: models.get('vehicle'), warmup=warmup_detector_fn)
+    license_model = loader.add('license_plate', lambda: models.get('license_plate'),
+                               warmup=warmup_detector_fn,
+                               background=preload)
+    character_model = loader.add('ocr', lambda: FastRecognizer('cct-xs-v1-global-model', providers=['CUDAExecutionProvider', 'CPUExecutionProvider']),
+                                 warmup=warmup_ocr if warmup else None, background=preload)
+    vehicle_model = vehicle_handle.get()
+    print(f"Model backends: {models.backends}")
+    print(f"Startup times:\n{loader.format_report()}")
     
-    # Pre-initialize MinIO client to avoid lag on first violation
-    # (boto3/S3 connection is established during startup, not during processing)
-    _ = MinioClient()
-    
-    violation_queue = queue.Queue()
-    worker_thread = threading.Thread(target=violation_save_worker,args=(violation_queue,), daemon=True)
+    # Bounded by count and bytes, a slow saver cannot fill memory with queued clips
+    violation_queue = ViolationQueue.from_config(config.get('violation', {}).get('queue'))
+    worker_thread = threading.Thread(target=violation_save_worker,
+                                     args=(violation_queue, config.get('violation', {}).get('saver')), daemon=True)
     worker_thread.start()
     np.random.seed(42)
     window_name = "Traffic Violation Detection"
@@ -100,66 +130,141 @@ def main():
     cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)
 
     # Prepare detections
-    dets = inference_video(
-        model=vehicle_model,
-        data_path=data_path,
-        output_path=None,
-        device=device,
-        stream=True,
-        conf_threshold=conf_threshold,
-        classes=config['detections']['classes'],
-        imgsz=config['detections']['imgsz'],
-        iou_threshold=config['detections']['iou_threshold'],
-        stream_buffer=False,
-        verbose=False
-    )
+    stride_cfg = config['detections'].get('stride', {})
+    batch_cfg = config['detections'].get('batch', {})
+    roi_cfg = config['detections'].get('roi', {})
+    roi = None
+    detector = vehicle_model
+    if roi_cfg.get('enabled', False):
+        # Only the polygon zone (plus a margin) is sent to the detector, set once the zone is known
+        roi = RegionOfInterest(margin=roi_cfg.get('margin', 32))
+        detector = ROIModel(vehicle_model, roi, imgsz=roi_cfg.get('imgsz'))
+    motion_cfg = config['detections'].get('motion_gate', {})
+    motion_gate = None
+    if motion_cfg.get('enabled', False):
+        # Skip the detector on static scenes without any live track
+        motion_gate = MotionGate(
+            width=motion_cfg.get('width', 320),
+            pixel_threshold=motion_cfg.get('pixel_threshold', 25),
+            min_motion_ratio=motion_cfg.get('min_motion_ratio', 0.002),
+            hold_frames=motion_cfg.get('hold_frames', 5)
+        )
+        detector = MotionGatedModel(detector, motion_gate)
+    stride = None
+    if stride_cfg.get('enabled', False):
+        # Run the detector every k frames, Kalman-only tracking in between
+        stride = AdaptiveDetectionStride(
+            min_stride=stride_cfg.get('min_stride', 1),
+            max_stride=stride_cfg.get('max_stride', 3),
+            max_displacement=stride_cfg.get('max_displacement', 20),
+            line_margin=stride_cfg.get('line_margin', 80)
+        )
+        dets = inference_video_strided(
+            model=detector,
+            data_path=data_path,
+            stride=stride,
+            device=device,
+            conf_threshold=conf_threshold,
+            classes=config['detections']['classes'],
+            imgsz=config['detections']['imgsz'],
+            iou_threshold=config['detections']['iou_threshold'],
+            verbose=False
+        )
+    elif batch_cfg.get('enabled', False) or roi is not None or motion_gate is not None:
+        # Decode ahead on a background thread and detect groups of frames in one call
+        # (ROI crops and the motion gate need the decoded frames, without batching they are detected one by one)
+        dets = inference_video_batched(
+            model=detector,
+            data_path=data_path,
+            batch_size=batch_cfg.get('size', 8) if batch_cfg.get('enabled', False) else 1,
+            max_latency=batch_cfg.get('max_latency_ms', 50) / 1000,
+            queue_size=batch_cfg.get('queue_size', 32),
+            device=device,
+            conf_threshold=conf_threshold,
+            classes=config['detections']['classes'],
+            imgsz=config['detections']['imgsz'],
+            iou_threshold=config['detections']['iou_threshold'],
+            verbose=False
+        )
+    else:
+        dets = inference_video(
+            model=vehicle_model,
+            data_path=data_path,
+            output_path=None,
+            device=device,
+            stream=True,
+            conf_threshold=conf_threshold,
+            classes=config['detections']['classes'],
+            imgsz=config['detections']['imgsz'],
+            iou_threshold=config['detections']['iou_threshold'],
+            stream_buffer=False,
+            verbose=False
+        )
+        dets = ((result.orig_img, result) for result in dets)
     csv_results = []
 
-    # First run
-    first_run = True
-
-    for i, result in enumerate(dets):
-        if first_run:
-            # Setup Window display
-            first_frame = result.orig_img
-            FRAME_WIDTH, FRAME_HEIGHT = first_frame.shape[1], first_frame.shape[0]
-            FPS = config['violation']['fps'] if config['violation']['fps'] is not None else 30
-            polygon_points = draw_polygon_zone(first_frame, window_name)
-            polygon_points = np.array(polygon_points, dtype=int)
-            polygon_zone = sv.PolygonZone(polygon_points, triggering_anchors=[sv.Position.CENTER]) if len(polygon_points) >= 3 else None
-
-            # Frame buffer for video proof
-            buffer_duration = config['violation']['video_proof_duration']
-            buffer_maxlen = int(FPS * buffer_duration)
-            frame_buffer = deque(maxlen=buffer_maxlen)
-            frame_counter = 0
-
-            # Set up violation manager and violation types
-            violations = [RedLightViolation(polygon_points=polygon_points, frame=first_frame, window_name=window_name)]
-            licensePlate_recognizer = LicensePlateRecognizer(license_model=license_model, character_model=character_model)
-            violation_manager = ViolationManager(violations=violations, recognizer=licensePlate_recognizer)
-
-            # set up light signal FSMs
-            if args.light_detect == 'True':
-                light_detector = LightSignalDetector(h=FRAME_HEIGHT, w=FRAME_WIDTH, frame=first_frame, window_name=window_name)
-                initial_light_list = light_detector.detect_light_signals(first_frame)
-                processed_initial_lights = []
-                for light in initial_light_list:
-                    if light is None:
-                        processed_initial_lights.append(light)
-                    else:
-                        processed_initial_lights.append(light[0])  # Extract only the state
-
-                light_fsm = LightSignalFSM(initial_states=processed_initial_lights)
-
-            first_run = False
-
-        frame, det = preprocess_detection_result(result)
+    dets = iter(dets)
+    first = next(dets, None)
+    if first is None:
+        raise ValueError(f"No frame could be read from {data_path}")
+
+    # Setup Window display
+    first_frame = first[0]
+    FRAME_WIDTH, FRAME_HEIGHT = first_frame.shape[1], first_frame.shape[0]
+    FPS = config['violation']['fps'] if config['violation']['fps'] is not None else 30
+    polygon_points = draw_polygon_zone(first_frame, window_name)
+    polygon_points = np.array(polygon_points, dtype=int)
+    polygon_zone = sv.PolygonZone(polygon_points, triggering_anchors=[sv.Position.CENTER]) if len(polygon_points) >= 3 else None
+
+    # Frame buffer for video proof
+    buffer_duration = config['violation']['video_proof_duration']
+    buffer_maxlen = int(FPS * buffer_duration)
+    frame_buffer = ProofFrameBuffer.from_config(config, maxlen=buffer_maxlen)
+    frame_counter = 0
+
+    # Set up violation manager and violation types
+    violations = [RedLightViolation(polygon_points=polygon_points, frame=first_frame, window_name=window_name)]
+    licensePlate_recognizer = LicensePlateRecognizer(license_model=license_model, character_model=character_model)
+    violation_manager = ViolationManager(violations=violations, recognizer=licensePlate_recognizer)
+    if stride is not None:
+        stride.set_lines(violations[0].line_segments())
+    if roi is not None:
+        roi.set_polygon(polygon_points)
+    if motion_gate is not None:
+        motion_gate.set_polygon(polygon_points)
+
+    # set up light signal FSMs
+    if args.light_detect == 'True':
+        light_detector = LightSignalDetector(h=FRAME_HEIGHT, w=FRAME_WIDTH, frame=first_frame, window_name=window_name)
+        initial_light_list = light_detector.detect_light_signals(first_frame)
+        processed_initial_lights = []
+        for light in initial_light_list:
+            if light is None:
+                processed_initial_lights.append(light)
+            else:
+                processed_initial_lights.append(light[0])  # Extract only the state
+
+        light_fsm = LightSignalFSM(initial_states=processed_initial_lights)
+
+    def track_step(item):
+        """Tracking, zone filtering, light states and violation checks of one frame"""
+        nonlocal frame_counter
+        frame, result = item
+        frame = share_frame(frame)
         frame_counter += 1
+        frame_copy_meter.count_frame()
 
-        # Object tracking
-        tracked_objs = tracker_instance.update(dets=det)
+        # Object tracking (Kalman prediction only on frames skipped by the detector)
+        if result is not None:
+            frame, det = preprocess_detection_result(result)
+            tracked_objs = tracker_instance.update(dets=det)
+        else:
+            tracked_objs = tracker_instance.predict()
         all_tracked_objs = tracker_instance.get_tracked_objects()
+        if stride is not None:
+            stride.update(tracked_objs)
+        if motion_gate is not None:
+            motion_gate.update(all_tracked_objs)
 
         # Prepare detections in supervision format
         states = [obj.get_state()[0] for obj in tracked_objs]
@@ -186,7 +291,7 @@ def main():
             if obj.bboxes_buffer is not None:
                 obj.bboxes_buffer.append((frame_counter, obj.get_state()[0]))
             else:
-                obj.bboxes_buffer = deque(maxlen=buffer_maxlen)
+                obj.bboxes_buffer = BboxTimeline(maxlen=buffer_maxlen)
                 obj.bboxes_buffer.append((frame_counter, obj.get_state()[0]))
 
         visualized_tracked_objs = [obj for obj in tracked_objs if obj.is_being_tracked]
@@ -194,7 +299,7 @@ def main():
         visualized_sv_detections = sv_detections[visualize_mask]
 
         # Update frame buffer
-        frame_buffer.append((frame_counter, frame.copy()))
+        frame_buffer.append((frame_counter, frame))
 
         # Update light signal FSMs
         if args.light_detect == 'True':
@@ -211,22 +316,58 @@ def main():
 
         # Update violation manager
         violation_manager.update(vehicles=visualized_tracked_objs, sv_detections=visualized_sv_detections, frame=frame, traffic_light_state=traffic_light_states, frame_buffer=frame_buffer, fps=FPS, save_queue=violation_queue)
-        
-        frame = render_frame(visualized_tracked_objs, frame, visualized_sv_detections, box_annotator, label_annotator)
-        cv2.imshow(window_name, frame)
 
         if args.save == "True":
-            frame_num = i + 1
+            frame_num = frame_counter
             for obj in visualized_tracked_objs:
                 x1, y1, x2, y2 = map(float, obj.get_state()[0])
                 t_id = int(obj.id)
                 violated = 1 if getattr(obj, 'has_violated', False) else 0
 
                 csv_results.append([frame_num, x1, y1, x2, y2, t_id, violated])
-        
+
+        # Labels are taken now, the tracked objects keep changing while the frame is drawn
+        return frame, visualized_tracked_objs, visualized_sv_detections, track_labels(visualized_tracked_objs)
+
+    def render_step(item):
+        frame, visualized_tracked_objs, visualized_sv_detections, labels = item
+        # The shared frame stays clean for the proof buffer, boxes are drawn on a copy
+        return render_frame(visualized_tracked_objs, copy_frame(frame), visualized_sv_detections, box_annotator, label_annotator, labels=labels)
+
+    frames = itertools.chain([first], dets)
+    display = args.display == 'True'
+    pipeline_cfg = config.get('pipeline', {})
+    pipeline = None
+    if pipeline_cfg.get('enabled', False):
+        # Detection, tracking and drawing of consecutive frames overlap, display stays on the main thread
+        stages = [Stage("track", track_step)]
+        if display:
+            stages.append(Stage("render", render_step, workers=pipeline_cfg.get('render_workers', 1)))
+        pipeline = Pipeline(frames, stages, queue_size=pipeline_cfg.get('queue_size', 4))
+        rendered = iter(pipeline)
+    elif display:
+        rendered = (render_step(track_step(item)) for item in frames)
+    else:
+        # Headless: nothing is drawn, so no frame is ever copied
+        rendered = (track_step(item) for item in frames)
+
+    for frame in rendered:
+        if not display:
+            continue
+        cv2.imshow(window_name, frame)
+
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
-    
+
+    if pipeline is not None:
+        pipeline.close()
+        print(f"[Pipeline] {pipeline.format_stats()}")
+    # Queued violations may wait for the proof segment being recorded
+    frame_buffer.flush()
+    print(f"[Frames] {frame_copy_meter.format_stats()}")
+    if motion_gate is not None:
+        gate_stats = motion_gate.stats()
+        print(f"[MotionGate] skipped {gate_stats['skipped']}/{gate_stats['frames']} detector calls ({100 * gate_stats['skip_ratio']:.1f}%)")
     cv2.destroyAllWindows()
 
     # wait for violation saving queue to be empty
@@ -241,6 +382,8 @@ def main():
     time.sleep(1)  # Ensure all items are processed
     violation_queue.put(None)  # Stop the worker thread
     worker_thread.join()
+    print(f"[ViolationQueue] {violation_queue.format_stats()}")
+    frame_buffer.close()
 
     # Save results to CSV
     if args.save == "True":
@@ -0,0 +1,124 @@
+from track.builder import build_tracker
+from detect.cache import DetectionCache, cache_key, build_detection_cache
+from detect.utils import iter_frames
+from core.vehicle import Vehicle
+from core.violation import RedLightViolation
+from core.violation_manager import ViolationManager
+from core.license_plate_recognizer import LicensePlateRecognizer
+from utils import parse_args_replay, load_config, load_zones, handle_result_filename
+from itertools import repeat
+import numpy as np
+import supervision as sv
+import os
+import csv
+import time
+
+
+def load_or_build_cache(args, config, conf_threshold):
+    """Find the detection cache of args.data_path, building it with the detector if requested
+    """
+    det_cfg = config['detections']
+    key = cache_key(args.data_path, args.vehicle_model, det_cfg['iou_threshold'], det_cfg['imgsz'], det_cfg['classes'])
+    cache = DetectionCache.find(args.cache_dir, key, conf_threshold)
+    if cache is not None:
+        return cache
+
+    if args.build != 'True':
+        raise FileNotFoundError(f"No detection cache for {args.data_path} in {args.cache_dir}. Run again with --build True")
+
+    from detect.backend import ModelRegistry
+    print(f"Building detection cache for {args.data_path} ...")
+    models = ModelRegistry(device=args.device, backend=args.backend)
+    models.register('vehicle', args.vehicle_model)
+    model = models.get('vehicle')
+    return build_detection_cache(
+        model=model,
+        data_path=args.data_path,
+        cache_dir=DetectionCache.cache_dir_for(args.cache_dir, key, conf_threshold),
+        conf_threshold=conf_threshold,
+        iou_threshold=det_cfg['iou_threshold'],
+        imgsz=det_cfg['imgsz'],
+        classes=det_cfg['classes'],
+        device=args.device,
+        batch_size=det_cfg['batch'].get('size', 1) if det_cfg.get('batch', {}).get('enabled', False) else 1,
+        model_path=args.vehicle_model
+    )
+
+
+def main():
+    args = parse_args_replay()
+    config = load_config(args.config)
+    tracker_cfg = config['tracking'][args.tracker]
+    conf_threshold = tracker_cfg['conf_threshold']
+
+    cache = load_or_build_cache(args, config, conf_threshold)
+
+    # Zones must be configured beforehand, replay never asks to draw them
+    zones = load_zones(args.zones)
+    polygon_points = np.array(zones.get("polygon", []), dtype=int)
+    lines_config = zones.get("lines_config", {})
+    if "lines" in zones and not lines_config:
+        lines_config = {"violation_lines": zones["lines"]}
+    if len(polygon_points) < 3 or not lines_config:
+        raise ValueError(f"Replay needs a polygon and violation lines in {args.zones}")
+    polygon_zone = sv.PolygonZone(polygon_points, triggering_anchors=[sv.Position.CENTER])
+
+    tracker_instance = build_tracker(args.tracker, tracker_cfg, tracker_class=Vehicle)
+    violations = [RedLightViolation(polygon_points=polygon_points, lines=lines_config)]
+    # Replay is for tuning tracking and violation logic, plates are not read
+    recognizer = LicensePlateRecognizer(license_model=None, character_model=None)
+    violation_manager = ViolationManager(violations=violations, recognizer=recognizer)
+
+    FPS = config['violation']['fps'] if config['violation']['fps'] is not None else 30
+    frames = iter_frames(args.data_path) if args.with_frames == 'True' else repeat(None)
+    traffic_light_states = [None, 'RED', None]
+
+    csv_results = []
+    stats = {}
+    start = time.perf_counter()
+
+    for frame_num, (det, frame) in enumerate(zip(cache.iter_detections(conf_threshold), frames), start=1):
+        tracked_objs = tracker_instance.update(dets=det)
+
+        if len(tracked_objs) == 0:
+            sv_detections = sv.Detections.empty()
+        else:
+            sv_detections = sv.Detections(
+                xyxy=np.array([obj.get_state()[0] for obj in tracked_objs]),
+                tracker_id=np.array([obj.id for obj in tracked_objs]),
+                class_id=np.array([obj.class_id for obj in tracked_objs])
+            )
+
+        # Filter vehicles inside polygon zone
+        in_zone_mask = polygon_zone.trigger(detections=sv_detections)
+        for obj in tracker_instance.get_tracked_objects():
+            if obj.is_being_tracked == False and sv_detections.tracker_id is not None and obj.id in sv_detections.tracker_id[in_zone_mask]:
+                obj.is_being_tracked = True
+
+        visualized_tracked_objs = [obj for obj in tracked_objs if obj.is_being_tracked]
+        visualize_mask = np.isin(sv_detections.tracker_id, [obj.id for obj in visualized_tracked_objs])
+        visualized_sv_detections = sv_detections[visualize_mask]
+
+        stats = violation_manager.update(vehicles=visualized_tracked_objs, sv_detections=visualized_sv_detections, frame=frame,
+                                         traffic_light_state=traffic_light_states, frame_buffer=None, fps=FPS, save_queue=None)
+
+        for obj in visualized_tracked_objs:
+            x1, y1, x2, y2 = map(float, obj.get_state()[0])
+            violated = 1 if getattr(obj, 'has_violated', False) else 0
+            csv_results.append([frame_num, x1, y1, x2, y2, int(obj.id), violated])
+
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(cache)} frames in {elapsed:.2f}s ({len(cache) / max(elapsed, 1e-9):.1f} FPS)")
+    print(f"Violations: {stats}")
+
+    result_filename, _ = handle_result_filename(args.data_path, args.tracker)
+    csv_result_path = os.path.join(args.output_dir, "csv", result_filename + "_replay.csv")
+    os.makedirs(os.path.dirname(csv_result_path), exist_ok=True)
+    with open(csv_result_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerows(csv_results)
+    print(f"Tracking results succesfully saved to {csv_result_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from benchmark.backends import benchmark_backends
+from utils import parse_args_backend_bench, load_config
+import pandas as pd
+import os
+
+
+if __name__ == "__main__":
+    args = parse_args_backend_bench()
+    det_cfg = load_config(args.config)['detections']
+
+    table = benchmark_backends(
+        weights=args.weights,
+        data_path=args.data_path,
+        backends=args.backends,
+        num_frames=args.num_frames,
+        device=args.device,
+        conf_threshold=det_cfg['conf_threshold'],
+        iou_threshold=det_cfg['iou_threshold'],
+        imgsz=det_cfg['imgsz'],
+        classes=det_cfg['classes']
+    )
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(table)
+    if args.output is not None:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"Backend benchmark saved to {args.output}")
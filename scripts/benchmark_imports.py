@@ -0,0 +1,16 @@
+from benchmark.imports import benchmark_imports
+from utils import parse_args_import_bench
+import pandas as pd
+import os
+
+
+if __name__ == "__main__":
+    args = parse_args_import_bench()
+    table = benchmark_imports(repeats=args.repeats)
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200, 'display.max_colwidth', 80):
+        print(table)
+    if args.output is not None:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"Import benchmark saved to {args.output}")
@@ -0,0 +1,26 @@
+from benchmark.storage import benchmark_storage
+from utils import parse_args_storage_bench, load_config, configure_storage
+import pandas as pd
+import os
+
+
+if __name__ == "__main__":
+    args = parse_args_storage_bench()
+    # MinIO endpoint tuning (connection pool, multipart) from the configuration
+    configure_storage(load_config(args.config).get('storage', {}))
+
+    table = benchmark_storage(
+        backends=args.backends,
+        objects=args.objects,
+        size_kb=args.size_kb,
+        threads=args.threads,
+        fsync_batches=args.fsync_batches,
+        root=args.root
+    )
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(table)
+    if args.output is not None:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"Storage benchmark saved to {args.output}")
@@ -0,0 +1,11 @@
+from detect.backend import export_model
+from utils import parse_args_export
+
+
+if __name__ == "__main__":
+    args = parse_args_export()
+
+    for weights in args.weights:
+        paths = export_model(weights, backends=args.formats, imgsz=args.imgsz, half=args.half == 'True')
+        for backend, path in paths.items():
+            print(f"{weights} -> {backend}: {path}")
@@ -0,0 +1,37 @@
+from detect.quantize import quantize_model
+from benchmark.backends import compare_precisions
+from utils import parse_args_quantize, load_config
+import pandas as pd
+import os
+
+
+if __name__ == "__main__":
+    args = parse_args_quantize()
+    det_cfg = load_config()['detections']
+
+    reports = []
+    for weights in args.weights:
+        name = os.path.splitext(os.path.basename(weights))[0]
+        paths = quantize_model(weights, args.calibration, os.path.join(args.output_dir, name),
+                               backends=args.formats, imgsz=args.imgsz, num_images=args.num_images)
+        for backend, path in paths.items():
+            print(f"{weights} -> {backend} INT8: {path}")
+
+        report = compare_precisions(
+            weights,
+            args.eval_path or args.calibration,
+            backends=args.formats,
+            num_frames=args.num_frames,
+            conf_threshold=det_cfg['conf_threshold'],
+            iou_threshold=det_cfg['iou_threshold'],
+            imgsz=args.imgsz
+        )
+        report.insert(0, 'model', name)
+        reports.append(report)
+
+    table = pd.concat(reports, ignore_index=True)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(table)
+    report_path = os.path.join(args.output_dir, "report.csv")
+    table.to_csv(report_path, index=False)
+    print(f"Quantization report saved to {report_path}")
@@ -0,0 +1,22 @@
+from benchmark.sweep import run_sweep, DEFAULT_GRID
+from utils import parse_args_sweep, load_config
+import pandas as pd
+import os
+
+
+if __name__ == "__main__":
+    args = parse_args_sweep()
+
+    config = load_config(args.config)
+    grid = load_config(args.grid) if args.grid is not None else DEFAULT_GRID
+
+    table = run_sweep(cache_path=args.cache_path, gt_path=args.gt_path,
+                      grid=grid, base_config=config['tracking'],
+                      workers=args.workers, rank_by=args.rank_by,
+                      min_vis=args.min_vis, iou_threshold=args.iou_threshold)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    table.to_csv(args.output, index=False)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(table.head(10))
+    print(f"Sweep results succesfully saved to {args.output}")
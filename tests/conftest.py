@@ -7,7 +7,7 @@ import cv2
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils import MinioClient
+from utils import MinioClient, LocalStorage, MemoryStorage
 
 
 def _check_minio_connection():
@@ -43,6 +43,19 @@ def minio_client():
                 
     return client
 
+@pytest.fixture(params=["memory", "local", "minio"])
+def storage(request, tmp_path):
+    """Every storage backend, MinIO only when a server is reachable"""
+    if request.param == "minio":
+        yield request.getfixturevalue("minio_client")
+        return
+    if request.param == "local":
+        backend = LocalStorage(str(tmp_path / "storage"), fsync_batch=4)
+    else:
+        backend = MemoryStorage()
+    yield backend
+    backend.executor.shutdown(wait=True)
+
 @pytest.fixture
 def dummy_frame():
     frame = np.zeros((480, 640, 3), dtype=np.uint8)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from detect.backend import ModelRegistry, exported_path, resolve_backend, runtime_available
+from benchmark.backends import mean_average_precision
+
+
+def touch_model(tmp_path, backends):
+    weights = tmp_path / "detect.pt"
+    weights.write_bytes(b"")
+    for backend in backends:
+        path = exported_path(str(weights), backend)
+        if backend == 'openvino':
+            (tmp_path / "detect_openvino_model").mkdir()
+        else:
+            open(path, "wb").close()
+    return str(weights)
+
+
+def test_exported_paths():
+    assert exported_path("models/detect_gtvn.pt", "onnx") == "models/detect_gtvn.onnx"
+    assert exported_path("models/detect_gtvn.pt", "openvino") == "models/detect_gtvn_openvino_model"
+    assert exported_path("models/detect_gtvn.pt", "torch") == "models/detect_gtvn.pt"
+    with pytest.raises(ValueError):
+        exported_path("models/detect_gtvn.pt", "tensorrt")
+
+
+def test_auto_backend_prefers_installed_exports_on_cpu(tmp_path):
+    weights = touch_model(tmp_path, ['onnx', 'openvino'])
+    backend, path = resolve_backend(weights, device='cpu')
+    expected = 'openvino' if runtime_available('openvino') else 'onnx' if runtime_available('onnx') else 'torch'
+    assert backend == expected
+    assert path == exported_path(weights, expected)
+
+    # GPUs keep the PyTorch weights
+    assert resolve_backend(weights, device='cuda') == ('torch', weights)
+
+
+def test_explicit_backend_must_be_exported(tmp_path):
+    weights = touch_model(tmp_path, [])
+    assert resolve_backend(weights, device='cpu') == ('torch', weights)
+    with pytest.raises(FileNotFoundError):
+        resolve_backend(weights, backend='onnx')
+
+
+def test_registry_loads_each_model_once(tmp_path):
+    weights = touch_model(tmp_path, [])
+    loaded = []
+    registry = ModelRegistry(device='cpu', loader=lambda path, **kwargs: loaded.append(path) or object())
+    registry.register('vehicle', weights)
+
+    assert registry.get('vehicle') is registry.get('vehicle')
+    assert loaded == [weights]
+    assert registry.backends == {'vehicle': 'torch'}
+    with pytest.raises(KeyError):
+        registry.get('license_plate')
+
+
+def test_mean_average_precision():
+    ref = [np.array([[0, 0, 10, 10, 1, 0], [20, 20, 30, 30, 1, 1]])]
+    assert mean_average_precision(ref, ref) == pytest.approx(1.0)
+
+    # one class found with an extra false positive ranked last, the other missed
+    pred = [np.array([[0, 0, 10, 10, 0.9, 0], [50, 50, 60, 60, 0.5, 0]])]
+    assert mean_average_precision(pred, ref) == pytest.approx(0.5)
@@ -0,0 +1,68 @@
+import time
+import cv2
+import numpy as np
+import pytest
+from detect.batching import DecodeAheadReader, iter_batches
+from detect.detect import inference_video_batched
+
+
+class FakeModel:
+    """Returns one result per input frame and records the batch sizes"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, frames, **kwargs):
+        self.calls.append(len(frames))
+        return [int(frame[0, 0, 0]) for frame in frames]
+
+
+def slow_frames(num_frames, delay):
+    for i in range(num_frames):
+        time.sleep(delay)
+        yield i
+
+
+def failing_frames():
+    yield 0
+    raise IOError("decoder broke")
+
+
+def test_batches_fill_up_when_decoder_is_ahead():
+    reader = DecodeAheadReader(iter(range(20)), queue_size=32)
+    time.sleep(0.05)
+    batches = list(iter_batches(reader, batch_size=8, max_latency=1.0))
+    assert [len(b) for b in batches] == [8, 8, 4]
+    assert sum(batches, []) == list(range(20))
+
+
+def test_max_latency_flushes_partial_batches():
+    reader = DecodeAheadReader(slow_frames(6, delay=0.05), queue_size=4)
+    batches = list(iter_batches(reader, batch_size=8, max_latency=0.01))
+    assert sum(batches, []) == list(range(6))
+    assert max(len(b) for b in batches) < 6
+
+
+def test_decoder_errors_reach_the_consumer():
+    reader = DecodeAheadReader(failing_frames())
+    assert reader.get() == 0
+    with pytest.raises(IOError):
+        reader.get()
+
+
+def test_early_close_stops_the_decoder():
+    reader = DecodeAheadReader(iter(range(1000)), queue_size=2)
+    assert next(reader) == 0
+    reader.close()
+    assert not reader._thread.is_alive()
+
+
+def test_inference_video_batched_keeps_frame_order(tmp_path):
+    for i in range(10):
+        cv2.imwrite(str(tmp_path / f"{i:06d}.png"), np.full((8, 8, 3), i * 10, dtype=np.uint8))
+
+    model = FakeModel()
+    outputs = list(inference_video_batched(model, str(tmp_path), batch_size=4, max_latency=None))
+
+    assert [result for _, result in outputs] == [i * 10 for i in range(10)]
+    assert all(frame[0, 0, 0] == result for frame, result in outputs)
+    assert model.calls == [4, 4, 2]
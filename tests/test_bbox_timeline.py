@@ -0,0 +1,56 @@
+import pickle
+import numpy as np
+from utils.bbox_timeline import BboxTimeline
+from utils.evidence import write_video_proof
+
+
+def test_timeline_keeps_the_last_maxlen_boxes_sorted():
+    timeline = BboxTimeline(maxlen=5)
+    for i in range(20):
+        timeline.append((i, [i, i, i + 10, i + 10]))
+    assert len(timeline) == 5
+    assert timeline.frames.tolist() == [15, 16, 17, 18, 19]
+    assert [f for f, _ in timeline] == [15, 16, 17, 18, 19]
+
+    # An older frame is inserted in order, a repeated frame replaces its box
+    timeline.append((17, [0, 0, 1, 1]))
+    timeline.append((16.0, [1, 1, 2, 2]))
+    assert timeline.frames.tolist() == [15, 16, 17, 18, 19]
+    assert timeline.at(17).tolist() == [0, 0, 1, 1]
+
+
+def test_lookup_returns_the_last_known_box():
+    timeline = BboxTimeline(pairs=[(10, [0, 0, 10, 10]), (20, [10, 10, 20, 20])])
+    assert timeline.at(9) is None
+    assert timeline.at(10).tolist() == [0, 0, 10, 10]
+    assert timeline.at(15).tolist() == [0, 0, 10, 10]
+    assert timeline.at(99).tolist() == [10, 10, 20, 20]
+    assert timeline.between(11, 20).frames.tolist() == [20]
+
+
+def test_interpolation_fills_gaps_and_holds_the_last_box():
+    timeline = BboxTimeline(pairs=[(10, [0, 0, 10, 10]), (20, [10, 10, 20, 20])])
+    boxes = timeline.interpolate(range(8, 23))
+    assert np.isnan(boxes[:2]).all()
+    assert boxes[2].tolist() == [0, 0, 10, 10]
+    assert boxes[7].tolist() == [5, 5, 15, 15]
+    assert (boxes[-3:] == [10, 10, 20, 20]).all()
+    assert np.isnan(BboxTimeline().interpolate([1, 2])).all()
+
+
+def test_copy_is_independent_and_small_to_pickle():
+    timeline = BboxTimeline(maxlen=180)
+    for i in range(1000):
+        timeline.append((i, np.array([i, 0, i + 5, 5.0])))
+    snapshot = timeline.copy()
+    timeline.append((1000, [0, 0, 1, 1]))
+    assert snapshot.frames[-1] == 999 and len(snapshot) == 180
+    assert len(pickle.dumps(snapshot)) < 15_000
+    assert pickle.loads(pickle.dumps(snapshot)).at(999).tolist() == [999, 0, 1004, 5]
+
+
+def test_video_proof_draws_interpolated_boxes(tmp_path):
+    frames = [(i, np.zeros((60, 80, 3), dtype=np.uint8)) for i in range(10)]
+    timeline = BboxTimeline(pairs=[(2, [10, 20, 20, 30]), (8, [40, 20, 50, 30])])
+    written = write_video_proof(frames, str(tmp_path / "clip.mp4"), 1, "Red Light", timeline, fps=10)
+    assert written == 10
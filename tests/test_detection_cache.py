@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from detect.cache import DetectionCache, DetectionCacheWriter, cache_key
+
+
+def make_frames(num_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(num_frames):
+        n = rng.integers(0, 5)
+        xy = rng.uniform(0, 500, size=(n, 2))
+        frames.append(np.hstack([xy, xy + 50, rng.uniform(0.1, 1, size=(n, 1)), rng.integers(0, 5, size=(n, 1))]))
+    return frames
+
+
+def test_cache_roundtrip(tmp_path):
+    frames = make_frames(25)
+    with DetectionCacheWriter(str(tmp_path / "cache"), conf_threshold=0.1, chunk_size=10) as writer:
+        for det in frames:
+            writer.append(det)
+
+    cache = DetectionCache(str(tmp_path / "cache"))
+    assert len(cache) == 25
+    assert len(cache.meta["chunks"]) == 3
+
+    for cached, det in zip(cache, frames):
+        assert cached.shape == det.shape
+        np.testing.assert_allclose(cached, det.astype(np.float32))
+
+
+def test_cache_conf_filter_and_find(tmp_path):
+    frames = make_frames(5)
+    for conf in (0.1, 0.3):
+        with DetectionCacheWriter(DetectionCache.cache_dir_for(str(tmp_path), "key", conf), conf_threshold=conf) as writer:
+            for det in frames:
+                writer.append(det)
+
+    assert DetectionCache.find(str(tmp_path), "key", 0.05) is None
+    assert DetectionCache.find(str(tmp_path), "key", 0.2).conf_threshold == pytest.approx(0.1)
+    cache = DetectionCache.find(str(tmp_path), "key", 0.5)
+    assert cache.conf_threshold == pytest.approx(0.3)
+
+    for cached, det in zip(cache.iter_detections(0.5), frames):
+        assert len(cached) == (det[:, 4] >= 0.5).sum()
+
+
+def test_incomplete_cache_is_ignored(tmp_path):
+    writer = DetectionCacheWriter(DetectionCache.cache_dir_for(str(tmp_path), "key", 0.1), conf_threshold=0.1)
+    writer.append(make_frames(1)[0])
+    # never closed: no meta.json
+    assert DetectionCache.find(str(tmp_path), "key", 0.1) is None
+
+
+def test_cache_key(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0" * 1024)
+    key = cache_key(str(video), "models/detect_gtvn.pt", 0.5, 640, [0, 1])
+    assert key == cache_key(str(video), "models/detect_gtvn.pt", 0.5, 640, [1, 0])
+    assert key != cache_key(str(video), "models/detect_gtvn.pt", 0.6, 640, [0, 1])
+
+    video.write_bytes(b"1" * 1024)
+    assert key != cache_key(str(video), "models/detect_gtvn.pt", 0.5, 640, [0, 1])
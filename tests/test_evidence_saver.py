@@ -0,0 +1,90 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from utils.evidence import encode_evidence, evidence_names
+from utils.frame_ring import SharedProofBuffer
+from utils.proof_buffer import ProofFrameBuffer
+from utils.storage import MinioClient
+from utils.workers import EvidenceSaver
+
+
+def frame(i, shape=(72, 96, 3)):
+    return np.full(shape, (i * 7) % 256, dtype=np.uint8)
+
+
+def fake_client():
+    return MinioClient.from_s3_client(MagicMock())
+
+
+def violation(i, clip):
+    return {
+        'vehicle_id': i,
+        'identifier': f"PLATE{i}",
+        'violation_type': 'Red Light',
+        'frame': frame(i),
+        'bbox': (10, 10, 50, 40),
+        'bboxes': [(0, (10, 10, 50, 40))],
+        'frame_buffer': clip,
+        'fps': 10,
+        'proof_crop': frame(i, (20, 30, 3)),
+        'queued_at': time.time(),
+    }
+
+
+def test_encode_evidence_produces_every_upload():
+    job = violation(1, [(i, frame(i)) for i in range(5)])
+    job['names'] = evidence_names('PLATE1', 1, 'Red Light')
+    result = encode_evidence(job)
+    keys = [upload['key'] for upload in result['uploads']]
+    assert keys[0].endswith('.jpg') and keys[-1].endswith('.mp4')
+    assert result['uploads'][2]['body'].startswith(b"0 0.3125")
+    assert os.path.getsize(result['uploads'][-1]['path']) > 0
+    os.remove(result['uploads'][-1]['path'])
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_saver_uploads_a_burst_and_reports_timings(processes):
+    buffer = ProofFrameBuffer(maxlen=6, workers=1)
+    for i in range(6):
+        buffer.append((i, frame(i)))
+    client = fake_client()
+    save_queue = queue.Queue()
+    saver = EvidenceSaver(client, processes=processes, upload_threads=3, max_in_flight=4)
+
+    for i in range(20):
+        save_queue.put(violation(i, buffer.snapshot()))
+    while not save_queue.empty():
+        saver.submit(save_queue.get(), on_done=save_queue.task_done)
+    save_queue.join()
+    saver.close()
+    buffer.close()
+
+    stats = saver.stats()
+    assert stats['violations'] == 20 and stats['failed'] == 0
+    assert stats['total']['max_ms'] >= stats['encode']['mean_ms'] > 0
+    # 4 in-memory uploads and one video file per violation
+    assert client.s3.put_object.call_count == 80
+    assert client.s3.upload_file.call_count == 20
+    assert "Saved 20 violations" in saver.format_stats()
+
+
+def test_saver_processes_read_and_release_shared_ring_clips():
+    buffer = SharedProofBuffer(maxlen=4, headroom=2.0, lease_timeout=30.0)
+    for i in range(4):
+        buffer.append((i, frame(i)))
+    client = fake_client()
+    saver = EvidenceSaver(client, processes=1, upload_threads=1)
+    done = threading.Event()
+    saver.submit(violation(1, buffer.snapshot()), on_done=done.set)
+    assert done.wait(30)
+    saver.close()
+
+    assert saver.stats()['failed'] == 0
+    assert client.s3.upload_file.call_count == 1
+    # The encoder process released the lease, the writer does not have to wait
+    assert buffer.ring.leased() == 0
+    buffer.close()
@@ -0,0 +1,106 @@
+import pickle
+import threading
+import time
+import multiprocessing as mp
+import numpy as np
+import pytest
+from utils.frame_ring import SharedFrameRing, SharedProofBuffer, RingClip
+
+
+def frame(i, shape=(48, 64, 3)):
+    return np.full(shape, i % 256, dtype=np.uint8)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(slots=8, shape=(48, 64, 3), lease_timeout=5.0)
+    yield ring
+    ring.close()
+
+
+def test_ring_keeps_the_last_slots_frames(ring):
+    for i in range(20):
+        assert ring.write(i, frame(i))
+    assert ring.read(11) is None
+    assert ring.read(19)[0, 0, 0] == 19
+    assert not ring.write(20, np.zeros((10, 10, 3), dtype=np.uint8))
+
+    clip = ring.lease(10, 19)
+    assert clip.indices == list(range(12, 20))
+    assert [f[0, 0, 0] for _, f in clip] == list(range(12, 20))
+
+
+def test_clip_is_a_small_picklable_reference(ring):
+    for i in range(8):
+        ring.write(i, frame(i))
+    clip = ring.lease(0, 7)
+    assert len(pickle.dumps(clip)) < 500
+    restored = pickle.loads(pickle.dumps(clip))
+    assert restored[3][1][0, 0, 0] == 3
+    clip.release()
+
+
+def test_writer_waits_for_a_leased_frame(ring):
+    for i in range(8):
+        ring.write(i, frame(i))
+    clip = ring.lease(0, 7)
+    assert ring.leased() == 8
+
+    writer = threading.Thread(target=ring.write, args=(8, frame(8)))
+    writer.start()
+    time.sleep(0.05)
+    # Frame 0 is leased, frame 8 cannot take its slot yet
+    assert writer.is_alive()
+    assert ring.read(0)[0, 0, 0] == 0
+
+    next(iter(clip))  # the reader moves past frame 0 ...
+    list(clip)
+    writer.join(timeout=1)
+    assert not writer.is_alive()
+    assert ring.read(8)[0, 0, 0] == 8
+    clip.release()
+    assert ring.leased() == 0
+
+
+def test_expired_lease_no_longer_blocks_the_writer():
+    ring = SharedFrameRing(slots=2, shape=(4, 4), lease_timeout=0.05)
+    ring.write(0, np.zeros((4, 4), dtype=np.uint8))
+    clip = ring.lease(0, 0)
+    start = time.perf_counter()
+    ring.write(2, np.ones((4, 4), dtype=np.uint8))
+    assert time.perf_counter() - start < 1
+    with pytest.raises(KeyError):
+        clip[0]
+    clip.release()
+    ring.close()
+
+
+def _read_in_child(spec, clip, out):
+    SharedFrameRing.attach(spec)
+    out.put([int(f[0, 0, 0]) for _, f in clip])
+    clip.release()
+
+
+def test_clip_is_read_from_another_process(ring):
+    for i in range(8):
+        ring.write(i, frame(i))
+    clip = ring.lease(4, 7)
+
+    out = mp.Queue()
+    child = mp.get_context('fork').Process(target=_read_in_child, args=(ring.spec(), clip, out))
+    child.start()
+    assert out.get(timeout=10) == [4, 5, 6, 7]
+    child.join(timeout=10)
+    assert ring.leased() == 0
+
+
+def test_shared_proof_buffer():
+    buffer = SharedProofBuffer(maxlen=4, headroom=2.0)
+    assert len(buffer.snapshot()) == 0
+    for i in range(10):
+        buffer.append((i, frame(i)))
+    assert buffer.ring.slots == 8 and len(buffer) == 4
+    clip = buffer.snapshot()
+    assert isinstance(clip, RingClip)
+    assert [i for i, _ in clip] == [6, 7, 8, 9]
+    buffer.close()
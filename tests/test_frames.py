@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from utils.frames import FrameCopyMeter, share_frame, copy_frame, frame_copy_meter
+from utils.proof_buffer import ProofFrameBuffer
+from core.vehicle import Vehicle
+
+
+def test_shared_frame_is_read_only_and_not_copied():
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    shared = share_frame(frame)
+    assert shared is frame
+    assert not frame.flags.writeable
+    with pytest.raises(ValueError):
+        frame[0, 0] = 255
+
+
+def test_copy_frame_is_writable_and_counted():
+    frame_copy_meter.reset()
+    frame = share_frame(np.zeros((10, 20, 3), dtype=np.uint8))
+    for _ in range(4):
+        frame_copy_meter.count_frame()
+        render = copy_frame(frame)
+        render[0, 0] = 255
+    assert frame[0, 0, 0] == 0
+
+    stats = frame_copy_meter.stats()
+    assert stats['copies'] == 4
+    assert stats['bytes_per_frame'] == frame.nbytes
+    assert stats['by_reason'] == {'render': 4 * frame.nbytes}
+    assert "MB copied per frame over 4 frames" in frame_copy_meter.format_stats()
+
+
+def test_meter_without_frames():
+    assert FrameCopyMeter().stats()['bytes_per_frame'] == 0.0
+
+
+def test_violation_shares_frames_with_the_save_queue():
+    frames = [share_frame(np.full((40, 60, 3), i, dtype=np.uint8)) for i in range(3)]
+    buffer = ProofFrameBuffer(maxlen=5, codec=None)
+    for i, frame in enumerate(frames):
+        buffer.append((i, frame))
+
+    vehicle = Vehicle(np.array([10, 10, 30, 30, 0.9]), class_id=2)
+    vehicle.has_violated = True
+    saved = []
+
+    class Queue:
+        def put(self, item):
+            saved.append(item)
+
+    vehicle.mark_violation("Red Light", frame=frames[-1], padding=5, frame_buffer=buffer,
+                           state=[10, 10, 30, 30], save_queue=Queue())
+    data = saved[0]
+    assert data['frame'] is frames[-1]
+    assert all(a is b for (_, a), b in zip(data['frame_buffer'], frames))
+    assert data['proof_crop'].shape == (30, 30, 3)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from track.gating import grid_candidate_pairs, split_into_blocks
+from track.sort import SORT
+from track.bytetrack import ByteTrack
+from track.kalman_box_tracker import KalmanBoxTracker
+from track.utils import iou
+
+
+def random_boxes(rng, n, size=1000):
+    xy = rng.uniform(0, size, size=(n, 2))
+    wh = rng.uniform(10, 120, size=(n, 2))
+    return np.hstack([xy, xy + wh])
+
+
+def test_grid_candidates_match_brute_force():
+    rng = np.random.default_rng(1)
+    a = random_boxes(rng, 80)
+    b = random_boxes(rng, 60)
+
+    idx_a, idx_b = grid_candidate_pairs(a, b)
+    found = set(zip(idx_a.tolist(), idx_b.tolist()))
+
+    overlaps = iou(a[:, np.newaxis], b[np.newaxis, :]) > 0
+    expected = set(zip(*[idx.tolist() for idx in np.where(overlaps)]))
+    assert found == expected
+
+
+def test_grid_candidates_empty():
+    idx_a, idx_b = grid_candidate_pairs(np.empty((0, 4)), np.array([[0, 0, 10, 10]]))
+    assert len(idx_a) == 0 and len(idx_b) == 0
+
+
+def test_split_into_blocks():
+    # rows 0,1 share column 0; row 2 alone with column 2; column 1 unused
+    blocks = split_into_blocks(np.array([0, 1, 2]), np.array([0, 0, 2]), 4, 3)
+    blocks = sorted((r.tolist(), c.tolist()) for r, c in blocks)
+    assert blocks == [([0, 1], [0]), ([2], [2])]
+
+
+@pytest.mark.parametrize("tracker_cls", [SORT, ByteTrack])
+def test_gated_tracking_matches_dense(tracker_cls):
+    rng = np.random.default_rng(2)
+    boxes = random_boxes(rng, 100)
+    classes = rng.integers(0, 3, size=len(boxes))
+    velocity = rng.normal(0, 3, size=(len(boxes), 2))
+
+    outputs = []
+    for gating in (False, True):
+        KalmanBoxTracker.count = 0
+        tracker = tracker_cls(min_hits=1, max_age=3, gating=gating)
+        frames = []
+        for step in range(15):
+            moved = boxes + np.tile(velocity * step, 2)
+            conf = np.full(len(boxes), 0.9)
+            conf[::7] = 0.3 # some low confidence detections for ByteTrack
+            dets = np.hstack([moved, conf[:, np.newaxis], classes[:, np.newaxis]])
+            frames.append(sorted((t.id, tuple(np.round(t.get_state()[0], 6))) for t in tracker.update(dets)))
+        outputs.append(frames)
+
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,100 @@
+import numpy as np
+from filterpy.kalman import KalmanFilter
+from track.kalman_filter_bank import KalmanFilterBank
+from track.kalman_box_tracker import KalmanBoxTracker
+from track.sort import SORT
+from track.utils import convert_bbox_to_z, convert_x_to_bbox
+
+
+def make_reference_filter(bbox):
+    """The per-object filterpy setup used by KalmanBoxTracker before the bank"""
+    kf = KalmanFilter(dim_x=7, dim_z=4)
+    kf.F = KalmanFilterBank.F.copy()
+    kf.H = KalmanFilterBank.H.copy()
+    kf.R[2:, 2:] *= 10.
+    kf.P[4:, 4:] *= 1000.
+    kf.P *= 10.
+    kf.Q[-1, -1] *= 0.01
+    kf.Q[4:, 4:] *= 0.01
+    kf.x[:4] = convert_bbox_to_z(bbox)
+    return kf
+
+
+def reference_predict(kf):
+    if (kf.x[6] + kf.x[2] <= 0):
+        kf.x[6] *= 0.0
+    kf.predict()
+
+
+def test_bank_matches_filterpy():
+    rng = np.random.default_rng(0)
+    n = 20
+    boxes = rng.uniform(0, 500, size=(n, 2))
+    boxes = np.hstack([boxes, boxes + rng.uniform(10, 80, size=(n, 2))])
+
+    bank = KalmanFilterBank(capacity=4) # force growth
+    slots = np.array([bank.allocate(convert_bbox_to_z(b)) for b in boxes])
+    refs = [make_reference_filter(b) for b in boxes]
+
+    for step in range(30):
+        bank.predict(slots)
+        for kf in refs:
+            reference_predict(kf)
+
+        # update a random subset of tracks with jittered boxes
+        subset = rng.choice(n, size=n // 2, replace=False)
+        obs = boxes[subset] + step + rng.normal(0, 2, size=(len(subset), 4))
+        bank.update(slots[subset], np.array([convert_bbox_to_z(b).ravel() for b in obs]))
+        for i, b in zip(subset, obs):
+            refs[i].update(convert_bbox_to_z(b))
+
+    for slot, kf in zip(slots, refs):
+        np.testing.assert_allclose(bank.x[slot], kf.x.ravel(), rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(bank.P[slot], kf.P, rtol=1e-9, atol=1e-9)
+
+
+def test_scale_guard_matches_filterpy():
+    bank = KalmanFilterBank()
+    bbox = np.array([10, 10, 20, 20])
+    slot = bank.allocate(convert_bbox_to_z(bbox))
+    kf = make_reference_filter(bbox)
+
+    bank.x[slot, 6] = -1000.
+    kf.x[6] = -1000.
+    bank.predict([slot])
+    reference_predict(kf)
+
+    np.testing.assert_allclose(bank.x[slot], kf.x.ravel())
+
+
+def test_slots_are_reused_and_detached_state_is_kept():
+    bank = KalmanFilterBank(capacity=1)
+    tracker = KalmanBoxTracker([0, 0, 10, 10], bank=bank)
+    state = tracker.get_state().copy()
+
+    tracker.release()
+    assert len(bank) == 0
+    assert tracker.bank is not bank
+
+    other = KalmanBoxTracker([100, 100, 150, 150], bank=bank)
+    assert other.slot == 0
+    np.testing.assert_allclose(tracker.get_state(), state)
+
+
+def test_tracker_output_matches_filterpy():
+    KalmanBoxTracker.count = 0
+    tracker_system = SORT(min_hits=1, max_age=5)
+    dets = np.array([[10, 10, 50, 50, 0.9, 0], [200, 200, 260, 240, 0.9, 0]], dtype=float)
+    refs = [make_reference_filter(d[:4]) for d in dets]
+
+    tracker_system.update(dets)
+    for step in range(1, 10):
+        moved = dets.copy()
+        moved[:, :4] += step * 3
+        for kf, det in zip(refs, moved):
+            reference_predict(kf)
+            kf.update(convert_bbox_to_z(det[:4]))
+        tracker_system.update(moved)
+
+    for trk, kf in zip(sorted(tracker_system.trackers, key=lambda t: t.id), refs):
+        np.testing.assert_allclose(trk.get_state(), convert_x_to_bbox(kf.x), rtol=1e-9)
@@ -0,0 +1,30 @@
+import pytest
+import utils
+from utils.lazy import LazyImport
+from benchmark.imports import time_import
+
+
+@pytest.mark.parametrize("statement, deferred", [
+    ("from utils import parse_args_eval, load_config", {'boto3', 'supervision', 'cv2'}),
+    ("from track import SORT, ByteTrack", {'scipy', 'torch'}),
+    ("from core import Pipeline, ModelLoader", {'torch', 'supervision', 'boto3'}),
+    ("import core.traffic_system", {'torch', 'ultralytics'}),
+])
+def test_heavy_dependencies_are_not_imported(statement, deferred):
+    _, loaded = time_import(statement, repeats=1)
+    assert not deferred & set(loaded)
+
+
+def test_lazy_attributes_resolve_to_the_submodule_objects():
+    from utils.config import load_config
+    assert utils.load_config is load_config
+    assert 'render_frame' in dir(utils)
+    with pytest.raises(AttributeError):
+        utils.does_not_exist
+
+
+def test_lazy_import_forwards_attributes_and_calls():
+    basename = LazyImport('os.path', 'basename')
+    assert "not loaded" in repr(basename)
+    assert basename('models/detect_gtvn.pt') == 'detect_gtvn.pt'
+    assert LazyImport('math').sqrt(4) == 2.0
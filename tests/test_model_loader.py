@@ -0,0 +1,71 @@
+import time
+import threading
+import pytest
+from core.model_loader import LazyModel, ModelLoader
+
+
+class SlowModel:
+    def __init__(self, delay=0.2):
+        time.sleep(delay)
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return 2 * x
+
+    def predict(self, x):
+        return x + 1
+
+
+def test_components_load_in_parallel():
+    loader = ModelLoader(workers=3)
+    start = time.perf_counter()
+    handles = [loader.add(name, SlowModel) for name in ('vehicle', 'license_plate', 'ocr')]
+    assert time.perf_counter() - start < 0.1
+
+    loader.wait()
+    # Three 0.2s loads overlap instead of taking 0.6s
+    assert time.perf_counter() - start < 0.45
+    assert all(handle.loaded for handle in handles)
+    report = loader.report()
+    assert all(row['load_s'] >= 0.2 for row in report.values())
+    assert "vehicle: 0.2" in loader.format_report()
+
+
+def test_handle_forwards_calls_and_attributes():
+    handle = LazyModel('m', lambda: SlowModel(0))
+    assert handle(3) == 6
+    assert handle.predict(3) == 4
+    assert handle.calls == 1
+
+
+def test_lazy_component_loads_once_on_first_use():
+    built = []
+    loader = ModelLoader(workers=2)
+    handle = loader.add('ocr', lambda: built.append(1) or SlowModel(0.05), background=False)
+    assert not handle.loaded
+    assert "ocr: not loaded yet" in loader.format_report()
+
+    threads = [threading.Thread(target=handle.get) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert built == [1]
+
+
+def test_warmup_is_timed_and_failures_are_reported():
+    warmed = []
+    handle = LazyModel('m', lambda: SlowModel(0), warmup=lambda model: warmed.append(model(1)))
+    handle.get()
+    assert warmed == [2] and handle.warmup_seconds is not None
+
+    # A failed warm-up keeps the model
+    handle = LazyModel('m', lambda: SlowModel(0), warmup=lambda model: 1 / 0)
+    assert handle(2) == 4
+
+    def broken():
+        raise OSError("missing weights")
+    handle = LazyModel('broken', broken)
+    with pytest.raises(RuntimeError, match="missing weights"):
+        handle.get()
@@ -0,0 +1,65 @@
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from detect.motion import MotionGate, MotionGatedModel
+
+
+class CountingModel:
+    names = {0: "car"}
+
+    def __init__(self):
+        self.seen = 0
+
+    def __call__(self, images, **kwargs):
+        self.seen += len(images)
+        return [Results(orig_img=image, path="", names=self.names, boxes=torch.tensor([[1.0, 1.0, 5.0, 5.0, 0.9, 0.0]]))
+                for image in images]
+
+
+def still_frame():
+    return np.full((480, 640, 3), 80, dtype=np.uint8)
+
+
+def moving_frame(x):
+    frame = still_frame()
+    frame[200:260, x:x + 80] = 255
+    return frame
+
+
+def test_static_scene_is_skipped():
+    gate = MotionGate(hold_frames=2)
+    decisions = [gate.should_detect(still_frame()) for _ in range(6)]
+    # first frame has no reference, then the hold runs out
+    assert decisions == [True, True, True, False, False, False]
+    assert gate.stats() == {'frames': 6, 'skipped': 3, 'skip_ratio': 0.5}
+
+
+def test_motion_and_live_tracks_keep_detecting():
+    gate = MotionGate(hold_frames=0)
+    gate.should_detect(still_frame())
+    assert not gate.should_detect(still_frame())
+    assert gate.should_detect(moving_frame(100))
+
+    gate.update([object()])
+    assert gate.should_detect(moving_frame(100))
+    gate.update([])
+    assert not gate.should_detect(moving_frame(100))
+
+
+def test_motion_outside_polygon_is_ignored():
+    gate = MotionGate(hold_frames=0, polygon_points=[[400, 0], [640, 0], [640, 480], [400, 480]])
+    gate.should_detect(moving_frame(0))
+    assert not gate.should_detect(moving_frame(100))
+    assert gate.should_detect(moving_frame(450))
+
+
+def test_gated_model_returns_empty_results_for_skipped_frames():
+    model = CountingModel()
+    gated = MotionGatedModel(model, MotionGate(hold_frames=0))
+    frames = [still_frame(), still_frame(), moving_frame(300)]
+
+    results = gated(frames)
+
+    assert model.seen == 2
+    assert [len(r.boxes) for r in results] == [1, 0, 1]
+    assert all(r.orig_img is frame for r, frame in zip(results, frames))
@@ -0,0 +1,63 @@
+import random
+import time
+import pytest
+from core.pipeline import Pipeline, Stage
+
+
+def jitter(x):
+    time.sleep(random.uniform(0, 0.005))
+    return x
+
+
+def test_pipeline_applies_stages_in_order():
+    pipeline = Pipeline(range(50), [Stage("double", lambda x: 2 * x), Stage("inc", lambda x: x + 1)], queue_size=2)
+    assert list(pipeline) == [2 * x + 1 for x in range(50)]
+
+    stats = pipeline.stats()
+    assert list(stats) == ['source', 'double', 'inc']
+    assert stats['double']['processed'] == 50
+    assert stats['inc']['processed'] == 50
+
+
+def test_parallel_stage_preserves_order():
+    random.seed(0)
+    pipeline = Pipeline(range(100), [Stage("jitter", jitter, workers=4), Stage("identity", lambda x: x)])
+    assert list(pipeline) == list(range(100))
+
+
+def test_stateful_stage_sees_items_in_order():
+    seen = []
+    pipeline = Pipeline(range(30), [Stage("jitter", jitter, workers=3), Stage("collect", lambda x: seen.append(x) or x)])
+    list(pipeline)
+    assert seen == list(range(30))
+
+
+def test_stages_overlap():
+    def slow(x):
+        time.sleep(0.02)
+        return x
+
+    start = time.perf_counter()
+    list(Pipeline(range(10), [Stage("a", slow), Stage("b", slow), Stage("c", slow)]))
+    # sequential execution would take 10 * 3 * 20ms
+    assert time.perf_counter() - start < 0.45
+
+
+def test_stage_error_is_raised_to_consumer():
+    def fail(x):
+        if x == 5:
+            raise RuntimeError("stage broke")
+        return x
+
+    with pytest.raises(RuntimeError, match="stage broke"):
+        list(Pipeline(range(10), [Stage("fail", fail)]))
+
+
+def test_early_stop_releases_workers():
+    pipeline = Pipeline(iter(range(10_000)), [Stage("identity", lambda x: x, workers=2)], queue_size=2)
+    for x in pipeline:
+        if x == 3:
+            break
+    pipeline.close()
+    assert not any(t.is_alive() for t in pipeline._threads)
+    assert set(pipeline.queue_depths()) == {'identity', 'output'}
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from utils.proof_buffer import ProofFrameBuffer, encode_frame, decode_frame
+
+
+def scene(i, h=360, w=640):
+    """Smooth frame with a moving box, compresses like real footage"""
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    frame[:] = np.linspace(40, 200, w, dtype=np.uint8)[None, :, None]
+    frame[100:160, 10 * i:10 * i + 80] = (0, 0, 255)
+    return frame
+
+
+def test_round_trip_is_close_to_the_original():
+    frame = scene(3)
+    decoded = decode_frame(encode_frame(frame, quality=90))
+    assert decoded.shape == frame.shape
+    assert np.abs(decoded.astype(int) - frame.astype(int)).mean() < 3
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_ring_buffer_keeps_the_last_frames_compressed(workers):
+    buffer = ProofFrameBuffer(maxlen=10, quality=80, workers=workers)
+    for i in range(25):
+        buffer.append((i, scene(i)))
+
+    clip = buffer.snapshot()
+    assert len(clip) == 10
+    assert [counter for counter, _ in clip] == list(range(15, 25))
+    counter, frame = clip[-1]
+    assert counter == 24 and frame.shape == (360, 640, 3)
+    # The red box of the last frame survives the encoding
+    assert frame[130, 24 * 10 + 40, 2] > 200
+
+    stats = buffer.stats()
+    assert stats['raw_bytes'] == 10 * 360 * 640 * 3
+    assert stats['compression'] > 10
+    buffer.close()
+
+
+def test_snapshot_is_not_affected_by_later_frames():
+    buffer = ProofFrameBuffer(maxlen=3, workers=1)
+    for i in range(3):
+        buffer.append((i, scene(i)))
+    clip = buffer.snapshot()
+    for i in range(3, 6):
+        buffer.append((i, scene(i)))
+    assert [counter for counter, _ in clip] == [0, 1, 2]
+
+
+def test_raw_buffer_shares_the_frames():
+    buffer = ProofFrameBuffer(maxlen=3, codec=None)
+    frame = scene(0)
+    buffer.append((0, frame))
+    assert buffer.snapshot()[0][1] is frame
+
+
+def test_from_config():
+    buffer = ProofFrameBuffer.from_config({'violation': {'proof_buffer': {'codec': 'webp', 'quality': 60, 'workers': 1}}}, maxlen=7)
+    assert (buffer.maxlen, buffer.codec, buffer.quality) == (7, 'webp', 60)
+    with pytest.raises(ValueError):
+        ProofFrameBuffer(maxlen=3, codec='png')
@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+from detect.backend import exported_path, resolve_backend, runtime_available
+from detect.quantize import CalibrationReader, collect_calibration_images, letterbox
+
+
+def write_video(path, num_frames=30):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(num_frames):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+
+def test_calibration_set_is_sampled_evenly_from_a_video(tmp_path):
+    write_video(tmp_path / "clip.avi")
+    paths = collect_calibration_images(str(tmp_path / "clip.avi"), str(tmp_path / "calib"), num_images=10)
+    assert len(paths) == 10
+    # every 3rd frame of the clip
+    assert abs(int(cv2.imread(paths[1])[0, 0, 0]) - 24) < 4
+
+
+def test_calibration_set_from_nested_image_folders(tmp_path):
+    for split in ("train", "val"):
+        (tmp_path / "data" / split).mkdir(parents=True)
+        for i in range(4):
+            cv2.imwrite(str(tmp_path / "data" / split / f"{i}.jpg"), np.zeros((16, 16, 3), dtype=np.uint8))
+    paths = collect_calibration_images(str(tmp_path / "data"), str(tmp_path / "calib"), num_images=100)
+    assert len(paths) == 8
+
+
+def test_calibration_reader_feeds_letterboxed_nchw(tmp_path):
+    cv2.imwrite(str(tmp_path / "a.jpg"), np.zeros((48, 64, 3), dtype=np.uint8))
+    reader = CalibrationReader([str(tmp_path / "a.jpg")], "images", imgsz=32)
+    batch = reader.get_next()
+    assert batch["images"].shape == (1, 3, 32, 32)
+    assert batch["images"].dtype == np.float32
+    assert reader.get_next() is None
+    reader.rewind()
+    assert reader.get_next() is not None
+
+    padded = letterbox(np.zeros((48, 64, 3), dtype=np.uint8), 32)
+    assert padded[0, 0, 0] == 114 and padded[16, 16, 0] == 0
+
+
+def test_int8_models_are_preferred_when_requested(tmp_path):
+    weights = str(tmp_path / "detect.pt")
+    open(weights, "wb").close()
+    assert exported_path(weights, "onnx", "int8").endswith("detect_int8.onnx")
+    assert exported_path(weights, "openvino", "int8").endswith("detect_int8_openvino_model")
+
+    # no INT8 export yet: falls back to FP32
+    assert resolve_backend(weights, device='cpu', precision='int8') == ('torch', weights)
+
+    open(exported_path(weights, "onnx", "int8"), "wb").close()
+    if runtime_available('onnx'):
+        assert resolve_backend(weights, device='cpu', precision='int8') == ('onnx', exported_path(weights, "onnx", "int8"))
@@ -0,0 +1,55 @@
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from detect.roi import RegionOfInterest, ROIModel
+from detect.utils import preprocess_detection_result
+
+
+class FakeModel:
+    """Detects one box at a fixed position of every input image"""
+    def __init__(self):
+        self.shapes = []
+        self.kwargs = None
+
+    def __call__(self, images, **kwargs):
+        self.kwargs = kwargs
+        results = []
+        for image in images:
+            self.shapes.append(image.shape)
+            boxes = torch.tensor([[10.0, 20.0, 50.0, 60.0, 0.9, 2.0]])
+            results.append(Results(orig_img=image, path="", names={2: "car"}, boxes=boxes))
+        return results
+
+
+def test_crop_box_from_polygon():
+    roi = RegionOfInterest([[100, 200], [500, 220], [450, 600]], margin=20)
+    assert roi.crop_box((1080, 1920, 3)) == (80, 180, 520, 620)
+    # clipped to the frame
+    assert roi.crop_box((500, 510, 3)) == (80, 180, 510, 500)
+    assert 0 < roi.area_ratio((1080, 1920, 3)) < 0.1
+
+
+def test_no_polygon_keeps_full_frame():
+    roi = RegionOfInterest(margin=20)
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    crop, offset = roi.crop(frame)
+    assert crop is frame and offset == (0, 0)
+
+    roi.set_polygon([[0, 0], [1000, 0], [1000, 1000]])
+    assert roi.crop_box(frame.shape) is None
+
+
+def test_roi_model_maps_boxes_back_to_frame():
+    roi = RegionOfInterest([[300, 400], [700, 400], [700, 800], [300, 800]], margin=0)
+    model = FakeModel()
+    detector = ROIModel(model, roi, imgsz=320)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    result = detector(frame, conf=0.25, imgsz=640)[0]
+
+    assert model.shapes == [(400, 400, 3)]
+    assert model.kwargs['imgsz'] == 320
+    assert result.orig_img is frame
+    out_frame, det = preprocess_detection_result(result)
+    assert out_frame.shape == frame.shape
+    np.testing.assert_allclose(det, [[310, 420, 350, 460, 0.9, 2]], rtol=1e-6)
@@ -0,0 +1,75 @@
+import os
+import json
+import cv2
+import numpy as np
+from unittest.mock import MagicMock
+from utils.segment_recorder import SegmentRecorder
+from utils.storage import MinioClient
+
+
+def frame(i):
+    return np.full((64, 96, 3), (i * 5) % 256, dtype=np.uint8)
+
+
+def count_frames(path):
+    cap = cv2.VideoCapture(path)
+    n = 0
+    while cap.read()[0]:
+        n += 1
+    cap.release()
+    return n
+
+
+def test_clip_is_joined_from_segments_without_re_encoding(tmp_path):
+    recorder = SegmentRecorder(str(tmp_path / "seg"), fps=10, clip_frames=15, segment_seconds=1.0, retention_seconds=3.0)
+    for i in range(40):
+        recorder.append((i, frame(i)))
+    clip = recorder.snapshot()
+    recorder.flush()
+
+    segments = clip.wait(timeout=10)
+    # Frames 25..39 live in the segments starting at 20 and 30
+    assert [s.start_frame for s in segments] == [20, 30]
+    out = str(tmp_path / "clip.ts")
+    assert clip.concatenate(out)
+    assert count_frames(out) == 20
+
+    meta = clip.metadata(bboxes=[(24, [1, 2, 3, 4]), (25, np.array([5, 6, 7, 8.04])), (39, [0, 0, 9, 9])], vehicle_id='7')
+    assert meta['first_frame'] == 20 and (meta['clip_start'], meta['clip_end']) == (5, 19)
+    assert meta['boxes'] == {'4': [1, 2, 3, 4], '5': [5, 6, 7, 8.0], '19': [0, 0, 9, 9]}
+    assert meta['vehicle_id'] == '7'
+    clip.release()
+    recorder.close()
+
+
+def test_retention_deletes_old_segments_unless_leased(tmp_path):
+    recorder = SegmentRecorder(str(tmp_path), fps=10, clip_frames=10, segment_seconds=1.0, retention_seconds=2.0)
+    for i in range(20):
+        recorder.append((i, frame(i)))
+    clip = recorder.snapshot()  # frames 10..19
+    for i in range(20, 80):
+        recorder.append((i, frame(i)))
+    recorder.close()
+
+    starts = [s.start_frame for s in recorder.segments]
+    assert 10 in starts and 0 not in starts
+    assert os.path.exists(os.path.join(str(tmp_path), "segment_000000010.ts"))
+    assert not os.path.exists(os.path.join(str(tmp_path), "segment_000000000.ts"))
+    clip.release()
+
+
+def test_segment_proof_is_uploaded_with_a_sidecar(tmp_path):
+    recorder = SegmentRecorder(str(tmp_path), fps=10, clip_frames=10, segment_seconds=1.0)
+    for i in range(12):
+        recorder.append((i, frame(i)))
+    clip = recorder.snapshot()
+    recorder.close()
+
+    client = MinioClient.from_s3_client(MagicMock())
+    assert client.save_segment_proof(clip, 'ABC123', 'Red Light', bboxes=[(5, [1, 2, 3, 4])])
+
+    sidecar = client.s3.put_object.call_args.kwargs
+    assert sidecar['Key'].endswith('.json')
+    assert json.loads(sidecar['Body'])['boxes'] == {'5': [1, 2, 3, 4]}
+    uploaded = client.s3.upload_file.call_args.args
+    assert uploaded[1] == 'proofs' and uploaded[2].endswith('.ts')
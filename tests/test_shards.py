@@ -0,0 +1,90 @@
+import os
+import time
+import numpy as np
+import yaml
+from utils.evidence import encode_jpeg
+from utils.shards import ShardWriter, list_shards, iter_samples, write_yolo_dataset
+from utils.storage import MemoryStorage
+from utils.workers import EvidenceSaver
+
+
+def sample(i):
+    return {'jpg': encode_jpeg(np.full((24, 32, 3), i, dtype=np.uint8)), 'txt': f"0 0.5 0.5 0.{i % 9 + 1} 0.2"}
+
+
+def test_samples_round_trip_through_capped_shards(storage):
+    writer = ShardWriter(storage, prefix="test_shards/", max_samples=10)
+    for i in range(25):
+        writer.add(f"train_{i}_20260101_000000", sample(i))
+    assert writer.stats()['shards'] == 2 and writer.stats()['pending_samples'] == 5
+    writer.close()
+
+    shards = list_shards(storage, prefix="test_shards/")
+    assert [entry['samples'] for entry in shards] == [10, 10, 5]
+    samples = list(iter_samples(storage, shards))
+    assert [s['__key__'] for s in samples] == [f"train_{i}_20260101_000000" for i in range(25)]
+    assert samples[7]['jpg'] == sample(7)['jpg']
+    assert samples[7]['txt'].decode() == sample(7)['txt']
+
+
+def test_shards_are_capped_by_size_and_runs_keep_separate_manifests():
+    storage = MemoryStorage()
+    first = ShardWriter(storage, max_bytes=4096, max_samples=10_000)
+    for i in range(20):
+        first.add(f"a_{i}", {'jpg': os.urandom(1500), 'txt': "0 0.5 0.5 0.1 0.1"})
+    first.close()
+    # A shard overshoots the cap by at most one sample, the file is padded to 10 KB tar records
+    assert all(entry['bytes'] <= 10240 for entry in first.manifest)
+    assert len(first.manifest) >= 5
+
+    second = ShardWriter(storage)
+    second.add("b_0", sample(1))
+    second.close()
+    shards = list_shards(storage)
+    assert sum(entry['samples'] for entry in shards) == 21
+    assert len(storage.list_keys('retraining-data', prefix='shards/manifests/')) == 2
+    # Only shards and manifests, no per-sample objects
+    assert all(key.endswith(('.tar', '.json')) for key in storage.list_keys('retraining-data'))
+
+
+def test_old_shard_is_uploaded_on_the_next_add():
+    storage = MemoryStorage()
+    writer = ShardWriter(storage, max_age_seconds=0.05)
+    writer.add("a", sample(1))
+    time.sleep(0.1)
+    writer.add("b", sample(2))
+    assert writer.stats() == {'shards': 1, 'samples': 2, 'bytes': writer.manifest[0]['bytes'], 'pending_samples': 0}
+
+
+def test_yolo_dataset_from_shards(tmp_path):
+    storage = MemoryStorage()
+    writer = ShardWriter(storage, max_samples=4)
+    for i in range(20):
+        writer.add(f"shards/train_{i}", sample(i))
+    writer.close()
+
+    data_yaml, counts = write_yolo_dataset(iter_samples(storage, list_shards(storage)), str(tmp_path / "ds"), val_every=5)
+    assert counts == {'train': 16, 'val': 4}
+    assert sorted(os.listdir(tmp_path / "ds" / "labels" / "val")) == [f"train_{i}.txt" for i in (14, 19, 4, 9)]
+    with open(data_yaml) as f:
+        data = yaml.safe_load(f)
+    assert data['train'] == 'images/train' and data['names'] == {0: 'vehicle'}
+
+
+def test_saver_packs_retraining_data_into_shards():
+    storage = MemoryStorage()
+    writer = ShardWriter(storage, max_samples=3)
+    saver = EvidenceSaver(storage, processes=0, upload_threads=2, shards=writer)
+    for i in range(5):
+        saver.submit({
+            'vehicle_id': i, 'identifier': f"PLATE{i}", 'violation_type': 'Red Light',
+            'frame': np.full((48, 64, 3), i, dtype=np.uint8), 'bbox': (10, 10, 30, 30), 'bboxes': [],
+            'frame_buffer': None, 'fps': 10, 'proof_crop': np.zeros((8, 8, 3), dtype=np.uint8),
+        })
+    saver.close()
+
+    assert saver.stats()['failed'] == 0
+    samples = list(iter_samples(storage, list_shards(storage)))
+    assert len(samples) == 5 and all(set(s) == {'__key__', 'jpg', 'txt'} for s in samples)
+    assert storage.list_keys('retraining-data', prefix='train_') == []
+    assert len(storage.list_keys('proofs')) >= 5
@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+import numpy as np
+from unittest.mock import MagicMock
+from utils.spool import EvidenceSpool
+from utils.storage import MinioClient
+from utils.workers import EvidenceSaver
+
+
+class FlakyS3:
+    """S3 stand-in that is down until up is set"""
+    def __init__(self):
+        self.up = threading.Event()
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self._store(Bucket, Key, Body)
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None, Config=None):
+        with open(path, 'rb') as f:
+            self._store(bucket, key, f.read())
+
+    def _store(self, bucket, key, body):
+        if not self.up.is_set():
+            raise ConnectionError("storage unreachable")
+        self.objects[(bucket, key)] = body
+
+
+def test_spooled_items_survive_an_outage_and_are_flushed(tmp_path):
+    s3 = FlakyS3()
+    client = MinioClient.from_s3_client(s3)
+    spool = EvidenceSpool(str(tmp_path), client=client, base_delay=0.05, max_delay=0.2, poll_interval=0.02)
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"video")
+    assert spool.put({'bucket': 'proofs', 'key': 'a.jpg', 'body': b"jpeg", 'content_type': 'image/jpeg'})
+    assert spool.put({'bucket': 'proofs', 'key': 'a.mp4', 'path': str(clip)})
+    # The file now lives in the spool
+    assert not clip.exists()
+
+    time.sleep(0.3)
+    stats = spool.stats()
+    assert stats['items'] == 2 and stats['bytes'] == 9 and stats['retrying'] == 2
+    assert stats['oldest_age_s'] > 0.2 and spool.failed_attempts >= 2
+
+    s3.up.set()
+    assert spool.drain(timeout=5)
+    spool.close()
+    assert s3.objects[('proofs', 'a.jpg')] == b"jpeg"
+    assert s3.objects[('proofs', 'a.mp4')] == b"video"
+    assert os.listdir(tmp_path / "data") == []
+
+
+def test_spool_is_reloaded_after_a_restart(tmp_path):
+    spool = EvidenceSpool(str(tmp_path))
+    spool.put({'bucket': 'retraining', 'key': 'train_1.txt', 'body': b"0 0.5 0.5 0.1 0.1"})
+    spool.close()
+    # A payload written without its journal row, as after a crash
+    (tmp_path / "data" / "orphan.jpg").write_bytes(b"x")
+
+    client = MinioClient.from_s3_client(MagicMock())
+    spool = EvidenceSpool(str(tmp_path), client=client, poll_interval=0.02)
+    assert spool.drain(timeout=5)
+    spool.close()
+    assert client.s3.upload_file.call_args.args[1:] == ('retraining-data', 'train_1.txt')
+    assert os.listdir(tmp_path / "data") == []
+
+
+def test_full_spool_rejects_items(tmp_path):
+    spool = EvidenceSpool(str(tmp_path), max_bytes=10)
+    assert spool.put({'bucket': 'proofs', 'key': 'a', 'body': b"12345678"})
+    assert not spool.put({'bucket': 'proofs', 'key': 'b', 'body': b"12345678"})
+    assert spool.stats()['rejected'] == 1
+    assert "1 items spooled" in spool.format_stats()
+    spool.close()
+
+
+def test_saver_finishes_violations_while_storage_is_down(tmp_path):
+    s3 = FlakyS3()
+    client = MinioClient.from_s3_client(s3)
+    spool = EvidenceSpool(str(tmp_path), client=client, base_delay=0.05, poll_interval=0.02)
+    saver = EvidenceSaver(client, processes=0, upload_threads=2, spool=spool)
+    frames = [(i, np.zeros((48, 64, 3), dtype=np.uint8)) for i in range(3)]
+    for i in range(3):
+        saver.submit({'vehicle_id': i, 'identifier': f"P{i}", 'violation_type': 'Red Light', 'frame': frames[0][1],
+                      'bbox': (1, 1, 20, 20), 'bboxes': None, 'frame_buffer': frames, 'fps': 10,
+                      'proof_crop': frames[0][1][:10, :10]})
+    saver.close()
+    assert saver.stats()['violations'] == 3 and saver.stats()['failed'] == 0
+    assert spool.stats()['items'] == 15 and not s3.objects
+
+    s3.up.set()
+    assert spool.drain(timeout=10)
+    spool.close()
+    assert len(s3.objects) == 15
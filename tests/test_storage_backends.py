@@ -0,0 +1,53 @@
+import os
+import pytest
+from utils.storage import LocalStorage, MemoryStorage, configure_storage, get_storage
+
+
+def test_local_storage_batches_fsync(tmp_path):
+    storage = LocalStorage(str(tmp_path), fsync_batch=4, upload_threads=1)
+    uploads = [{'bucket': 'proofs', 'key': f"2026_01/p{i}.jpg", 'body': b"x" * 10} for i in range(10)]
+    assert all(storage.upload_many(uploads))
+    # 10 objects: two full batches synced, two objects waiting for the next one
+    assert storage.syncs == 2 and len(storage._pending) == 2
+    storage.flush()
+    assert storage.syncs == 3 and not storage._pending
+
+    assert storage.list_keys('proofs', prefix="2026_01/p1") == ["2026_01/p1.jpg"]
+    assert not any(name.startswith(".tmp_") for name in os.listdir(tmp_path / "proofs" / "2026_01"))
+
+
+def test_local_storage_rejects_keys_outside_the_bucket(tmp_path):
+    storage = LocalStorage(str(tmp_path / "store"))
+    assert not storage.upload_bytes(b"x", 'proofs', "../escape.txt")
+    assert not (tmp_path / "store" / "escape.txt").exists()
+    assert storage.upload_meter.stats()['failed'] == 1
+
+
+def test_local_storage_copies_files(tmp_path):
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"video" * 1000)
+    storage = LocalStorage(str(tmp_path / "store"), fsync_batch=1)
+    assert storage.upload_file(str(source), 'proofs', "clip.mp4", 'video/mp4')
+    assert storage.get_object('proofs', "clip.mp4") == source.read_bytes()
+    assert storage.syncs == 1
+
+
+def test_get_storage_follows_the_configuration(tmp_path):
+    try:
+        configure_storage({'backend': 'local', 'local': {'dir': str(tmp_path), 'fsync_batch': 0}})
+        storage = get_storage()
+        assert isinstance(storage, LocalStorage) and storage is get_storage()
+        assert storage.root == str(tmp_path) and storage.fsync_batch == 0
+        assert isinstance(get_storage('memory'), MemoryStorage)
+        with pytest.raises(ValueError):
+            get_storage('ftp')
+    finally:
+        configure_storage({})
+
+
+def test_storage_benchmark_runs_offline(tmp_path):
+    from benchmark.storage import benchmark_storage
+    table = benchmark_storage(backends=('memory', 'local'), objects=5, size_kb=1, threads=2,
+                              fsync_batches=(1, 4), root=str(tmp_path))
+    assert table['backend'].tolist() == ['memory', 'local', 'local']
+    assert (table['failed'] == 0).all() and (table['mb_per_s'] > 0).all()
@@ -0,0 +1,54 @@
+import numpy as np
+from detect.stride import AdaptiveDetectionStride
+from track.bytetrack import ByteTrack
+from track.kalman_box_tracker import KalmanBoxTracker
+
+
+def make_track(bbox, velocity=(0, 0)):
+    track = KalmanBoxTracker(bbox)
+    track.x[4:6] = velocity
+    return track
+
+
+def test_should_detect_follows_stride():
+    stride = AdaptiveDetectionStride(min_stride=1, max_stride=3)
+    stride.stride = 3
+    detected = [i for i in range(10) if stride.should_detect(i)]
+    assert detected == [0, 3, 6, 9]
+
+
+def test_stride_adapts_to_motion():
+    stride = AdaptiveDetectionStride(min_stride=1, max_stride=4, max_displacement=20)
+
+    assert stride.update([]) == 4
+    assert stride.update([make_track([0, 0, 10, 10], velocity=(1, 1))]) == 4
+    assert stride.update([make_track([0, 0, 10, 10], velocity=(8, 0))]) == 2
+    assert stride.update([make_track([0, 0, 10, 10], velocity=(30, 0))]) == 1
+
+
+def test_stride_drops_near_violation_lines():
+    lines = [[[0, 500], [1000, 500]]]
+    stride = AdaptiveDetectionStride(min_stride=1, max_stride=3, line_margin=50, lines=lines)
+
+    far = make_track([100, 100, 120, 120])
+    near = make_track([100, 470, 120, 490])
+    assert stride.update([far]) == 3
+    assert stride.update([far, near]) == 1
+
+
+def test_predict_only_step_does_not_age_tracks():
+    KalmanBoxTracker.count = 0
+    tracker = ByteTrack(min_hits=1, max_age=1)
+    dets = np.array([[10, 10, 50, 50, 0.9, 0]])
+    tracker.update(dets)
+    tracker.update(dets + [2, 2, 2, 2, 0, 0])
+    position = tracker.trackers[0].get_state().copy()
+
+    for _ in range(5):
+        tracks = tracker.predict()
+        assert len(tracks) == 1
+        assert tracks[0].time_since_update == 0
+
+    # the track moved with its velocity but was kept alive
+    assert tracker.trackers[0].get_state()[0, 0] > position[0, 0]
+    assert len(tracker.update(dets + [14, 14, 14, 14, 0, 0])) == 1
@@ -0,0 +1,60 @@
+import numpy as np
+import motmetrics as mm
+import pytest
+from benchmark.sweep import expand_grid, run_sweep
+from detect.cache import DetectionCacheWriter
+from utils import load_config
+
+
+def motmetrics_works():
+    try:
+        mm.distances.iou_matrix([[0, 0, 1, 1]], [[0, 0, 1, 1]])
+    except AttributeError:
+        # motmetrics 1.4.0 still calls np.asfarray, removed in NumPy 2
+        return False
+    return True
+
+
+def write_sequence(tmp_path, num_frames=30):
+    """Two boxes moving in opposite directions: MOT ground truth + cached detections"""
+    rng = np.random.default_rng(0)
+    gt_rows = []
+    cache_dir = str(tmp_path / "cache")
+    with DetectionCacheWriter(cache_dir, conf_threshold=0.1) as writer:
+        for frame in range(1, num_frames + 1):
+            dets = []
+            for obj_id, (x, vx) in enumerate([(50, 4), (400, -4)], start=1):
+                x1, y1 = x + vx * frame, 100
+                gt_rows.append(f"{frame},{obj_id},{x1},{y1},40,40,1,1,1.0")
+                noise = rng.normal(0, 0.5, size=4)
+                dets.append([x1 + noise[0], y1 + noise[1], x1 + 40 + noise[2], y1 + 40 + noise[3], 0.9, 0])
+            writer.append(np.array(dets))
+    gt_path = tmp_path / "gt.txt"
+    gt_path.write_text("\n".join(gt_rows) + "\n")
+    return cache_dir, str(gt_path)
+
+
+def test_expand_grid_merges_base_config():
+    base = {'sort': {'max_age': 30, 'min_hits': 3, 'cost_function': 'iou'}}
+    runs = expand_grid({'sort': {'cost_function': ['iou', 'diou'], 'min_hits': [1, 3]}}, base)
+    assert len(runs) == 4
+    assert all(params['max_age'] == 30 for _, params in runs)
+    assert {(p['cost_function'], p['min_hits']) for _, p in runs} == {('iou', 1), ('iou', 3), ('diou', 1), ('diou', 3)}
+
+
+@pytest.mark.skipif(not motmetrics_works(), reason="installed motmetrics is incompatible with this NumPy")
+def test_run_sweep_ranks_configurations(tmp_path):
+    cache_dir, gt_path = write_sequence(tmp_path)
+    base = load_config('config.yaml')['tracking']
+    grid = {
+        'sort': {'cost_function': ['iou', 'ciou'], 'iou_threshold': [0.3, 0.99]},
+        'bytetrack': {'cost_function': ['diou'], 'min_hits': [1]},
+    }
+    table = run_sweep(cache_dir, gt_path, grid, base, workers=2, rank_by='idf1', verbose=False)
+
+    assert len(table) == 5
+    assert list(table['rank']) == [1, 2, 3, 4, 5]
+    assert table['idf1'].is_monotonic_decreasing
+    # requiring a near perfect overlap breaks the tracks on every noisy frame
+    assert table.iloc[-1]['iou_threshold'] == 0.99
+    assert table.iloc[0]['idf1'] > 0.9
@@ -77,3 +77,33 @@ def test_class_constraint_swap(tracker_cls):
     assert len(trackers2) == 1
     assert trackers2[0].id != id_1
     assert trackers2[0].class_id == 1
+
+@pytest.mark.parametrize("tracker_cls", [SORT, ByteTrack])
+def test_class_partitioned_assignment(tracker_cls):
+    """
+    Overlapping objects of several classes are each matched to the track of their own class,
+    with and without the per-class thread pool.
+    """
+    dets_frame1 = np.array([
+        [100, 100, 200, 200, 0.9, 0],
+        [100, 100, 200, 200, 0.9, 1],
+        [110, 110, 210, 210, 0.9, 2],
+        [400, 400, 450, 450, 0.9, 0],
+    ])
+    dets_frame2 = dets_frame1.copy()
+    dets_frame2[:, :4] += 3
+    dets_frame2 = dets_frame2[::-1] # order of detections should not matter
+
+    results = []
+    for workers in (0, 4):
+        KalmanBoxTracker.count = 0
+        tracker = tracker_cls(tracker_class=MockTracker, min_hits=0, assignment_workers=workers)
+        first = {t.id: t.class_id for t in tracker.update(dets_frame1)}
+        second = {t.id: t.class_id for t in tracker.update(dets_frame2)}
+
+        # every object kept its track and class
+        assert second == first
+        assert len(tracker.trackers) == 4
+        results.append(second)
+
+    assert results[0] == results[1]
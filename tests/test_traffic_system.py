@@ -43,8 +43,8 @@ def mock_config():
 @patch('core.traffic_system.YOLO')
 @patch('core.traffic_system.FastRecognizer')
 @patch('core.traffic_system.violation_save_worker')
-@patch('core.traffic_system.MinioClient')
-def test_traffic_system_initialization(mock_minio, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
+@patch('core.traffic_system.get_storage')
+def test_traffic_system_initialization(mock_storage, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
     mock_load_config.return_value = mock_config
     
     system = TrafficSystem("dummy_config.yaml")
@@ -59,8 +59,8 @@ def test_traffic_system_initialization(mock_minio, mock_worker, mock_ocr, mock_y
 @patch('core.traffic_system.YOLO')
 @patch('core.traffic_system.FastRecognizer')
 @patch('core.traffic_system.violation_save_worker')
-@patch('core.traffic_system.MinioClient')
-def test_update_config(mock_minio, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
+@patch('core.traffic_system.get_storage')
+def test_update_config(mock_storage, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
     mock_load_config.return_value = mock_config
     system = TrafficSystem()
     
@@ -74,8 +74,8 @@ def test_update_config(mock_minio, mock_worker, mock_ocr, mock_yolo, mock_load_c
 @patch('core.traffic_system.YOLO')
 @patch('core.traffic_system.FastRecognizer')
 @patch('core.traffic_system.violation_save_worker')
-@patch('core.traffic_system.MinioClient')
-def test_capture_first_frame(mock_minio, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
+@patch('core.traffic_system.get_storage')
+def test_capture_first_frame(mock_storage, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
     mock_load_config.return_value = mock_config
     system = TrafficSystem()
     
@@ -94,9 +94,28 @@ def test_capture_first_frame(mock_minio, mock_worker, mock_ocr, mock_yolo, mock_
 @patch('core.traffic_system.YOLO')
 @patch('core.traffic_system.FastRecognizer')
 @patch('core.traffic_system.violation_save_worker')
-@patch('core.traffic_system.MinioClient')
+@patch('core.traffic_system.get_storage')
+def test_plate_models_load_on_first_use(mock_storage, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
+    mock_load_config.return_value = {**mock_config, 'startup': {'preload_plate_models': False}}
+    system = TrafficSystem()
+    system.loader.wait(['vehicle', 'storage'])
+
+    assert not system.license_model.loaded
+    assert not system.character_model.loaded
+    mock_ocr.assert_not_called()
+
+    # First violation: the OCR model is loaded by the recognizer's call
+    system.character_model.run(np.zeros((64, 128, 3), dtype=np.uint8))
+    mock_ocr.assert_called_once()
+    assert system.loader.report()['ocr']['load_s'] is not None
+
+@patch('core.traffic_system.load_config')
+@patch('core.traffic_system.YOLO')
+@patch('core.traffic_system.FastRecognizer')
+@patch('core.traffic_system.violation_save_worker')
+@patch('core.traffic_system.get_storage')
 @patch('core.traffic_system.inference_video')
-def test_process_flow(mock_inference, mock_minio, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
+def test_process_flow(mock_inference, mock_storage, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
     mock_load_config.return_value = mock_config
     system = TrafficSystem()
     
@@ -134,3 +153,43 @@ def test_process_flow(mock_inference, mock_minio, mock_worker, mock_ocr, mock_yo
                 assert isinstance(frame, np.ndarray)
             except StopIteration:
                 pytest.fail("Generator stopped unexpectedly")
+
+            # The decoded frame is shared read-only, only the render copy is writable
+            assert not mock_result.orig_img.flags.writeable
+
+@patch('core.traffic_system.load_config')
+@patch('core.traffic_system.YOLO')
+@patch('core.traffic_system.FastRecognizer')
+@patch('core.traffic_system.violation_save_worker')
+@patch('core.traffic_system.get_storage')
+@patch('core.traffic_system.inference_video')
+def test_process_flow_pipelined(mock_inference, mock_storage, mock_worker, mock_ocr, mock_yolo, mock_load_config, mock_config):
+    mock_config['pipeline'] = {'enabled': True, 'queue_size': 2, 'render_workers': 2}
+    mock_load_config.return_value = mock_config
+    system = TrafficSystem()
+
+    results = []
+    for i in range(5):
+        result = MagicMock()
+        result.orig_img = np.full((480, 640, 3), i, dtype=np.uint8)
+        results.append(result)
+    mock_inference.return_value = results
+
+    system.tracker_instance = MagicMock()
+    system.tracker_instance.update.return_value = []
+    system.tracker_instance.get_tracked_objects.return_value = []
+
+    with patch('core.traffic_system.preprocess_detection_result') as mock_preprocess, \
+         patch('core.traffic_system.load_zones') as mock_load_zones:
+        mock_preprocess.side_effect = lambda result: (result.orig_img.copy(), np.empty((0, 6)))
+        mock_load_zones.return_value = {
+            'polygon': [[0, 0], [100, 0], [100, 100], [0, 100]],
+            'lines_config': {'violation_lines': [[0, 50], [100, 50]]}
+        }
+
+        system.running = True
+        frames = [frame for frame, _ in system._process_flow()]
+
+    # every frame comes out once, in order
+    assert [int(frame[0, 0, 0]) for frame in frames] == list(range(5))
+    assert system.pipeline.stats()['track']['processed'] == 5
@@ -0,0 +1,94 @@
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+from utils.storage import MinioClient, UploadMeter, MB
+
+
+class SlowS3:
+    """put_object taking 50 ms, counting the calls in flight"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.keys = []
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+            self.keys.append((Bucket, Key))
+
+
+def test_upload_many_runs_on_the_bounded_pool():
+    MinioClient.configure({'upload_threads': 4})
+    try:
+        s3 = SlowS3()
+        client = MinioClient.from_s3_client(s3)
+        uploads = [{'bucket': 'proofs', 'key': f"k{i}", 'body': b"abc"} for i in range(12)]
+        start = time.perf_counter()
+        assert client.upload_many(uploads) == [True] * 12
+        elapsed = time.perf_counter() - start
+    finally:
+        MinioClient.configure({})
+
+    assert s3.peak == 4
+    assert elapsed < 12 * 0.05 / 2
+    assert ('proofs', 'k11') in s3.keys
+    stats = client.upload_meter.stats()
+    assert stats['uploads'] == 12 and stats['bytes'] == 36 and stats['mean_ms'] >= 40
+
+
+def test_large_bodies_use_multipart_transfers(tmp_path):
+    MinioClient.configure({'multipart_threshold_mb': 1, 'multipart_chunksize_mb': 5, 'max_concurrency': 3})
+    try:
+        client = MinioClient.from_s3_client(MagicMock())
+    finally:
+        MinioClient.configure({})
+    assert client.transfer_config.max_request_concurrency == 3
+
+    assert client.upload_bytes(b"x" * 10, 'proofs', 'small')
+    assert client.upload_bytes(b"x" * (2 * MB), 'proofs', 'large')
+    assert client.s3.put_object.call_count == 1
+    assert client.s3.upload_fileobj.call_args.kwargs['Config'] is client.transfer_config
+
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"y" * 100)
+    assert client.upload_many([{'bucket': 'proofs', 'key': 'clip.mp4', 'path': str(path)}]) == [True]
+    assert client.s3.upload_file.call_args.args == (str(path), 'proofs', 'clip.mp4')
+
+
+def test_failed_uploads_are_counted():
+    s3 = MagicMock()
+    s3.put_object.side_effect = RuntimeError("connection reset")
+    client = MinioClient.from_s3_client(s3)
+    assert client.upload_many([{'bucket': 'retraining', 'key': 'a.txt', 'body': b"1"}]) == [False]
+    assert s3.put_object.call_args.kwargs['Bucket'] == 'retraining-data'
+    assert client.upload_meter.stats()['failed'] == 1
+
+
+def test_meter_throughput_is_over_wall_time():
+    meter = UploadMeter()
+    # Two concurrent 1 MB uploads over the same second
+    meter.record(MB, 10.0, 11.0)
+    meter.record(MB, 10.0, 11.0)
+    assert meter.stats()['mb_per_s'] == pytest.approx(2.0)
+    assert "2 uploads" in meter.format_stats()
+
+
+def test_uploads_against_a_local_s3_stand_in():
+    moto = pytest.importorskip("moto")
+    import boto3
+    with moto.mock_aws():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        client = MinioClient.from_s3_client(s3)
+        for bucket in client.buckets.values():
+            s3.create_bucket(Bucket=bucket)
+        uploads = [{'bucket': 'proofs', 'key': f"2026_01/proof_{i}.jpg", 'body': bytes([i]) * 1000,
+                    'content_type': 'image/jpeg'} for i in range(10)]
+        assert all(client.upload_many(uploads))
+        listed = s3.list_objects_v2(Bucket='proofs')['Contents']
+        assert sorted(obj['Key'] for obj in listed) == sorted(u['key'] for u in uploads)
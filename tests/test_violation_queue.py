@@ -0,0 +1,86 @@
+import queue
+import threading
+import time
+import numpy as np
+import pytest
+from utils.proof_buffer import EncodedClip
+from utils.violation_queue import ViolationQueue, item_nbytes
+
+FRAME_BYTES = 48 * 64 * 3
+
+
+def violation(i, frames=0, fps=30, encoded=False):
+    clip = [(k, np.zeros((48, 64, 3), dtype=np.uint8)) for k in range(frames)]
+    return {
+        'vehicle_id': i,
+        'frame': np.full((48, 64, 3), i, dtype=np.uint8),
+        'proof_crop': np.zeros((4, 4, 3), dtype=np.uint8),
+        'frame_buffer': EncodedClip(clip) if encoded else clip,
+        'fps': fps,
+    }
+
+
+def test_item_bytes_count_frame_crop_and_clip():
+    assert item_nbytes(violation(1)) == FRAME_BYTES + 48
+    assert item_nbytes(violation(1, frames=10, encoded=True)) == 11 * FRAME_BYTES + 48
+    assert item_nbytes(None) == 0
+
+
+def test_block_policy_waits_for_room_and_counts_it():
+    violation_queue = ViolationQueue(max_bytes=3 * FRAME_BYTES, policy='block')
+    violation_queue.put(violation(1, frames=1))
+    with pytest.raises(queue.Full):
+        violation_queue.put(violation(2, frames=1), block=False)
+
+    threading.Timer(0.1, violation_queue.get).start()
+    violation_queue.put(violation(3, frames=1))
+    stats = violation_queue.stats()
+    assert stats['items'] == 1 and stats['blocked'] == 1 and stats['blocked_s'] > 0.05
+    assert violation_queue.get()['vehicle_id'] == 3
+    assert violation_queue.stats()['bytes'] == 0
+
+
+def test_drop_oldest_keeps_the_newest_and_join_returns():
+    violation_queue = ViolationQueue(max_items=3, policy='drop_oldest')
+    for i in range(10):
+        violation_queue.put(violation(i))
+    violation_queue.put(None)  # The stop signal is always accepted
+    assert violation_queue.stats()['dropped'] == 7
+    received = []
+    while (item := violation_queue.get()) is not None:
+        received.append(item['vehicle_id'])
+        violation_queue.task_done()
+    violation_queue.task_done()
+    assert received == [7, 8, 9]
+    violation_queue.join()
+
+
+def test_degrade_thins_the_clip_to_fit():
+    violation_queue = ViolationQueue(max_bytes=20 * FRAME_BYTES, policy='degrade', min_fps=5)
+    violation_queue.put(violation(1, frames=8))
+    violation_queue.put(violation(2, frames=60, fps=30, encoded=True))
+    degraded = [violation_queue.get(), violation_queue.get()][1]
+    assert violation_queue.stats()['degraded'] == 1
+    # 60 frames at 30 fps -> 30 at 15 -> 15 at 7, still over, then the last 8 of them
+    assert degraded['fps'] == 7 and len(degraded['frame_buffer']) == 8
+    assert isinstance(degraded['frame_buffer'], EncodedClip)
+
+
+def test_spill_moves_the_violation_to_disk(tmp_path):
+    violation_queue = ViolationQueue(max_bytes=2 * FRAME_BYTES, policy='spill', spill_dir=str(tmp_path))
+    for i in range(5):
+        violation_queue.put(violation(i, frames=1, encoded=True))
+    stats = violation_queue.stats()
+    assert stats['spilled'] == 4 and stats['bytes'] == 2 * FRAME_BYTES + 48
+    assert len(list(tmp_path.iterdir())) == 4
+
+    items = [violation_queue.get() for _ in range(5)]
+    assert [item['vehicle_id'] for item in items] == list(range(5))
+    assert (items[3]['frame'] == 3).all() and len(items[3]['frame_buffer']) == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ViolationQueue(policy='shed')
+    assert ViolationQueue.from_config({'max_mb': 1, 'policy': 'spill'}).max_bytes == 1_000_000
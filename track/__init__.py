@@ -0,0 +1,21 @@
+"""
+Multi-object trackers.
+
+Names are imported from their submodule on first access, scipy (track.gating) is
+only imported when gating is used.
+"""
+
+from utils.lazy import lazy_attributes
+
+_ATTRIBUTES = {
+    'SORT': 'track.sort',
+    'ByteTrack': 'track.bytetrack',
+    'BaseTracker': 'track.base_tracker',
+    'KalmanBoxTracker': 'track.kalman_box_tracker',
+    'KalmanFilterBank': 'track.kalman_filter_bank',
+    'build_tracker': 'track.builder',
+}
+
+__getattr__, __dir__ = lazy_attributes(__name__, _ATTRIBUTES)
+
+__all__ = list(_ATTRIBUTES)
@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from track.utils import *
 from track.kalman_box_tracker import KalmanBoxTracker
+from track.kalman_filter_bank import KalmanFilterBank
+from track.gating import grid_candidate_pairs, split_into_blocks
 from track.utils import iou, ciou, diou
 
 class BaseTracker:
@@ -11,10 +14,17 @@ class BaseTracker:
         "diou": diou
     }
 
-    def __init__(self, tracker_class=KalmanBoxTracker, cost_function="iou"):
+    def __init__(self, tracker_class=KalmanBoxTracker, cost_function="iou", gating=False, gating_cell_size=None,
+                 assignment_workers=0):
         self.tracker_class = tracker_class
         self.cost_function = self.COST_FUNCTION[cost_function]
-        pass
+        # Spatial gating: only score detection/track pairs whose boxes overlap
+        self.gating = gating
+        self.gating_cell_size = gating_cell_size
+        # Optional thread pool solving the per-class assignment problems concurrently
+        self._executor = ThreadPoolExecutor(max_workers=assignment_workers) if assignment_workers > 1 else None
+        # Kalman states of every track live in one bank and are predicted/updated in batch
+        self.bank = KalmanFilterBank()
 
     def _associate_detections_to_trackers(self, detections, trackers):
         """Assigns detections to tracked object
@@ -29,6 +39,94 @@ class BaseTracker:
         """
         raise NotImplementedError("This method should be overridden by subclasses.")
 
+    def _solve_assignment(self, detections, trackers, threshold):
+        """Solve the class constrained detection-to-track assignment problem
+
+        Detections and trackers are split by class_id and one smaller LAP is solved per class,
+        instead of masking a full cross-class cost matrix. Classes are independent, so
+        the per-class results are simply merged back into full-size indices.
+
+        Args:
+            detections (ArrayLike): [x1, y1, x2, y2, score, class_id] rows
+            trackers (ArrayLike): [x1, y1, x2, y2, class_id] rows
+            threshold (float): cost threshold used for the one-to-one shortcut
+
+        Returns:
+            matched_indices (ArrayLike): (K, 2) pairs of [detection_index, tracker_index]
+            matched_costs (ArrayLike): (K,) cost of every pair, to be checked against the threshold
+        """
+        det_cls = detections[:, 5]
+        trk_cls = trackers[:, 4]
+        partitions = [(np.where(det_cls == c)[0], np.where(trk_cls == c)[0])
+                      for c in np.intersect1d(det_cls, trk_cls)]
+
+        def solve(partition):
+            rows, cols = partition
+            return self._solve_partition(detections[rows], trackers[cols], threshold)
+
+        if self._executor is not None and len(partitions) > 1:
+            results = list(self._executor.map(solve, partitions))
+        else:
+            results = [solve(partition) for partition in partitions]
+
+        matched_indices = [np.empty((0, 2), dtype=int)]
+        matched_costs = [np.empty(0)]
+        for (rows, cols), (matches, costs) in zip(partitions, results):
+            matched_indices.append(np.stack([rows[matches[:, 0]], cols[matches[:, 1]]], axis=1))
+            matched_costs.append(costs)
+        return np.concatenate(matched_indices, axis=0), np.concatenate(matched_costs)
+
+    def _solve_partition(self, detections, trackers, threshold):
+        """Solve the assignment between detections and trackers of a single class
+        """
+        if self.gating and threshold >= 0:
+            return self._solve_gated_assignment(detections, trackers, threshold)
+
+        cost_matrix = self._cost_matrix(detections, trackers)
+        matched_indices = self._solve_block(cost_matrix, threshold)
+        return matched_indices, cost_matrix[matched_indices[:, 0], matched_indices[:, 1]]
+
+    def _solve_gated_assignment(self, detections, trackers, threshold):
+        """Same as _solve_partition, but only overlapping pairs are scored.
+
+        Pairs without overlap have IoU = 0 (DIoU/CIoU < 0) and can never reach a
+        non-negative threshold, so the problem splits into independent blocks of
+        overlapping boxes which are solved one by one.
+        """
+        det_idx, trk_idx = grid_candidate_pairs(detections[:, :4], trackers[:, :4], self.gating_cell_size)
+
+        # A pair whose detection and tracker have no other candidate is a 1x1 block: matched directly
+        isolated = (np.bincount(det_idx, minlength=len(detections))[det_idx] == 1) & \
+            (np.bincount(trk_idx, minlength=len(trackers))[trk_idx] == 1)
+        matched_indices = [np.stack([det_idx[isolated], trk_idx[isolated]], axis=1)]
+        matched_costs = [self.cost_function(detections[det_idx[isolated]], trackers[trk_idx[isolated]])]
+
+        det_idx, trk_idx = det_idx[~isolated], trk_idx[~isolated]
+        for rows, cols in split_into_blocks(det_idx, trk_idx, len(detections), len(trackers)):
+            cost_matrix = self._cost_matrix(detections[rows], trackers[cols])
+            block_matches = self._solve_block(cost_matrix, threshold)
+            matched_indices.append(np.stack([rows[block_matches[:, 0]], cols[block_matches[:, 1]]], axis=1))
+            matched_costs.append(cost_matrix[block_matches[:, 0], block_matches[:, 1]])
+
+        return np.concatenate(matched_indices, axis=0), np.concatenate(matched_costs)
+
+    def _cost_matrix(self, detections, trackers):
+        """Cost between every detection and tracker of the same class
+        """
+        return self.cost_function(detections[:, np.newaxis], trackers[np.newaxis, :])
+
+    @staticmethod
+    def _solve_block(cost_matrix, threshold):
+        """Maximize total cost with lap, skipping the solver when the thresholded matrix is already one-to-one
+        """
+        if min(cost_matrix.shape) == 0:
+            return np.empty((0, 2), dtype=int)
+
+        a = (cost_matrix > threshold).astype(np.int32)
+        if a.sum(1).max() == 1 and a.sum(0).max() == 1:
+            return np.stack(np.where(a), axis=1)
+        return linear_assignment(-cost_matrix).reshape(-1, 2).astype(int)
+
     def update(self, dets=np.empty((0, 6))):
         """
         Params:
@@ -40,29 +138,15 @@ class BaseTracker:
         """
 
         self.frame_count += 1
-        tracks = np.zeros((len(self.trackers), 5))
-        to_del = []
         ret = []
 
-        for i in range(len(tracks)):
-            pos = self.trackers[i].predict()[0]
-            tracks[i, :] = [pos[0], pos[1], pos[2], pos[3], self.trackers[i].class_id]
-            if np.any(np.isnan(pos)):
-                to_del.append(i)
-
-        tracks = np.ma.compress_rows(np.ma.masked_invalid(tracks))
-        for t in reversed(to_del):
-            self.trackers.pop(t)
+        tracks = self._predict_tracks()
         matched, unmatched_dets, _ = self._associate_detections_to_trackers(dets, tracks)
 
-        for m in matched:
-            self.trackers[m[1]].update(dets[m[0], :4])
+        self._update_matched_tracks(matched, dets)
 
         for i in unmatched_dets:
-            bbox = dets[i, :4]
-            class_id = int(dets[i, 5])
-            tracker = self.tracker_class(bbox, class_id=class_id)
-            self.trackers.append(tracker)
+            self._create_track(dets[i])
 
         i = len(self.trackers)
         for tracker in reversed(self.trackers):
@@ -71,9 +155,78 @@ class BaseTracker:
             i -= 1
 
             if (tracker.time_since_update > self.max_age):
-                self.trackers.pop(i)
+                self._remove_track(i)
 
         return ret
+
+    def predict(self):
+        """
+        Kalman-only step for frames on which the detector was skipped.
+
+        All tracks are advanced by one frame, but hit streaks and time_since_update are
+        left untouched, so tracks are not aged out. Returns the same tracks that the last
+        update() returned, at their predicted positions.
+        """
+        slots = np.array([tracker.slot for tracker in self.trackers], dtype=int)
+        self.bank.predict(slots)
+
+        ret = []
+        for tracker in reversed(self.trackers):
+            if (tracker.time_since_update < 1) and (tracker.hit_streak >= self.min_hits or self.frame_count <= self.min_hits):
+                ret.append(tracker)
+        return ret
+
+    def _predict_tracks(self):
+        """Predict every live track one step ahead in a single batched bank operation
+
+        Returns:
+            ArrayLike: (N, 5) predicted boxes with class id [x1, y1, x2, y2, class_id].
+            Tracks whose prediction became invalid (NaN) are removed.
+        """
+        slots = np.array([tracker.slot for tracker in self.trackers], dtype=int)
+        self.bank.predict(slots)
+
+        tracks = np.zeros((len(self.trackers), 5))
+        tracks[:, :4] = convert_x_to_bboxes(self.bank.x[slots])
+        tracks[:, 4] = [tracker.class_id for tracker in self.trackers]
+
+        for i, tracker in enumerate(self.trackers):
+            tracker.mark_predicted(tracks[i:i + 1, :4])
+        to_del = np.where(np.isnan(tracks[:, :4]).any(axis=1))[0]
+
+        tracks = np.ma.compress_rows(np.ma.masked_invalid(tracks))
+        for t in reversed(to_del):
+            self._remove_track(t)
+        return tracks
+
+    def _update_matched_tracks(self, matched, dets):
+        """Correct all matched tracks with their detections in a single batched bank operation
+
+        Args:
+            matched (ArrayLike): (K, 2) pairs of [detection_index, tracker_index]
+            dets (ArrayLike): detections [x1, y1, x2, y2, score, cls]
+        """
+        if len(matched) == 0:
+            return
+        matched = np.asarray(matched, dtype=int)
+        slots = [self.trackers[t].slot for t in matched[:, 1]]
+        self.bank.update(slots, convert_bboxes_to_z(dets[matched[:, 0], :4]))
+        for t in matched[:, 1]:
+            self.trackers[t].mark_updated()
+
+    def _create_track(self, det):
+        """Start a new track in the shared bank from a detection [x1, y1, x2, y2, score, cls]
+        """
+        tracker = self.tracker_class(det[:4], class_id=int(det[5]), bank=self.bank)
+        self.trackers.append(tracker)
+        return tracker
+
+    def _remove_track(self, i):
+        """Remove the i-th track and release its bank row
+        """
+        tracker = self.trackers.pop(i)
+        tracker.release()
+        return tracker
     
     def get_tracked_objects(self):
         """Get currently tracked objects
@@ -0,0 +1,40 @@
+from track.sort import SORT
+from track.bytetrack import ByteTrack
+from track.kalman_box_tracker import KalmanBoxTracker
+
+
+def build_tracker(tracker_name, cfg, tracker_class=KalmanBoxTracker):
+    """Create a tracker from its section of config.yaml (tracking.sort / tracking.bytetrack)
+
+    Args:
+        tracker_name (str): 'sort' or 'bytetrack'
+        cfg (dict): tracker parameters
+        tracker_class (type, optional): class of the tracked objects. Defaults to KalmanBoxTracker.
+
+    Returns:
+        BaseTracker: the tracker instance
+    """
+    if tracker_name == 'sort':
+        return SORT(
+            cost_function=cfg['cost_function'],
+            max_age=cfg['max_age'],
+            min_hits=cfg['min_hits'],
+            iou_threshold=cfg['iou_threshold'],
+            tracker_class=tracker_class,
+            gating=cfg.get('gating', False),
+            assignment_workers=cfg.get('assignment_workers', 0)
+        )
+    elif tracker_name == 'bytetrack':
+        return ByteTrack(
+            cost_function=cfg['cost_function'],
+            max_age=cfg['max_age'],
+            min_hits=cfg['min_hits'],
+            high_conf_threshold=cfg['high_conf_threshold'],
+            low_conf_threshold=cfg['low_conf_threshold'],
+            high_conf_iou_threshold=cfg['high_conf_iou_threshold'],
+            low_conf_iou_threshold=cfg['low_conf_iou_threshold'],
+            tracker_class=tracker_class,
+            gating=cfg.get('gating', False),
+            assignment_workers=cfg.get('assignment_workers', 0)
+        )
+    raise ValueError(f"Unknown tracker: {tracker_name}")
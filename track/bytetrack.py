@@ -8,8 +8,11 @@ class ByteTrack(BaseTracker):
 
     def __init__(self, cost_function="iou", max_age=1, min_hits=3, 
                  high_conf_iou_threshold=0.5, low_conf_iou_threshold=0.4,
-                 high_conf_threshold=0.5, low_conf_threshold=0.1, tracker_class=KalmanBoxTracker):
-        super().__init__(tracker_class=tracker_class, cost_function=cost_function)
+                 high_conf_threshold=0.5, low_conf_threshold=0.1, tracker_class=KalmanBoxTracker,
+                 gating=False, gating_cell_size=None, assignment_workers=0):
+        super().__init__(tracker_class=tracker_class, cost_function=cost_function,
+                         gating=gating, gating_cell_size=gating_cell_size,
+                         assignment_workers=assignment_workers)
         self.max_age = max_age
         self.min_hits = min_hits
         self.high_conf_iou_threshold = high_conf_iou_threshold
@@ -33,68 +36,42 @@ class ByteTrack(BaseTracker):
         low_indices = np.where(low_mask)[0]
 
         if len(high_conf_dets) > 0:
-            high_conf_iou_matrix = self.cost_function(high_conf_dets[:, np.newaxis], trackers[np.newaxis, :])
-            
-            # Class constraint for high conf detections
-            det_cls = high_conf_dets[:, 5]
-            trk_cls = trackers[:, 4]
-            class_match_mask = (det_cls[:, np.newaxis] == trk_cls[np.newaxis, :])
-            high_conf_iou_matrix = high_conf_iou_matrix * class_match_mask
-
-            if min(high_conf_iou_matrix.shape) > 0:
-                a = (high_conf_iou_matrix > self.high_conf_iou_threshold).astype(np.int32)
-                if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-                    matched_indices = np.stack(np.where(a), axis=1)
-                else:
-                    matched_indices = linear_assignment(-high_conf_iou_matrix)
-            else:
-                matched_indices = np.empty((0, 2), dtype=int)
+            matched_indices, matched_costs = self._solve_assignment(high_conf_dets, trackers, self.high_conf_iou_threshold)
         else:
-            matched_indices = np.empty((0, 2), dtype=int)
+            matched_indices, matched_costs = np.empty((0, 2), dtype=int), np.empty(0)
 
         matches = []
-        unmatched_detections = high_indices.tolist()
-        unmatched_trackers = list(range(len(trackers)))
+        matched_dets = set()
+        matched_trks = set()
 
-        for m in matched_indices:
+        for m, cost in zip(matched_indices, matched_costs):
             det_idx = high_indices[m[0]]
             tracker_idx = m[1]
-            if high_conf_iou_matrix[m[0], m[1]] >= self.high_conf_iou_threshold:
+            if cost >= self.high_conf_iou_threshold:
                 matches.append([det_idx, tracker_idx])
-                unmatched_detections.remove(det_idx)
-                if tracker_idx in unmatched_trackers:
-                    unmatched_trackers.remove(tracker_idx)
+                matched_dets.add(det_idx)
+                matched_trks.add(tracker_idx)
+
+        unmatched_detections = [d for d in high_indices.tolist() if d not in matched_dets]
+        unmatched_trackers = [t for t in range(len(trackers)) if t not in matched_trks]
 
         if len(low_conf_dets) > 0 and len(unmatched_trackers) > 0:
-            low_conf_iou_matrix = self.cost_function(low_conf_dets[:, np.newaxis], trackers[unmatched_trackers][np.newaxis, :])
-            
-            # Class constraint for low conf detections
-            det_cls = low_conf_dets[:, 5]
-            trk_cls = trackers[unmatched_trackers][:, 4]
-            class_match_mask = (det_cls[:, np.newaxis] == trk_cls[np.newaxis, :])
-            low_conf_iou_matrix = low_conf_iou_matrix * class_match_mask
-
-            if min(low_conf_iou_matrix.shape) > 0:
-                a = (low_conf_iou_matrix > self.low_conf_iou_threshold).astype(np.int32)
-                if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-                    low_matched = np.stack(np.where(a), axis=1)
-                else:
-                    low_matched = linear_assignment(-low_conf_iou_matrix)
+            low_matched, low_costs = self._solve_assignment(low_conf_dets, trackers[unmatched_trackers], self.low_conf_iou_threshold)
 
+            if len(low_matched) > 0:
                 matches_to_remove = []
 
-                for lm in low_matched:
+                for lm, cost in zip(low_matched, low_costs):
                     det_idx = low_indices[lm[0]]
                     tracker_rel_idx = lm[1]
-                    if low_conf_iou_matrix[lm[0], tracker_rel_idx] >= self.low_conf_iou_threshold:
+                    if cost >= self.low_conf_iou_threshold:
                         tracker_idx = unmatched_trackers[tracker_rel_idx]
                         matches.append([det_idx, tracker_idx])
                         matches_to_remove.append(tracker_idx)
 
                 # Remove AFTER the loop
-                for tracker in matches_to_remove:
-                    if tracker in unmatched_trackers:
-                        unmatched_trackers.remove(tracker)
+                matches_to_remove = set(matches_to_remove)
+                unmatched_trackers = [t for t in unmatched_trackers if t not in matches_to_remove]
             
         if len(matches) > 0:
             matches = np.array(matches)
@@ -114,30 +91,16 @@ class ByteTrack(BaseTracker):
         """
 
         self.frame_count += 1
-        tracks = np.zeros((len(self.trackers), 5))
-        to_del = []
         ret = []
 
-        for i in range(len(tracks)):
-            pos = self.trackers[i].predict()[0]
-            tracks[i, :] = [pos[0], pos[1], pos[2], pos[3], self.trackers[i].class_id]
-            if np.any(np.isnan(pos)):
-                to_del.append(i)
-
-        tracks = np.ma.compress_rows(np.ma.masked_invalid(tracks))
-        for t in reversed(to_del):
-            self.trackers.pop(t)
+        tracks = self._predict_tracks()
         matched, unmatched_dets, unmatched_trks = self._associate_detections_to_trackers(dets, tracks)
 
-        for m in matched:
-            self.trackers[m[1]].update(dets[m[0], :4])
+        self._update_matched_tracks(matched, dets)
 
         for i in unmatched_dets:
             if dets[i, 4] >= self.high_conf_threshold:
-                bbox = dets[i, :4]
-                class_id = int(dets[i, 5])
-                tracker = self.tracker_class(bbox, class_id=class_id)
-                self.trackers.append(tracker)
+                self._create_track(dets[i])
 
         i = len(self.trackers)
         for tracker in reversed(self.trackers):
@@ -146,6 +109,6 @@ class ByteTrack(BaseTracker):
             i -= 1
 
             if (tracker.time_since_update > self.max_age):
-                self.trackers.pop(i)
+                self._remove_track(i)
 
         return ret
\ No newline at end of file
@@ -0,0 +1,120 @@
+import numpy as np
+
+
+def _expand_to_cells(boxes, cell_size):
+    """Expand boxes into (cell_key, box_index) pairs for every grid cell they touch
+
+    Args:
+        boxes (ArrayLike): (N, 4+) boxes (x1, y1, x2, y2, ...)
+        cell_size (float): grid cell size in pixels
+
+    Returns:
+        keys, indices (ArrayLike): cell key and box index for every touched cell
+    """
+    cx1 = np.floor(boxes[:, 0] / cell_size).astype(np.int64)
+    cy1 = np.floor(boxes[:, 1] / cell_size).astype(np.int64)
+    cx2 = np.floor(boxes[:, 2] / cell_size).astype(np.int64)
+    cy2 = np.floor(boxes[:, 3] / cell_size).astype(np.int64)
+    nx = np.maximum(cx2 - cx1 + 1, 1)
+    ny = np.maximum(cy2 - cy1 + 1, 1)
+    counts = nx * ny
+
+    indices = np.repeat(np.arange(len(boxes)), counts)
+    # position of every cell inside its own box's cell range
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    gx = cx1[indices] + local % nx[indices]
+    gy = cy1[indices] + local // nx[indices]
+
+    # pack (gx, gy) into one integer key
+    keys = (gx << 32) ^ (gy & 0xFFFFFFFF)
+    return keys, indices
+
+
+def grid_candidate_pairs(boxes_a, boxes_b, cell_size=None):
+    """Find every pair of overlapping boxes with a uniform spatial grid
+
+    Boxes of ``boxes_b`` are bucketed into square cells, boxes of ``boxes_a`` only
+    look up the cells they touch, so the work grows with the number of real
+    neighbours instead of len(boxes_a) * len(boxes_b).
+
+    Args:
+        boxes_a (ArrayLike): (N, 4+) boxes (x1, y1, x2, y2, ...), e.g. detections
+        boxes_b (ArrayLike): (M, 4+) boxes (x1, y1, x2, y2, ...), e.g. predicted tracks
+        cell_size (float, optional): grid cell size. Defaults to the median side of boxes_b.
+
+    Returns:
+        idx_a, idx_b (ArrayLike): indices of the pairs whose boxes overlap
+    """
+    empty = np.empty(0, dtype=int)
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return empty, empty
+
+    boxes_a = np.asarray(boxes_a, dtype=float)
+    boxes_b = np.asarray(boxes_b, dtype=float)
+    if cell_size is None:
+        sides = np.maximum(boxes_b[:, 2] - boxes_b[:, 0], boxes_b[:, 3] - boxes_b[:, 1])
+        cell_size = np.median(sides)
+    cell_size = max(float(cell_size), 1.0)
+
+    keys_b, idx_b = _expand_to_cells(boxes_b, cell_size)
+    order = np.argsort(keys_b, kind="stable")
+    keys_b, idx_b = keys_b[order], idx_b[order]
+
+    keys_a, idx_a = _expand_to_cells(boxes_a, cell_size)
+    left = np.searchsorted(keys_b, keys_a, side="left")
+    right = np.searchsorted(keys_b, keys_a, side="right")
+    counts = right - left
+    if counts.sum() == 0:
+        return empty, empty
+
+    pair_a = np.repeat(idx_a, counts)
+    pos = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(left, counts)
+    pair_b = idx_b[pos]
+
+    # Boxes sharing several cells show up several times
+    pair_keys = np.unique(pair_a * len(boxes_b) + pair_b)
+    pair_a, pair_b = pair_keys // len(boxes_b), pair_keys % len(boxes_b)
+
+    # Exact overlap test on the (few) candidates
+    a, b = boxes_a[pair_a], boxes_b[pair_b]
+    overlap = (np.minimum(a[:, 2], b[:, 2]) > np.maximum(a[:, 0], b[:, 0])) & \
+        (np.minimum(a[:, 3], b[:, 3]) > np.maximum(a[:, 1], b[:, 1]))
+    return pair_a[overlap], pair_b[overlap]
+
+
+def split_into_blocks(idx_a, idx_b, n_a, n_b):
+    """Split candidate pairs into independent assignment subproblems
+
+    Rows and columns linked by a candidate pair belong to the same block. Blocks share
+    no candidate pair, so solving each block separately gives the same assignment as
+    solving the block-diagonal whole.
+
+    Args:
+        idx_a, idx_b (ArrayLike): candidate pair indices
+        n_a, n_b (int): total number of rows / columns
+
+    Returns:
+        list: (rows, cols) index arrays of every block with at least one candidate pair
+    """
+    if len(idx_a) == 0:
+        return []
+    # scipy is only needed when gating is enabled
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    # bipartite graph: rows are nodes [0, n_a), columns are nodes [n_a, n_a + n_b)
+    graph = coo_matrix((np.ones(len(idx_a)), (idx_a, idx_b + n_a)), shape=(n_a + n_b, n_a + n_b))
+    _, labels = connected_components(graph, directed=False)
+
+    row_labels = labels[:n_a]
+    col_labels = labels[n_a:]
+    used = np.unique(labels[idx_a])
+
+    rows = np.argsort(row_labels, kind="stable")
+    cols = np.argsort(col_labels, kind="stable")
+    row_start = np.searchsorted(row_labels[rows], used, side="left")
+    row_end = np.searchsorted(row_labels[rows], used, side="right")
+    col_start = np.searchsorted(col_labels[cols], used, side="left")
+    col_end = np.searchsorted(col_labels[cols], used, side="right")
+
+    return [(rows[rs:re], cols[cs:ce]) for rs, re, cs, ce in zip(row_start, row_end, col_start, col_end)]
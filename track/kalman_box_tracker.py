@@ -1,48 +1,23 @@
 from track.utils import *
-from filterpy.kalman import KalmanFilter
+from track.kalman_filter_bank import KalmanFilterBank
 
 class KalmanBoxTracker:
     """
-    This class represent the state of individual tracked object observed
+    This class represent the state of individual tracked object observed.
+    The Kalman state itself lives in one row (slot) of a KalmanFilterBank, shared by all
+    tracks of a tracker so they can be predicted/updated in batch.
     """
     count = 0
-    def __init__(self, bbox, class_id=-1, **kwargs):
+    def __init__(self, bbox, class_id=-1, bank=None, **kwargs):
         """
         Initialize a tracker using initial bounding box.
 
-        Args:   
+        Args:
             bbox (ArrayLike): (x1, y1, x2, y2)
+            bank (KalmanFilterBank, optional): shared filter bank. A private one is created if None.
         """
-        self.kf = KalmanFilter(dim_x=7, dim_z=4)
-        self.kf.F = np.array([[1, 0, 0, 0, 1, 0, 0],
-                              [0, 1, 0, 0, 0, 1, 0],
-                              [0, 0, 1, 0, 0, 0, 1],
-                              [0, 0, 0, 1, 0, 0, 0],
-                              [0, 0, 0, 0, 1, 0, 0],
-                              [0, 0, 0, 0, 0, 1, 0],
-                              [0, 0, 0, 0, 0, 0, 1]])
-
-        self.kf.H = np.array([[1, 0, 0, 0, 0, 0, 0],
-                              [0, 1, 0, 0, 0, 0, 0],
-                              [0, 0, 1, 0, 0, 0, 0],
-                              [0, 0, 0, 1, 0, 0, 0]])
-        
-
-        self.kf.R[2:,2:] *= 10.
-        self.kf.P[4:,4:] *= 1000. #give high uncertainty to the unobservable initial velocities
-        self.kf.P *= 10.
-        self.kf.Q[-1,-1] *= 0.01
-        self.kf.Q[4:,4:] *= 0.01
-
-        # self.kf.R[2:,2:] *= 2.
-        # self.kf.R[:2, :2] *= 0.1
-        # self.kf.P[4:,4:] *= 1000. # give high uncertainty to the unobservable initial velocities
-        # self.kf.P *= 10.
-
-        # self.kf.Q[-1,-1] *= 0.02
-        # self.kf.Q[4:,4:] *= 0.02
-
-        self.kf.x[:4] = convert_bbox_to_z(bbox)
+        self.bank = bank if bank is not None else KalmanFilterBank(capacity=1)
+        self.slot = self.bank.allocate(convert_bbox_to_z(bbox))
 
         self.time_since_update = 0
         self.id = KalmanBoxTracker.count
@@ -53,37 +28,54 @@ class KalmanBoxTracker:
         self.hit_streak = 0
         self.age = 0
 
+    @property
+    def x(self):
+        """Current Kalman state (x, y, s, r, vx, vy, vs), a view on the bank row
+        """
+        return self.bank.x[self.slot]
+
     def update(self, bbox):
         """Update the state with observed bbox
 
         Args:
             bbox (ArrayLike): The predicted bbox (x1, y1, x2, y2) from YOLO model
         """
+        self.bank.update([self.slot], convert_bbox_to_z(bbox).reshape(1, 4))
+        self.mark_updated()
+
+    def mark_updated(self):
+        """Bookkeeping after the bank row has been corrected with a measurement
+        """
         self.time_since_update = 0
         self.history = []
         self.hits += 1
         self.hit_streak += 1
-        self.kf.update(convert_bbox_to_z(bbox))
 
     def predict(self):
         """Predict the bbox in the next frame using KF
         """
-        # Prevent scale from becoming negative
-        if (self.kf.x[6] + self.kf.x[2] <= 0):
-            self.kf.x[6] *= 0.0
+        self.bank.predict([self.slot])
+        return self.mark_predicted(self.get_state())
 
-        self.kf.predict()
+    def mark_predicted(self, bbox):
+        """Bookkeeping after the bank row has been predicted one step ahead
 
+        Args:
+            bbox (ArrayLike): (1, 4) predicted bbox
+        """
         self.age += 1
         if (self.time_since_update > 0):
             self.hit_streak =0
         self.time_since_update += 1
-        self.history.append(convert_x_to_bbox(self.kf.x))
+        self.history.append(bbox)
         return self.history[-1]
-    
+
     def get_state(self):
         """Return current bbox estimate
         """
-        return convert_x_to_bbox(self.kf.x)
-    
+        return convert_x_to_bbox(self.x)
 
+    def release(self):
+        """Give the bank row back to the shared bank, keeping a private copy of the last state
+        """
+        self.bank, self.slot = self.bank.detach(self.slot)
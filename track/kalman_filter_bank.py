@@ -0,0 +1,158 @@
+import numpy as np
+
+
+class KalmanFilterBank:
+    """Struct-of-arrays bank of constant velocity Kalman filters in (x, y, s, r) space.
+
+    Every tracked object owns one row (slot) of the stacked state ``x`` (capacity, 7) and
+    covariance ``P`` (capacity, 7, 7) arrays, so all live tracks can be predicted and updated
+    with a handful of batched matrix operations instead of one ``filterpy.KalmanFilter`` per object.
+    The maths follow ``filterpy.kalman.KalmanFilter`` (including the Joseph form covariance update),
+    so every row evolves exactly like the per-object filter used by the original ``KalmanBoxTracker``.
+    """
+    dim_x = 7
+    dim_z = 4
+
+    F = np.array([[1, 0, 0, 0, 1, 0, 0],
+                  [0, 1, 0, 0, 0, 1, 0],
+                  [0, 0, 1, 0, 0, 0, 1],
+                  [0, 0, 0, 1, 0, 0, 0],
+                  [0, 0, 0, 0, 1, 0, 0],
+                  [0, 0, 0, 0, 0, 1, 0],
+                  [0, 0, 0, 0, 0, 0, 1]], dtype=float)
+
+    H = np.array([[1, 0, 0, 0, 0, 0, 0],
+                  [0, 1, 0, 0, 0, 0, 0],
+                  [0, 0, 1, 0, 0, 0, 0],
+                  [0, 0, 0, 1, 0, 0, 0]], dtype=float)
+
+    def __init__(self, capacity=64):
+        """Initialize an empty bank.
+
+        Args:
+            capacity (int, optional): Initial number of slots. The bank grows automatically. Defaults to 64.
+        """
+        self.R = np.eye(self.dim_z)
+        self.R[2:, 2:] *= 10.
+
+        self.P0 = np.eye(self.dim_x)
+        self.P0[4:, 4:] *= 1000. # give high uncertainty to the unobservable initial velocities
+        self.P0 *= 10.
+
+        self.Q = np.eye(self.dim_x)
+        self.Q[-1, -1] *= 0.01
+        self.Q[4:, 4:] *= 0.01
+
+        self._I = np.eye(self.dim_x)
+
+        capacity = max(1, int(capacity))
+        self.x = np.zeros((capacity, self.dim_x))
+        self.P = np.zeros((capacity, self.dim_x, self.dim_x))
+        self.active = np.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def _grow(self):
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2
+
+        x = np.zeros((new_capacity, self.dim_x))
+        P = np.zeros((new_capacity, self.dim_x, self.dim_x))
+        active = np.zeros(new_capacity, dtype=bool)
+        x[:old_capacity] = self.x
+        P[:old_capacity] = self.P
+        active[:old_capacity] = self.active
+
+        self.x, self.P, self.active = x, P, active
+        self._free.extend(range(new_capacity - 1, old_capacity - 1, -1))
+
+    def allocate(self, z):
+        """Allocate a slot for a new track initialized from a measurement.
+
+        Args:
+            z (ArrayLike): Initial measurement (x, y, s, r)
+
+        Returns:
+            int: The slot index owned by the new track
+        """
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+
+        self.x[slot] = 0.
+        self.x[slot, :self.dim_z] = np.asarray(z, dtype=float).reshape(-1)
+        self.P[slot] = self.P0
+        self.active[slot] = True
+        return slot
+
+    def free(self, slot):
+        """Return a slot to the bank so it can be reused by a new track.
+        """
+        if self.active[slot]:
+            self.active[slot] = False
+            self._free.append(slot)
+
+    def detach(self, slot):
+        """Move a slot into its own single-slot bank and free it here.
+
+        Used when a track leaves a tracker, so objects still holding a reference
+        to it keep reading their last state instead of a reused row.
+
+        Returns:
+            tuple: (bank, slot) of the detached copy
+        """
+        bank = KalmanFilterBank(capacity=1)
+        new_slot = bank._free.pop()
+        bank.x[new_slot] = self.x[slot]
+        bank.P[new_slot] = self.P[slot]
+        bank.active[new_slot] = True
+        self.free(slot)
+        return bank, new_slot
+
+    def predict(self, slots):
+        """Advance the given slots by one time step.
+
+        Args:
+            slots (ArrayLike): Slot indices to predict
+        """
+        slots = np.asarray(slots, dtype=int)
+        if len(slots) == 0:
+            return
+
+        x = self.x[slots]
+        # Prevent scale from becoming negative
+        x[x[:, 6] + x[:, 2] <= 0, 6] *= 0.0
+
+        self.x[slots] = x @ self.F.T
+        self.P[slots] = self.F @ self.P[slots] @ self.F.T + self.Q
+
+    def update(self, slots, z):
+        """Correct the given slots with their observed measurements.
+
+        Args:
+            slots (ArrayLike): Slot indices to update, must be unique
+            z (ArrayLike): (len(slots), 4) measurements in (x, y, s, r) format
+        """
+        slots = np.asarray(slots, dtype=int)
+        if len(slots) == 0:
+            return
+
+        z = np.asarray(z, dtype=float).reshape(len(slots), self.dim_z)
+        x = self.x[slots]
+        P = self.P[slots]
+
+        y = z - x @ self.H.T
+        PHT = P @ self.H.T
+        S = self.H @ PHT + self.R
+        K = PHT @ np.linalg.inv(S)
+
+        self.x[slots] = x + (K @ y[..., np.newaxis])[..., 0]
+
+        I_KH = self._I - K @ self.H
+        self.P[slots] = I_KH @ P @ I_KH.transpose(0, 2, 1) + K @ self.R @ K.transpose(0, 2, 1)
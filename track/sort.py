@@ -6,8 +6,11 @@ class SORT(BaseTracker):
     """This is the SORT (Simple Online and Realtime Tracking) algorithm for Object Tracking
     """
 
-    def __init__(self, cost_function="iou", max_age=1, min_hits=3, iou_threshold=0.3, tracker_class=KalmanBoxTracker):
-        super().__init__(tracker_class=tracker_class, cost_function=cost_function)
+    def __init__(self, cost_function="iou", max_age=1, min_hits=3, iou_threshold=0.3, tracker_class=KalmanBoxTracker,
+                 gating=False, gating_cell_size=None, assignment_workers=0):
+        super().__init__(tracker_class=tracker_class, cost_function=cost_function,
+                         gating=gating, gating_cell_size=gating_cell_size,
+                         assignment_workers=assignment_workers)
         self.max_age = max_age
         self.min_hits = min_hits
         self.iou_threshold = iou_threshold
@@ -29,43 +32,17 @@ class SORT(BaseTracker):
         if (len(trackers) == 0):
             return np.empty((0, 2), dtype=int), np.arange(len(detections)), np.empty((0, 5), dtype=int)
         
-        cost_matrix = self.cost_function(detections[:, np.newaxis], trackers[np.newaxis, :])
+        matched_indices, matched_costs = self._solve_assignment(detections, trackers, self.iou_threshold)
 
-        # Apply class constraint
-        # detections: [x1, y1, x2, y2, score, class_id]
-        # trackers: [x1, y1, x2, y2, class_id]
-        det_cls = detections[:, 5]
-        trk_cls = trackers[:, 4]
+        matched_dets = set(matched_indices[:, 0].tolist())
+        unmatched_detections = [d for d in range(len(detections)) if d not in matched_dets]
 
-        # Create a mask where classes match (1 if match, 0 if not)
-        # We need to broadcast to shape (num_dets, num_tracks)
-        class_match_mask = (det_cls[:, np.newaxis] == trk_cls[np.newaxis, :])
-        
-        # Set IOU to 0 where classes don't match
-        cost_matrix = cost_matrix * class_match_mask
-
-        if min(cost_matrix.shape) > 0:
-            a = (cost_matrix > self.iou_threshold).astype(np.int32)
-            if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-                matched_indices = np.stack(np.where(a), axis=1)
-            else:
-                matched_indices = linear_assignment(-cost_matrix)
-        else:
-            matched_indices = np.empty((0, 2), dtype=int)
-
-        unmatched_detections = []
-        for d, _ in enumerate(detections):
-            if (d not in matched_indices[:, 0]):
-                unmatched_detections.append(d)
-
-        unmatched_trackers = []
-        for t, _ in enumerate(trackers):
-            if (t not in matched_indices[:, 1]):
-                unmatched_trackers.append(t)
+        matched_trks = set(matched_indices[:, 1].tolist())
+        unmatched_trackers = [t for t in range(len(trackers)) if t not in matched_trks]
 
         matches = []
-        for m in matched_indices:
-            if (cost_matrix[m[0], m[1]] < self.iou_threshold):
+        for m, cost in zip(matched_indices, matched_costs):
+            if (cost < self.iou_threshold):
                 unmatched_detections.append(m[0])
                 unmatched_trackers.append(m[1])
             else:
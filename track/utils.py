@@ -127,4 +127,33 @@ def convert_x_to_bbox(x, score=None):
     if score is None:
         return np.array([x1, y1, x2, y2]).reshape((1, 4))
     else:
-        return np.array([x1, y1, x2, y2, score]).reshape((1, 5))
\ No newline at end of file
+        return np.array([x1, y1, x2, y2, score]).reshape((1, 5))
+def convert_bboxes_to_z(bboxes):
+    """Vectorized convert_bbox_to_z for a batch of bounding boxes
+
+    Args:
+        bboxes (ArrayLike): (N, 4+) boxes (x1, y1, x2, y2, ...)
+    Returns:
+        ArrayLike: (N, 4) measurements (x, y, s, r)
+    """
+    bboxes = np.atleast_2d(np.asarray(bboxes, dtype=float))
+    w = bboxes[:, 2] - bboxes[:, 0]
+    h = bboxes[:, 3] - bboxes[:, 1]
+    x = bboxes[:, 0] + w / 2.0
+    y = bboxes[:, 1] + h / 2.0
+    s = w * h
+    r = w / (h + 1e-6)
+    return np.stack([x, y, s, r], axis=1)
+
+def convert_x_to_bboxes(x):
+    """Vectorized convert_x_to_bbox for a batch of states
+
+    Args:
+        x (ArrayLike): (N, 4+) states (x, y, s, r, ...)
+    Returns:
+        ArrayLike: (N, 4) boxes (x1, y1, x2, y2)
+    """
+    w = np.sqrt(x[:, 2] * x[:, 3])
+    h = x[:, 2] / (w + 1e-6)
+    return np.stack([x[:, 0] - w / 2.0, x[:, 1] - h / 2.0,
+                     x[:, 0] + w / 2.0, x[:, 1] + h / 2.0], axis=1)
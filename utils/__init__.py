@@ -4,38 +4,44 @@ Utils package for Traffic Violation Detection System.
 This module re-exports commonly used utilities for convenient imports.
 """
 
-# Configuration
-from utils.config import load_config, save_config
+from utils.lazy import lazy_attributes
 
-# Zone management
-from utils.zones import load_zones, save_zones
-
-# Storage
-from utils.storage import MinioClient
-
-# Logging
-from utils.logger import (
-    get_logger,
-    get_system_logger,
-    log_violation,
-    log_performance,
-    log_upload
-)
-
-# Drawing and rendering
-from utils.drawing import (
-    draw_polygon_zone,
-    draw_light_zone,
-    draw_line_zone
-)
-from utils.rendering import draw_violation_overlay, draw_traffic_light_state, render_frame
-
-# I/O utilities
-from utils.workers import violation_save_worker
-from utils.file_utils import ensure_output_dirs, handle_result_filename
+# Names are imported from their submodule on first access, so importing one helper
+# (e.g. parse_args_eval) does not pull in boto3, supervision and cv2
+_ATTRIBUTES = {
+    # Configuration
+    'load_config': 'utils.config', 'save_config': 'utils.config',
+    # Zone management
+    'load_zones': 'utils.zones', 'save_zones': 'utils.zones',
+    # Storage
+    'MinioClient': 'utils.storage', 'StorageBackend': 'utils.storage', 'LocalStorage': 'utils.storage',
+    'MemoryStorage': 'utils.storage', 'get_storage': 'utils.storage', 'configure_storage': 'utils.storage',
+    # Logging
+    'get_logger': 'utils.logger', 'get_system_logger': 'utils.logger', 'log_violation': 'utils.logger',
+    'log_performance': 'utils.logger', 'log_upload': 'utils.logger',
+    # Drawing and rendering
+    'draw_polygon_zone': 'utils.drawing', 'draw_light_zone': 'utils.drawing', 'draw_line_zone': 'utils.drawing',
+    'draw_violation_overlay': 'utils.rendering', 'draw_traffic_light_state': 'utils.rendering',
+    'render_frame': 'utils.rendering', 'track_labels': 'utils.rendering',
+    # Frame ownership
+    'share_frame': 'utils.frames', 'copy_frame': 'utils.frames', 'frame_copy_meter': 'utils.frames',
+    # Proof clips
+    'ProofFrameBuffer': 'utils.proof_buffer',
+    'SharedFrameRing': 'utils.frame_ring', 'SharedProofBuffer': 'utils.frame_ring',
+    'SegmentRecorder': 'utils.segment_recorder', 'BboxTimeline': 'utils.bbox_timeline',
+    # I/O utilities
+    'violation_save_worker': 'utils.workers', 'EvidenceSaver': 'utils.workers', 'EvidenceSpool': 'utils.spool',
+    'ShardWriter': 'utils.shards', 'ViolationQueue': 'utils.violation_queue',
+    'ensure_output_dirs': 'utils.file_utils', 'handle_result_filename': 'utils.file_utils',
+    # CLI argument parsing
+    'parse_args_tracking': 'utils.parse_args', 'parse_args_eval': 'utils.parse_args',
+    'parse_args_replay': 'utils.parse_args', 'parse_args_sweep': 'utils.parse_args',
+    'parse_args_export': 'utils.parse_args', 'parse_args_backend_bench': 'utils.parse_args',
+    'parse_args_quantize': 'utils.parse_args', 'parse_args_import_bench': 'utils.parse_args',
+    'parse_args_storage_bench': 'utils.parse_args',
+}
 
-# CLI argument parsing
-from utils.parse_args import parse_args_tracking, parse_args_eval
+__getattr__, __dir__ = lazy_attributes(__name__, _ATTRIBUTES)
 
 
 __all__ = [
@@ -44,14 +50,21 @@ __all__ = [
     # Zones
     'load_zones', 'save_zones',
     # Storage
-    'MinioClient',
+    'MinioClient', 'StorageBackend', 'LocalStorage', 'MemoryStorage', 'get_storage', 'configure_storage',
     # Logging
     'get_logger', 'get_system_logger', 'log_violation', 'log_performance', 'log_upload',
     # Drawing
     'draw_polygon_zone', 'draw_light_zone', 'draw_line_zone',
-    'render_frame', 'draw_violation_overlay', 'draw_traffic_light_state',
+    'render_frame', 'track_labels', 'draw_violation_overlay', 'draw_traffic_light_state',
+    # Frames
+    'share_frame', 'copy_frame', 'frame_copy_meter',
+    # Proof clips
+    'ProofFrameBuffer', 'SharedFrameRing', 'SharedProofBuffer', 'SegmentRecorder', 'BboxTimeline',
     # I/O
-    'handle_result_filename', 'violation_save_worker', 'ensure_output_dirs',
+    'handle_result_filename', 'violation_save_worker', 'EvidenceSaver', 'EvidenceSpool', 'ShardWriter', 'ViolationQueue',
+    'ensure_output_dirs',
     # Args
-    'parse_args_tracking', 'parse_args_eval'
+    'parse_args_tracking', 'parse_args_eval', 'parse_args_replay', 'parse_args_sweep',
+    'parse_args_export', 'parse_args_backend_bench', 'parse_args_quantize', 'parse_args_import_bench',
+    'parse_args_storage_bench'
 ]
@@ -0,0 +1,163 @@
+"""
+Sorted per-vehicle box history.
+
+A vehicle's boxes are appended once per frame, in frame order, and read back when a
+proof clip is rendered: the box of every clip frame, including frames where the
+vehicle was not matched. BboxTimeline keeps the frame indices and boxes in two
+numpy arrays, so a lookup is a binary search and the boxes of a whole frame range
+are linearly interpolated in one vectorized call.
+"""
+
+import numpy as np
+
+
+class BboxTimeline:
+    """Fixed-length timeline of (frame_counter, bbox), sorted by frame.
+
+    Drop-in for the deque of (frame_counter, bbox) tuples it replaces: append,
+    len and iteration behave the same.
+
+    Example:
+        timeline = BboxTimeline(maxlen=180)
+        timeline.append((frame_counter, bbox))
+        timeline.at(frame_counter)               # last known box, O(log n)
+        timeline.interpolate(range(100, 180))    # (80, 4) boxes, gaps interpolated
+    """
+    def __init__(self, maxlen=None, pairs=None):
+        """
+        Args:
+            maxlen (int, optional): Boxes kept, the oldest are dropped. Defaults to None (unbounded).
+            pairs (iterable, optional): Initial (frame_counter, bbox) pairs. Defaults to None.
+        """
+        self.maxlen = maxlen
+        capacity = 2 * maxlen if maxlen else 64
+        self._frames = np.empty(capacity, dtype=np.int64)
+        self._boxes = np.empty((capacity, 4), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        for pair in pairs or []:
+            self.append(pair)
+
+    @classmethod
+    def _from_arrays(cls, frames, boxes, maxlen=None):
+        timeline = cls(maxlen)
+        n = len(frames)
+        capacity = max(len(timeline._frames), 2 * n)
+        timeline._frames = np.empty(capacity, dtype=np.int64)
+        timeline._boxes = np.empty((capacity, 4), dtype=np.float64)
+        timeline._frames[:n] = frames
+        timeline._boxes[:n] = boxes
+        timeline._end = n
+        return timeline
+
+    @classmethod
+    def from_pairs(cls, bboxes):
+        """Timeline of a (frame_counter, bbox) iterable, a timeline is returned as is"""
+        if isinstance(bboxes, cls):
+            return bboxes
+        return cls(pairs=bboxes)
+
+    @property
+    def frames(self):
+        """Frame indices, ascending (read-only view)"""
+        view = self._frames[self._start:self._end]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def boxes(self):
+        """(n, 4) boxes x1, y1, x2, y2 of frames (read-only view)"""
+        view = self._boxes[self._start:self._end]
+        view.flags.writeable = False
+        return view
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __iter__(self):
+        for frame_counter, bbox in zip(self._frames[self._start:self._end].tolist(), self.boxes):
+            yield frame_counter, bbox
+
+    def append(self, item):
+        """Add a (frame_counter, bbox) pair, a box for a frame already present replaces it"""
+        frame_counter, bbox = item
+        bbox = np.asarray(bbox, dtype=np.float64).reshape(-1)[:4]
+        if len(self) and frame_counter <= self._frames[self._end - 1]:
+            self._insert(int(frame_counter), bbox)
+        else:
+            if self._end == len(self._frames):
+                self._compact()
+            self._frames[self._end] = frame_counter
+            self._boxes[self._end] = bbox
+            self._end += 1
+        if self.maxlen and len(self) > self.maxlen:
+            self._start = self._end - self.maxlen
+
+    def _compact(self):
+        """Move the live boxes to the front, growing the arrays if they are more than half full"""
+        n = len(self)
+        capacity = len(self._frames)
+        if n > capacity // 2:
+            capacity *= 2
+        frames = np.empty(capacity, dtype=np.int64)
+        boxes = np.empty((capacity, 4), dtype=np.float64)
+        frames[:n] = self._frames[self._start:self._end]
+        boxes[:n] = self._boxes[self._start:self._end]
+        self._frames, self._boxes = frames, boxes
+        self._start, self._end = 0, n
+
+    def _insert(self, frame_counter, bbox):
+        # Out of order, only when a caller re-appends an older frame
+        position = self._start + int(np.searchsorted(self.frames, frame_counter))
+        if position < self._end and self._frames[position] == frame_counter:
+            self._boxes[position] = bbox
+            return
+        frames = np.insert(self._frames[self._start:self._end], position - self._start, frame_counter)
+        boxes = np.insert(self._boxes[self._start:self._end], position - self._start, bbox, axis=0)
+        self._frames = np.concatenate([frames, np.empty(len(frames), dtype=np.int64)])
+        self._boxes = np.concatenate([boxes, np.empty((len(boxes), 4))])
+        self._start, self._end = 0, len(frames)
+
+    def at(self, frame_counter):
+        """Box of the frame, or the last known box before it; None before the first box"""
+        position = int(np.searchsorted(self.frames, frame_counter, side='right')) - 1
+        if position < 0:
+            return None
+        return self.boxes[position]
+
+    def between(self, start, end):
+        """Timeline of the boxes of frames start..end (inclusive)"""
+        frames = self.frames
+        lo = int(np.searchsorted(frames, start, side='left'))
+        hi = int(np.searchsorted(frames, end, side='right'))
+        return BboxTimeline._from_arrays(frames[lo:hi], self.boxes[lo:hi])
+
+    def interpolate(self, frame_indices):
+        """Boxes of the given frames, linearly interpolated between known boxes
+
+        Frames after the last box keep the last box, frames before the first box are NaN.
+
+        Args:
+            frame_indices (ArrayLike): frame counters, e.g. range(start, end + 1).
+
+        Returns:
+            np.ndarray: (len(frame_indices), 4) boxes
+        """
+        query = np.asarray(frame_indices, dtype=np.float64).reshape(-1)
+        out = np.full((len(query), 4), np.nan)
+        if not len(self):
+            return out
+        frames = self.frames
+        boxes = self.boxes
+        known = query >= frames[0]
+        for k in range(4):
+            out[known, k] = np.interp(query[known], frames, boxes[:, k])
+        return out
+
+    def copy(self):
+        """Independent timeline with the same boxes, for handing to another thread or process"""
+        return BboxTimeline._from_arrays(self.frames, self.boxes, self.maxlen)
+
+    def __repr__(self):
+        span = f"frames {self.frames[0]}..{self.frames[-1]}" if len(self) else "empty"
+        return f"BboxTimeline({len(self)} boxes, {span})"
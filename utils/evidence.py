@@ -0,0 +1,183 @@
+"""
+Evidence encoding for violations.
+
+Turning a violation into uploadable files (proof crop, retraining frame and label,
+labeled frame, video clip) is CPU work: three JPEG encodes and one MP4 encode.
+encode_evidence does all of it without touching storage, so the save worker can
+run it in a pool of processes and leave the uploads to I/O threads.
+"""
+
+import os
+import json
+import time
+import tempfile
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from utils.bbox_timeline import BboxTimeline
+
+BOX_COLOR = (0, 0, 255)
+
+
+def evidence_names(identifier, vehicle_id, violation_type, time_now=None):
+    """Object names of the evidence of one violation, the same ones MinioClient.save_* use
+
+    Returns:
+        dict: {'proof', 'labeled', 'video', 'segment', 'train_image', 'train_label'}
+    """
+    time_now = time_now or datetime.now()
+    date_folder = time_now.strftime("%Y_%m")
+    timestamp = time_now.strftime("%Y%m%d_%H%M%S")
+    base = f"{date_folder}/{violation_type}_{identifier}_{timestamp}"
+    return {
+        'proof': f"{base}.jpg",
+        'labeled': f"{base}_labeled.jpg",
+        'video': f"{base}.mp4",
+        'segment': f"{base}.ts",
+        'train_image': f"train_{vehicle_id}_{timestamp}.jpg",
+        'train_label': f"train_{vehicle_id}_{timestamp}.txt",
+    }
+
+
+def draw_violation_box(frame, bbox, vehicle_id, violation_type):
+    """Draw the violation box and caption on a writable frame, in place"""
+    x1, y1, x2, y2 = map(int, bbox)
+    cv2.rectangle(frame, (x1, y1), (x2, y2), BOX_COLOR, 2)
+    cv2.putText(frame, f"ID: {vehicle_id} {violation_type}", (x1, y1 - 10),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.9, BOX_COLOR, 2)
+    return frame
+
+
+def yolo_label(bbox, shape, class_id=0):
+    """YOLO label line (class x_center y_center width height, normalized) of a box"""
+    h, w = shape[:2]
+    x1, y1, x2, y2 = bbox
+    xc = ((x1 + x2) / 2) / w
+    yc = ((y1 + y2) / 2) / h
+    bw = (x2 - x1) / w
+    bh = (y2 - y1) / h
+    return f"{class_id} {xc:.6f} {yc:.6f} {bw:.6f} {bh:.6f}"
+
+
+def encode_jpeg(image):
+    """JPEG bytes of an image"""
+    ok, buffer = cv2.imencode(".jpg", image)
+    if not ok:
+        raise ValueError(f"Could not encode image of shape {image.shape}")
+    return buffer.tobytes()
+
+
+def write_video_proof(frames, path, vehicle_id, violation_type, bboxes=None, fps=30):
+    """Encode a proof clip to an MP4 file, the vehicle box drawn on every frame
+
+    Frames without a box of their own get one interpolated between the known boxes
+    (after the last known box, that box is kept).
+
+    Args:
+        frames (iterable): (frame_counter, frame) pairs, e.g. a list, EncodedClip or RingClip.
+        path (str): Output file.
+        bboxes (BboxTimeline or list, optional): (frame_counter, bbox) of the vehicle. Defaults to None.
+        fps (int, optional): Defaults to 30.
+
+    Returns:
+        int: number of frames written
+    """
+    timeline = BboxTimeline.from_pairs(bboxes or [])
+    # Box of every frame from the first known one, computed once
+    first = int(timeline.frames[0]) if len(timeline) else 0
+    dense = timeline.interpolate(np.arange(first, int(timeline.frames[-1]) + 1)) if len(timeline) else None
+    out = None
+    written = 0
+    try:
+        for frame_counter, frame in frames:
+            if out is None:
+                h, w = frame.shape[:2]
+                out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+            draw_frame = frame.copy()
+            bbox = None
+            if dense is not None and frame_counter >= first:
+                bbox = dense[min(frame_counter - first, len(dense) - 1)]
+            if bbox is not None:
+                draw_violation_box(draw_frame, bbox, vehicle_id, violation_type)
+            out.write(draw_frame)
+            written += 1
+    finally:
+        if out is not None:
+            out.release()
+    return written
+
+
+def encode_evidence(job):
+    """Encode the evidence of one violation, the CPU part of saving it
+
+    Args:
+        job (dict): a violation queue item (see violation_save_worker) whose 'frame_buffer'
+            is a picklable clip, plus 'names' from evidence_names(). A SegmentClip is not
+            encoded here, its segments are uploaded as they are.
+
+    Returns:
+        dict: {'uploads': [{'bucket', 'key', 'body' or 'path', 'content_type'}], 'encode_s': float}.
+            'bucket' is a key of MinioClient.buckets, a 'path' is a temporary file to delete after upload.
+    """
+    start = time.perf_counter()
+    names = job['names']
+    identifier = job['identifier']
+    violation_type = job['violation_type']
+    frame = job['frame']
+    bbox = job['bbox']
+    uploads = [
+        {'bucket': 'proofs', 'key': names['proof'], 'body': encode_jpeg(job['proof_crop']), 'content_type': 'image/jpeg'},
+        {'bucket': 'retraining', 'key': names['train_image'], 'body': encode_jpeg(frame), 'content_type': 'image/jpeg'},
+        {'bucket': 'retraining', 'key': names['train_label'], 'body': yolo_label(bbox, frame.shape).encode(),
+         'content_type': 'text/plain'},
+        {'bucket': 'proofs', 'key': names['labeled'], 'content_type': 'image/jpeg',
+         'body': encode_jpeg(draw_violation_box(frame.copy(), bbox, identifier, violation_type))},
+    ]
+
+    clip = job.get('frame_buffer')
+    try:
+        if clip is not None and len(clip) > 0:
+            fd, path = tempfile.mkstemp(suffix='.mp4')
+            os.close(fd)
+            try:
+                written = write_video_proof(clip, path, identifier, violation_type, job.get('bboxes'), job.get('fps', 30))
+            except Exception:
+                os.remove(path)
+                raise
+            if written:
+                uploads.append({'bucket': 'proofs', 'key': names['video'], 'path': path, 'content_type': 'video/mp4'})
+            else:
+                os.remove(path)
+    finally:
+        # Frames leased from a shared frame ring are released by the process that read them
+        if hasattr(clip, 'release'):
+            clip.release()
+    return {'uploads': uploads, 'encode_s': time.perf_counter() - start}
+
+
+def segment_evidence(clip, names, identifier, violation_type, bboxes=None):
+    """Uploads of a SegmentClip proof: the joined segments (no re-encoding) and their JSON sidecar
+
+    Returns:
+        list: upload dicts as in encode_evidence, empty if no recorded segment covers the clip
+    """
+    fd, path = tempfile.mkstemp(suffix='.ts')
+    os.close(fd)
+    if not clip.concatenate(path):
+        os.remove(path)
+        return []
+    metadata = clip.metadata(bboxes=bboxes, vehicle_id=str(identifier), violation_type=violation_type)
+    return [
+        {'bucket': 'proofs', 'key': names['segment'].replace(".ts", ".json"),
+         'body': json.dumps(metadata).encode(), 'content_type': 'application/json'},
+        {'bucket': 'proofs', 'key': names['segment'], 'path': path, 'content_type': 'video/mp2t'},
+    ]
+
+
+def attach_rings(specs):
+    """Process pool initializer: open the shared frame rings whose RingClips the process will read"""
+    from utils.frame_ring import SharedFrameRing
+    for spec in specs:
+        SharedFrameRing.attach(spec)
@@ -0,0 +1,266 @@
+"""
+Preallocated frame ring in shared memory.
+
+The last ``slots`` frames live in one multiprocessing.shared_memory block, frame
+``i`` in slot ``i % slots``. A violation enqueues only a RingClip (ring name and
+frame indices). The saver, in this process or another one, reads the frames
+straight from the ring. The frames of a clip are leased when the clip is taken, so
+the writer does not overwrite them until the saver releases the clip or the lease
+times out.
+"""
+
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+from utils.frames import frame_copy_meter
+
+# Rings opened in this process, by shared memory name
+_RINGS = {}
+
+
+def get_ring(name):
+    """The ring opened in this process under the given shared memory name"""
+    if name not in _RINGS:
+        raise KeyError(f"Frame ring {name} is not attached in this process, call SharedFrameRing.attach(spec) first")
+    return _RINGS[name]
+
+
+class SharedFrameRing:
+    """Fixed-size ring of equally shaped frames in shared memory.
+
+    Example:
+        ring = SharedFrameRing(slots=360, shape=(1080, 1920, 3))
+        ring.write(frame_counter, frame)
+        clip = ring.lease(frame_counter - 179, frame_counter)  # picklable
+        # saver process: SharedFrameRing.attach(ring.spec()) once, then
+        for frame_counter, frame in clip: ...
+        clip.release()
+    """
+    def __init__(self, slots, shape, dtype=np.uint8, lease_timeout=10.0, _spec=None):
+        """
+        Args:
+            slots (int): Number of frames kept. Leave headroom over the proof clip length so
+                the writer rarely meets a leased slot.
+            shape (tuple): Frame shape, e.g. (1080, 1920, 3).
+            dtype (optional): Frame dtype. Defaults to np.uint8.
+            lease_timeout (float, optional): Seconds after which a lease no longer blocks the writer. Defaults to 10.0.
+        """
+        self.slots = int(slots)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.lease_timeout = lease_timeout
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        # Header: frame index, lease count and lease expiry of every slot
+        header_bytes = 3 * 8 * self.slots
+
+        if _spec is None:
+            self.owner = True
+            self.lock = mp.Lock()
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + self.slots * frame_bytes)
+        else:
+            self.owner = False
+            self.lock = _spec['lock']
+            self.shm = shared_memory.SharedMemory(name=_spec['name'])
+            # Only the owner unlinks the block
+            try:
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            except Exception:
+                pass
+
+        buf = self.shm.buf
+        self._index = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=0)
+        self._leases = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=8 * self.slots)
+        self._expiry = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=16 * self.slots)
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=self.dtype, buffer=buf, offset=header_bytes)
+        if self.owner:
+            self._index[:] = -1
+            self._leases[:] = 0
+            self._expiry[:] = 0.0
+
+        self.name = self.shm.name
+        self.waits = 0
+        _RINGS[self.name] = self
+
+    def spec(self):
+        """Everything another process needs to attach, pass it as a Process argument (the lock cannot go through a queue)"""
+        return {
+            'name': self.name, 'slots': self.slots, 'shape': self.shape, 'dtype': self.dtype.str,
+            'lease_timeout': self.lease_timeout, 'lock': self.lock,
+        }
+
+    @classmethod
+    def attach(cls, spec):
+        """Open a ring created by another process"""
+        if spec['name'] in _RINGS:
+            return _RINGS[spec['name']]
+        return cls(spec['slots'], spec['shape'], spec['dtype'], spec['lease_timeout'], _spec=spec)
+
+    def write(self, frame_index, frame):
+        """Copy a frame into its slot, waiting while the frame it replaces is leased
+
+        Returns:
+            bool: False if the frame does not fit the ring (shape or dtype mismatch)
+        """
+        if frame.shape != self.shape or frame.dtype != self.dtype:
+            return False
+        slot = frame_index % self.slots
+        while True:
+            with self.lock:
+                if self._leases[slot] <= 0 or time.time() >= self._expiry[slot]:
+                    self._leases[slot] = 0
+                    # Readers see the slot as empty while it is written
+                    self._index[slot] = -1
+                    break
+            self.waits += 1
+            time.sleep(0.001)
+        frame_copy_meter.add(frame.nbytes, 'ring')
+        self._frames[slot] = frame
+        with self.lock:
+            self._index[slot] = frame_index
+        return True
+
+    def read(self, frame_index):
+        """View of a frame in the ring, None if it was overwritten. Only stable while leased."""
+        slot = frame_index % self.slots
+        if self._index[slot] != frame_index:
+            return None
+        return self._frames[slot]
+
+    def lease(self, start, end):
+        """Lease the frames start..end (inclusive) that are still in the ring
+
+        Returns:
+            RingClip: picklable reference to the leased frames
+        """
+        expiry = time.time() + self.lease_timeout
+        indices = []
+        with self.lock:
+            for frame_index in range(max(start, end - self.slots + 1), end + 1):
+                slot = frame_index % self.slots
+                if self._index[slot] == frame_index:
+                    self._leases[slot] += 1
+                    self._expiry[slot] = max(self._expiry[slot], expiry)
+                    indices.append(frame_index)
+        return RingClip(self.name, indices)
+
+    def release(self, indices):
+        """End the lease of frames taken by lease()"""
+        with self.lock:
+            for frame_index in indices:
+                slot = frame_index % self.slots
+                # A slot whose lease expired may hold a newer frame by now
+                if self._index[slot] == frame_index and self._leases[slot] > 0:
+                    self._leases[slot] -= 1
+
+    def leased(self):
+        """Number of slots currently leased"""
+        with self.lock:
+            return int(((self._leases > 0) & (self._expiry > time.time())).sum())
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def close(self):
+        """Detach from the shared memory, and free it if this process created the ring"""
+        _RINGS.pop(self.name, None)
+        del self._index, self._leases, self._expiry, self._frames
+        try:
+            self.shm.close()
+        except BufferError:
+            # A frame view is still referenced somewhere, the mapping goes with the process
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingClip:
+    """Frames of a proof clip leased from a SharedFrameRing.
+
+    Only the ring name and frame indices are stored, so the clip is cheap to put on a
+    queue or send to another process. Iterating yields (frame_counter, frame) like the
+    frame list MinioClient.save_video_proof expects; frames are views into the ring.
+    """
+    def __init__(self, ring_name, indices):
+        self.ring_name = ring_name
+        self.indices = list(indices)
+        self.released = False
+        self._released_upto = 0
+
+    def __len__(self):
+        return len(self.indices)
+
+    def _frame(self, frame_index):
+        frame = get_ring(self.ring_name).read(frame_index)
+        if frame is None:
+            raise KeyError(f"Frame {frame_index} was overwritten, its lease expired")
+        return frame
+
+    def __getitem__(self, index):
+        frame_index = self.indices[index]
+        return frame_index, self._frame(frame_index)
+
+    def __iter__(self):
+        # Each frame is released once the consumer moves on, the writer chases the reader
+        # through the ring instead of waiting for the whole clip
+        for position, frame_index in enumerate(self.indices):
+            yield frame_index, self._frame(frame_index)
+            if not self.released:
+                get_ring(self.ring_name).release([frame_index])
+                self._released_upto = position + 1
+
+    def release(self):
+        """Let the writer overwrite the frames of the clip that were not read yet"""
+        if not self.released and self.indices:
+            get_ring(self.ring_name).release(self.indices[self._released_upto:])
+        self.released = True
+
+
+class SharedProofBuffer:
+    """Proof frame buffer (same interface as ProofFrameBuffer) backed by a SharedFrameRing.
+
+    The ring is created on the first frame, once the frame shape is known.
+    """
+    def __init__(self, maxlen, headroom=2.0, lease_timeout=10.0):
+        """
+        Args:
+            maxlen (int): Frames in a proof clip.
+            headroom (float, optional): Ring slots per clip frame, room for the frames written
+                while a clip is leased. Defaults to 2.0.
+            lease_timeout (float, optional): See SharedFrameRing. Defaults to 10.0.
+        """
+        self.maxlen = maxlen
+        self.slots = max(maxlen, int(round(maxlen * headroom)))
+        self.lease_timeout = lease_timeout
+        self.ring = None
+        self.last_index = None
+
+    def append(self, item):
+        frame_counter, frame = item
+        if self.ring is None:
+            self.ring = SharedFrameRing(self.slots, frame.shape, frame.dtype, lease_timeout=self.lease_timeout)
+        self.ring.write(frame_counter, frame)
+        self.last_index = frame_counter
+
+    def snapshot(self):
+        """Lease the last maxlen frames"""
+        if self.ring is None:
+            return RingClip(None, [])
+        return self.ring.lease(self.last_index - self.maxlen + 1, self.last_index)
+
+    def __len__(self):
+        return 0 if self.last_index is None else min(self.maxlen, self.last_index + 1)
+
+    def stats(self):
+        nbytes = self.ring.nbytes if self.ring is not None else 0
+        return {'frames': len(self), 'bytes': nbytes, 'raw_bytes': nbytes, 'compression': 1.0}
+
+    def flush(self):
+        """Frames are written synchronously, nothing to finish"""
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
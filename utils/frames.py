@@ -0,0 +1,78 @@
+"""
+Frame ownership.
+
+A decoded frame is allocated once and then shared by reference: the tracker, the
+proof buffer, the violation checks and the save worker all hold the same array,
+which is marked read-only so an in-place draw fails loudly instead of corrupting
+the proof clip. Annotation happens on a private render copy, made only when the
+frame is displayed. Every deliberate full-frame copy goes through copy_frame, so
+the copy traffic per frame can be measured with frame_copy_meter.
+"""
+
+import threading
+import numpy as np
+
+
+class FrameCopyMeter:
+    """Count the full-frame copies made per processed frame"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.frames = 0
+            self.copies = {}
+            self.bytes = {}
+
+    def count_frame(self):
+        """Called once per processed frame"""
+        with self._lock:
+            self.frames += 1
+
+    def add(self, nbytes, reason):
+        with self._lock:
+            self.copies[reason] = self.copies.get(reason, 0) + 1
+            self.bytes[reason] = self.bytes.get(reason, 0) + nbytes
+
+    def stats(self):
+        """{'frames', 'copies', 'bytes', 'bytes_per_frame', 'by_reason': {reason: bytes}}"""
+        with self._lock:
+            total = sum(self.bytes.values())
+            return {
+                'frames': self.frames,
+                'copies': sum(self.copies.values()),
+                'bytes': total,
+                'bytes_per_frame': total / self.frames if self.frames else 0.0,
+                'by_reason': dict(self.bytes),
+            }
+
+    def format_stats(self):
+        stats = self.stats()
+        reasons = ", ".join(f"{reason} {nbytes / 1e6:.1f} MB" for reason, nbytes in stats['by_reason'].items())
+        return (f"{stats['bytes_per_frame'] / 1e6:.2f} MB copied per frame over {stats['frames']} frames"
+                + (f" ({reasons})" if reasons else ""))
+
+
+frame_copy_meter = FrameCopyMeter()
+
+
+def share_frame(frame):
+    """Mark a decoded frame read-only so it can be shared by reference, returns the same array"""
+    if isinstance(frame, np.ndarray):
+        frame.flags.writeable = False
+    return frame
+
+
+def copy_frame(frame, reason="render"):
+    """Writable copy of a shared frame, counted by frame_copy_meter
+
+    Args:
+        frame (np.ndarray): the shared frame
+        reason (str, optional): what the copy is for, used in the copy statistics. Defaults to "render".
+
+    Returns:
+        np.ndarray: the copy
+    """
+    frame_copy_meter.add(frame.nbytes, reason)
+    return frame.copy()
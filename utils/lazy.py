@@ -0,0 +1,70 @@
+"""
+Deferred imports.
+
+Packages expose their public names through a module ``__getattr__`` (PEP 562), so
+``from utils import parse_args_eval`` does not import boto3, supervision or torch.
+Modules that need a heavy dependency at module level bind it to a LazyImport,
+which imports it on first attribute access or call.
+"""
+
+import importlib
+import sys
+
+
+def lazy_attributes(package, attributes):
+    """Module __getattr__ and __dir__ for a package whose names live in submodules
+
+    Args:
+        package (str): name of the package, i.e. __name__ of its __init__
+        attributes (dict): {public name: submodule it is defined in}
+
+    Returns:
+        (__getattr__, __dir__): to assign at package level
+
+    Example:
+        __getattr__, __dir__ = lazy_attributes(__name__, {'load_config': 'utils.config'})
+    """
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(attributes[name]), name)
+        # Later lookups find the attribute without going through __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(attributes))
+
+    return __getattr__, __dir__
+
+
+class LazyImport:
+    """Stand-in for a module or a module attribute that is imported on first use.
+
+    Example:
+        torch = LazyImport('torch')
+        YOLO = LazyImport('ultralytics', 'YOLO')
+        torch.cuda.is_available()  # imports torch here
+    """
+    def __init__(self, module, attribute=None):
+        self._module = module
+        self._attribute = attribute
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            target = importlib.import_module(self._module)
+            self._target = getattr(target, self._attribute) if self._attribute else target
+        return self._target
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self._module}.{self._attribute}" if self._attribute else self._module
+        return f"<LazyImport {name} ({'loaded' if self._target is not None else 'not loaded'})>"
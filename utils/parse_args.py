@@ -51,6 +51,20 @@ def parse_args_tracking():
         default='cuda', 
         help='Used device to run tracking.'
     )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='auto',
+        choices=['auto', 'torch', 'onnx', 'openvino'],
+        help='Inference runtime of the detectors. auto picks the fastest exported one on CPU.'
+    )
+    parser.add_argument(
+        '--precision',
+        type=str,
+        default='fp32',
+        choices=['fp32', 'int8'],
+        help='Use the INT8 detectors made by scripts/quantize.py when they exist.'
+    )
     parser.add_argument(
         '--light_detect',
         type=str,
@@ -58,6 +72,13 @@ def parse_args_tracking():
         choices=['True', 'False'],
         help='Enable traffic light detection.'
     )
+    parser.add_argument(
+        '--display',
+        type=str,
+        default='True',
+        choices=['True', 'False'],
+        help='Show the annotated frames. With False nothing is drawn and frames are never copied.'
+    )
     args = parser.parse_args()
     return args
 
@@ -103,4 +124,349 @@ def parse_args_eval():
         help='metrics needed to compute. details at https://github.com/cheind/py-motmetrics'
     )
     args = parser.parse_args()
-    return args
\ No newline at end of file
+    return args
+
+def parse_args_replay():
+    parser = argparse.ArgumentParser(description="Replay cached detections through the trackers and violation checks")
+    parser.add_argument(
+        '--data_path',
+        type=str,
+        default="data/traffic_video.avi",
+        help='Path to the input video file or image folder the detections were cached for.'
+    )
+    parser.add_argument(
+        "--vehicle_model",
+        type=str,
+        default="models/detect_gtvn.pt",
+        help="Path to vehicle detection model weights (part of the cache key)."
+    )
+    parser.add_argument(
+        '--tracker',
+        type=str,
+        default='bytetrack',
+        choices=['sort', 'bytetrack'],
+        help='The tracking algorithm to use: sort or bytetrack.'
+    )
+    parser.add_argument(
+        '--config',
+        type=str,
+        default='config.yaml',
+        help='Path to the configuration file.'
+    )
+    parser.add_argument(
+        '--zones',
+        type=str,
+        default='zones.json',
+        help='Path to the zones file (polygon and violation lines).'
+    )
+    parser.add_argument(
+        '--cache_dir',
+        type=str,
+        default='cache/detections',
+        help='Root directory of the detection caches.'
+    )
+    parser.add_argument(
+        '--build',
+        type=str,
+        default='False',
+        choices=['True', 'False'],
+        help='Run the detector once to build the cache if it does not exist yet.'
+    )
+    parser.add_argument(
+        '--with_frames',
+        type=str,
+        default='False',
+        choices=['True', 'False'],
+        help='Decode the video alongside the cache so violations get proof frames and plates.'
+    )
+    parser.add_argument(
+        '--output_dir',
+        type=str,
+        default='output',
+        help='Directory to save the resulting csv.'
+    )
+    parser.add_argument(
+        '--device',
+        type=str,
+        default='cuda',
+        help='Used device to run the detector when building the cache.'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='auto',
+        choices=['auto', 'torch', 'onnx', 'openvino'],
+        help='Inference runtime of the detectors. auto picks the fastest exported one on CPU.'
+    )
+    args = parser.parse_args()
+    return args
+
+def parse_args_sweep():
+    parser = argparse.ArgumentParser(description="Tracker hyperparameter sweep over cached detections")
+    parser.add_argument(
+        '--cache_path',
+        type=str,
+        required=True,
+        help='Detection cache directory of the sequence (built by replay.py --build True).'
+    )
+    parser.add_argument(
+        "--gt_path",
+        type=str,
+        default="data/train/MOT16-02/gt/gt.txt",
+        help="Path to ground truth text file."
+    )
+    parser.add_argument(
+        '--grid',
+        type=str,
+        default=None,
+        help='YAML file of {tracker: {param: [values]}}. Defaults to a built-in grid over both trackers.'
+    )
+    parser.add_argument(
+        '--config',
+        type=str,
+        default='config.yaml',
+        help='Configuration file providing the tracker parameters not in the grid.'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes. Defaults to the number of CPUs.'
+    )
+    parser.add_argument(
+        '--rank_by',
+        type=str,
+        default='idf1',
+        help='Metric used to rank the configurations.'
+    )
+    parser.add_argument(
+        '--min_vis',
+        type=float,
+        default=0,
+        help='min visibility to filter ground truth with low visibilities (hard to detect).'
+    )
+    parser.add_argument(
+        '--iou_threshold',
+        type=float,
+        default=0.5,
+        help='The IoU threshold for evaluation.'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='output/sweep/results.csv',
+        help='Path to save the ranked results table.'
+    )
+    args = parser.parse_args()
+    return args
+
+def parse_args_export():
+    parser = argparse.ArgumentParser(description="Export the detectors to ONNX / OpenVINO IR")
+    parser.add_argument(
+        '--weights',
+        type=str,
+        nargs='+',
+        default=["models/detect_gtvn.pt", "models/lp_yolo11s.pt"],
+        help='Paths to the .pt weights to export. Exports are written next to them.'
+    )
+    parser.add_argument(
+        '--formats',
+        type=str,
+        nargs='+',
+        default=['onnx', 'openvino'],
+        choices=['onnx', 'openvino'],
+        help='Export targets.'
+    )
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=640,
+        help='Export image size.'
+    )
+    parser.add_argument(
+        '--half',
+        type=str,
+        default='False',
+        choices=['True', 'False'],
+        help='Export FP16 weights.'
+    )
+    args = parser.parse_args()
+    return args
+
+def parse_args_backend_bench():
+    parser = argparse.ArgumentParser(description="Compare latency and mAP of the detector backends on a recorded clip")
+    parser.add_argument(
+        '--weights',
+        type=str,
+        default="models/detect_gtvn.pt",
+        help='Path to the .pt weights, exported models are looked up next to them.'
+    )
+    parser.add_argument(
+        '--data_path',
+        type=str,
+        default="data/traffic_video.avi",
+        help='Path to the recorded clip (video file or image folder).'
+    )
+    parser.add_argument(
+        '--backends',
+        type=str,
+        nargs='+',
+        default=['torch', 'onnx', 'openvino'],
+        choices=['torch', 'onnx', 'openvino'],
+        help='Backends to compare, torch is the accuracy reference.'
+    )
+    parser.add_argument(
+        '--num_frames',
+        type=int,
+        default=200,
+        help='Number of frames of the clip to run.'
+    )
+    parser.add_argument(
+        '--config',
+        type=str,
+        default='config.yaml',
+        help='Configuration file providing the detection thresholds and image size.'
+    )
+    parser.add_argument(
+        '--device',
+        type=str,
+        default='cpu',
+        help='Used device to run the detectors.'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='Optional path to save the results table as csv.'
+    )
+    args = parser.parse_args()
+    return args
+
+def parse_args_quantize():
+    parser = argparse.ArgumentParser(description="INT8 post-training quantization of the detectors")
+    parser.add_argument(
+        '--weights',
+        type=str,
+        nargs='+',
+        default=["models/detect_gtvn.pt", "models/lp_yolo11s.pt"],
+        help='Paths to the .pt weights to quantize. INT8 models are written next to them.'
+    )
+    parser.add_argument(
+        '--calibration',
+        type=str,
+        required=True,
+        help='Calibration footage: a video, or an image folder (retraining data, detect/convert.py output).'
+    )
+    parser.add_argument(
+        '--num_images',
+        type=int,
+        default=300,
+        help='Number of calibration images drawn from the footage.'
+    )
+    parser.add_argument(
+        '--formats',
+        type=str,
+        nargs='+',
+        default=['onnx', 'openvino'],
+        choices=['onnx', 'openvino'],
+        help='INT8 targets.'
+    )
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=640,
+        help='Inference image size.'
+    )
+    parser.add_argument(
+        '--eval_path',
+        type=str,
+        default=None,
+        help='Clip used to report speedup and accuracy drop against FP32. Defaults to the calibration footage.'
+    )
+    parser.add_argument(
+        '--num_frames',
+        type=int,
+        default=100,
+        help='Number of frames of the evaluation clip.'
+    )
+    parser.add_argument(
+        '--output_dir',
+        type=str,
+        default='output/quantization',
+        help='Directory for the calibration set and the report.'
+    )
+    args = parser.parse_args()
+    return args
+
+def parse_args_import_bench():
+    parser = argparse.ArgumentParser(description="Import time of the CLI tools and packages, in fresh interpreters")
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=5,
+        help='Number of interpreters started per import.'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='Optional path to save the results table as csv.'
+    )
+    args = parser.parse_args()
+    return args
+
+def parse_args_storage_bench():
+    parser = argparse.ArgumentParser(description="Upload throughput of the storage backends on the same workload")
+    parser.add_argument(
+        '--backends',
+        type=str,
+        nargs='+',
+        default=['memory', 'local'],
+        choices=['memory', 'local', 'minio'],
+        help='Backends to compare, minio needs a reachable server.'
+    )
+    parser.add_argument(
+        '--objects',
+        type=int,
+        default=200,
+        help='Number of objects uploaded per backend.'
+    )
+    parser.add_argument(
+        '--size_kb',
+        type=int,
+        default=256,
+        help='Size of each object in KB.'
+    )
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=8,
+        help='Upload threads.'
+    )
+    parser.add_argument(
+        '--fsync_batches',
+        type=int,
+        nargs='+',
+        default=[1, 32],
+        help='Objects per fsync of the local backend, one run each.'
+    )
+    parser.add_argument(
+        '--root',
+        type=str,
+        default=None,
+        help='Directory of the local backend, a temporary directory by default.'
+    )
+    parser.add_argument(
+        '--config',
+        type=str,
+        default='config.yaml',
+        help='Configuration file providing the storage settings.'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='Optional path to save the results table as csv.'
+    )
+    args = parser.parse_args()
+    return args
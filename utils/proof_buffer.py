@@ -0,0 +1,192 @@
+"""
+Ring buffer of the last seconds of video kept for violation proof clips.
+
+Raw 1080p BGR frames are 6.2 MB each, so 3 s at 60 fps is about 1.1 GB per camera.
+ProofFrameBuffer stores every frame JPEG-encoded instead (typically 10-20x
+smaller). Encoding runs on a thread pool (cv2.imencode releases the GIL) and frames
+are only decoded when a proof clip is written.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import cv2
+
+CODECS = {
+    'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+def encode_frame(frame, codec='jpg', quality=80):
+    """Compress a frame with an intra-frame codec
+
+    Returns:
+        np.ndarray: the encoded bytes as a 1-D uint8 array
+    """
+    ext, flag = CODECS[codec]
+    ok, buf = cv2.imencode(ext, frame, [int(flag), int(quality)])
+    if not ok:
+        raise ValueError(f"Could not encode frame of shape {frame.shape} as {codec}")
+    return buf.reshape(-1)
+
+
+def decode_frame(buf):
+    """Decode a frame encoded by encode_frame"""
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+class EncodedClip:
+    """Frames of a proof clip, decoded one at a time on access.
+
+    Behaves like the list of (frame_counter, frame) tuples that
+    MinioClient.save_video_proof expects, without holding every decoded frame.
+    """
+    def __init__(self, entries):
+        """
+        Args:
+            entries (list): (frame_counter, encoded) pairs, encoded being an ndarray of bytes,
+                a Future of one, or a raw frame when the buffer does not compress
+        """
+        self.entries = list(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _frame(self, data):
+        if isinstance(data, Future):
+            data = data.result()
+        return decode_frame(data) if data.ndim == 1 else data
+
+    def __getitem__(self, index):
+        frame_counter, data = self.entries[index]
+        return frame_counter, self._frame(data)
+
+    def __iter__(self):
+        for frame_counter, data in self.entries:
+            yield frame_counter, self._frame(data)
+
+    def resolved(self):
+        """Same clip with pending encodes waited for, picklable so it can go to another process"""
+        return EncodedClip((frame_counter, data.result() if isinstance(data, Future) else data)
+                           for frame_counter, data in self.entries)
+
+
+class ProofFrameBuffer:
+    """Fixed-length ring buffer of (frame_counter, frame) for violation proof clips.
+
+    Example:
+        buffer = ProofFrameBuffer(maxlen=180, quality=80)
+        buffer.append((frame_counter, frame))
+        clip = buffer.snapshot()   # cheap, handed to the save worker
+        for frame_counter, frame in clip:  # decoded here
+            ...
+    """
+    def __init__(self, maxlen, codec='jpg', quality=80, workers=2):
+        """
+        Args:
+            maxlen (int): Number of frames kept.
+            codec (str, optional): 'jpg', 'webp' or None to keep the raw (shared, read-only) frames. Defaults to 'jpg'.
+            quality (int, optional): Encoder quality, 0-100. Defaults to 80.
+            workers (int, optional): Encoder threads, 0 encodes in the calling thread. Defaults to 2.
+        """
+        if codec is not None and codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}. Choose from {tuple(CODECS)} or None")
+        self.maxlen = maxlen
+        self.codec = codec
+        self.quality = quality
+        self.frames = deque(maxlen=maxlen)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proof-encoder") if codec and workers > 0 else None
+        # Frames waiting for the encoder are still raw, bound them so a slow encoder cannot hold GBs
+        self.max_pending = 4 * max(1, workers)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.raw_bytes = 0
+
+    def _encode(self, frame):
+        try:
+            return encode_frame(frame, self.codec, self.quality)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def append(self, item):
+        """Add a (frame_counter, frame) pair, the oldest frame is dropped when full"""
+        frame_counter, frame = item
+        self.raw_bytes = frame.nbytes
+        if self.codec is None:
+            data = frame
+        else:
+            with self._lock:
+                self._pending += 1
+                backlog = self._pending > self.max_pending
+            if self.executor is None or backlog:
+                data = self._encode(frame)
+            else:
+                # The frame is shared read-only, encoding from the reference is safe
+                data = self.executor.submit(self._encode, frame)
+        self.frames.append((frame_counter, data))
+
+    def snapshot(self):
+        """The current contents as an EncodedClip, without decoding anything"""
+        return EncodedClip(self.frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def nbytes(self):
+        """Memory held by the frames of the buffer (pending frames count as raw)"""
+        total = 0
+        for _, data in list(self.frames):
+            if isinstance(data, Future):
+                data = data.result() if data.done() else None
+            total += self.raw_bytes if data is None else data.nbytes
+        return total
+
+    def stats(self):
+        """{'frames', 'bytes', 'raw_bytes', 'compression'} of the buffer"""
+        nbytes = self.nbytes()
+        raw = self.raw_bytes * len(self.frames)
+        return {
+            'frames': len(self.frames),
+            'bytes': nbytes,
+            'raw_bytes': raw,
+            'compression': raw / nbytes if nbytes else 1.0,
+        }
+
+    def flush(self):
+        """Nothing to finish, pending encodes complete on their own"""
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    @classmethod
+    def from_config(cls, config, maxlen):
+        """Buffer configured by the violation.proof_buffer section of config.yaml
+
+        With shared: true the frames go to a shared memory ring instead (see utils/frame_ring.py),
+        with segments.enabled: true the stream is recorded to rolling segments (see utils/segment_recorder.py).
+        """
+        cfg = config.get('violation', {}).get('proof_buffer', {})
+        segments_cfg = cfg.get('segments', {})
+        if segments_cfg.get('enabled', False):
+            from utils.segment_recorder import SegmentRecorder
+            fps = config.get('violation', {}).get('fps') or 30
+            return SegmentRecorder(
+                output_dir=segments_cfg.get('dir', 'output/segments'),
+                fps=fps,
+                clip_frames=maxlen,
+                segment_seconds=segments_cfg.get('segment_seconds', 2.0),
+                retention_seconds=segments_cfg.get('retention_seconds', 30.0)
+            )
+        if cfg.get('shared', False):
+            from utils.frame_ring import SharedProofBuffer
+            return SharedProofBuffer(maxlen, headroom=cfg.get('headroom', 2.0), lease_timeout=cfg.get('lease_timeout', 10.0))
+        return cls(
+            maxlen=maxlen,
+            codec=cfg.get('codec', 'jpg'),
+            quality=cfg.get('quality', 80),
+            workers=cfg.get('workers', 2)
+        )
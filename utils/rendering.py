@@ -8,7 +8,23 @@ tracking information, bounding boxes, and labels.
 import cv2
 import numpy as np
 import supervision as sv
-from typing import List, Any
+from typing import List, Any, Optional
+
+
+def track_labels(tracked_objs: List[Any]) -> List[str]:
+    """
+    Label text of every tracked object, e.g. "ID: 3 [VIOLATION]".
+
+    Args:
+        tracked_objs: List of tracked objects (Vehicle instances)
+
+    Returns:
+        One label per object
+    """
+    return [
+        f"ID: {obj.id} {'[VIOLATION]' if len(obj.violation_type) > 0 else ''}" 
+        for obj in tracked_objs
+    ]
 
 
 def render_frame(
@@ -17,6 +33,7 @@ def render_frame(
     sv_detections: sv.Detections,
     box_annotator: sv.BoxAnnotator,
     label_annotator: sv.LabelAnnotator,
+    labels: Optional[List[str]] = None,
 ) -> np.ndarray:
     """
     Process a single detection result, draws bbox, writes the frame.
@@ -27,6 +44,7 @@ def render_frame(
         sv_detections: Detections result in the supervision format
         box_annotator: Supervision BoxAnnotator instance
         label_annotator: Supervision LabelAnnotator instance
+        labels: Precomputed labels (see track_labels), computed from tracked_objs if None
 
     Returns:
         Annotated frame with bounding boxes and labels
@@ -36,10 +54,8 @@ def render_frame(
         detections=sv_detections
     )
 
-    labels = [
-        f"ID: {obj.id} {'[VIOLATION]' if len(obj.violation_type) > 0 else ''}" 
-        for obj in tracked_objs
-    ]
+    if labels is None:
+        labels = track_labels(tracked_objs)
     frame = label_annotator.annotate(
         scene=frame,
         detections=sv_detections,
@@ -0,0 +1,266 @@
+"""
+Continuous recording of the input stream into short rolling segments.
+
+Every frame is encoded exactly once, on a background thread, into segments of a few
+seconds (MPEG-TS by default). Segments older than the retention window are deleted.
+A violation proof is then the list of segments covering its frames: MPEG-TS segments
+can be joined by plain byte concatenation, so a burst of violations costs file I/O
+and no encoding. The boxes of the vehicle are stored next to the clip as JSON
+metadata instead of being drawn into the video.
+"""
+
+import os
+import glob
+import queue
+import shutil
+import threading
+from collections import deque
+
+import cv2
+
+from utils.bbox_timeline import BboxTimeline
+
+_FLUSH = 'flush'
+
+
+class Segment:
+    """One on-disk segment, frames start_frame..end_frame"""
+    def __init__(self, path, start_frame):
+        self.path = path
+        self.start_frame = start_frame
+        self.end_frame = start_frame - 1
+        self.finished = False
+
+    @property
+    def frames(self):
+        return self.end_frame - self.start_frame + 1
+
+
+class SegmentClip:
+    """Frames start_frame..end_frame of the recording, kept on disk until released.
+
+    The clip is taken while its last frames may still be queued for the encoder, the
+    segments covering it are resolved by wait() once they are finished.
+    """
+    def __init__(self, recorder, start_frame, end_frame):
+        self.recorder = recorder
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.segments = []
+        self.released = False
+
+    def __len__(self):
+        return max(0, self.end_frame - self.start_frame + 1)
+
+    def wait(self, timeout=None):
+        """Wait until the segments covering the clip are finished and resolve them
+
+        Args:
+            timeout (float, optional): Defaults to two segment lengths plus 5 seconds.
+
+        Returns:
+            list: the covering Segments (finished ones only if the timeout expired)
+        """
+        timeout = self.recorder.segment_seconds * 2 + 5 if timeout is None else timeout
+        self.segments = self.recorder.segments_for(self.start_frame, self.end_frame, timeout)
+        return self.segments
+
+    def concatenate(self, output_path):
+        """Join the segment files into one video without re-encoding (MPEG-TS segments)
+
+        Returns:
+            bool: False if no segment covers the clip
+        """
+        segments = self.wait()
+        if not segments:
+            return False
+        with open(output_path, 'wb') as out:
+            for segment in segments:
+                with open(segment.path, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+        return True
+
+    def metadata(self, bboxes=None, **extra):
+        """Sidecar describing the clip: frame range, fps and the boxes to overlay when viewing
+
+        Args:
+            bboxes (BboxTimeline or list, optional): (frame_counter, bbox) of the vehicle. Defaults to None.
+
+        Returns:
+            dict: JSON serialisable metadata, box keys are frame numbers in the joined video
+        """
+        segments = self.segments or self.wait()
+        first = segments[0].start_frame if segments else self.start_frame
+        last = segments[-1].end_frame if segments else self.end_frame
+        boxes = {}
+        for frame_counter, bbox in BboxTimeline.from_pairs(bboxes or []).between(first, last):
+            boxes[str(frame_counter - first)] = [round(float(v), 1) for v in bbox]
+        return {
+            'fps': self.recorder.fps,
+            'first_frame': first,
+            'clip_start': self.start_frame - first,
+            'clip_end': self.end_frame - first,
+            'boxes': boxes,
+            **extra,
+        }
+
+    def release(self):
+        """Let the retention clean-up delete the segments of the clip"""
+        if not self.released:
+            self.recorder.release(self)
+            self.released = True
+
+
+class SegmentRecorder:
+    """Write the stream into rolling segments and hand out proof clips as segment lists.
+
+    Same interface as ProofFrameBuffer: append((frame_counter, frame)) and
+    snapshot() returning the clip of the last clip_frames frames.
+    """
+    def __init__(self, output_dir, fps, clip_frames, segment_seconds=2.0, retention_seconds=30.0,
+                 fourcc='mp4v', ext='.ts', queue_size=120):
+        """
+        Args:
+            output_dir (str): Directory of the segment files, cleared of old segments on start.
+            fps (float): Stream frame rate.
+            clip_frames (int): Frames of a proof clip (violation.fps * video_proof_duration).
+            segment_seconds (float, optional): Segment length. Defaults to 2.0.
+            retention_seconds (float, optional): Segments ending earlier than this are deleted unless leased. Defaults to 30.0.
+            fourcc (str, optional): Video codec. Defaults to 'mp4v'.
+            ext (str, optional): Container, '.ts' segments can be concatenated as bytes. Defaults to '.ts'.
+            queue_size (int, optional): Frames waiting for the encoder before append blocks. Defaults to 120.
+        """
+        self.output_dir = output_dir
+        self.fps = float(fps)
+        self.maxlen = clip_frames
+        self.segment_seconds = segment_seconds
+        self.segment_frames = max(1, int(round(segment_seconds * self.fps)))
+        self.retention_frames = max(clip_frames, int(round(retention_seconds * self.fps)))
+        self.fourcc = fourcc
+        self.ext = ext
+
+        os.makedirs(output_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(output_dir, f"segment_*{ext}")):
+            os.remove(path)
+
+        self.segments = deque()
+        self.last_frame = None
+        self.written_frame = None
+        self.leases = []
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._writer = None
+        self._current = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="segment-recorder", daemon=True)
+        self._thread.start()
+
+    def append(self, item):
+        """Queue a (frame_counter, frame) pair for recording, frames are shared read-only so no copy is made"""
+        frame_counter, frame = item
+        self.last_frame = frame_counter
+        self._queue.put((frame_counter, frame))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._finish_segment()
+                break
+            if item is _FLUSH:
+                self._finish_segment()
+                continue
+            self._write(*item)
+
+    def _write(self, frame_counter, frame):
+        if self._current is not None and self._current.frames >= self.segment_frames:
+            self._finish_segment()
+        if self._current is None:
+            path = os.path.join(self.output_dir, f"segment_{frame_counter:09d}{self.ext}")
+            h, w = frame.shape[:2]
+            self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+            segment = Segment(path, frame_counter)
+            with self._lock:
+                self.segments.append(segment)
+                self._current = segment
+        self._writer.write(frame)
+        with self._lock:
+            self._current.end_frame = frame_counter
+            self.written_frame = frame_counter
+
+    def _finish_segment(self):
+        if self._current is None:
+            return
+        self._writer.release()
+        self._writer = None
+        with self._lock:
+            self._current.finished = True
+            self._current = None
+            self._finished.notify_all()
+        self._delete_expired()
+
+    def _delete_expired(self):
+        with self._lock:
+            if not self.segments:
+                return
+            newest = self.segments[-1].end_frame
+            keep = deque()
+            for segment in self.segments:
+                expired = segment.finished and segment.end_frame < newest - self.retention_frames
+                leased = any(segment.end_frame >= clip.start_frame and segment.start_frame <= clip.end_frame
+                             for clip in self.leases)
+                if expired and not leased:
+                    if os.path.exists(segment.path):
+                        os.remove(segment.path)
+                else:
+                    keep.append(segment)
+            self.segments = keep
+
+    def clip(self, start_frame, end_frame):
+        """Lease the frames start_frame..end_frame, their segments are kept until the clip is released"""
+        clip = SegmentClip(self, start_frame, end_frame)
+        with self._lock:
+            self.leases.append(clip)
+        return clip
+
+    def snapshot(self):
+        """Clip of the last clip_frames frames appended"""
+        if self.last_frame is None:
+            return SegmentClip(self, 0, -1)
+        return self.clip(max(0, self.last_frame - self.maxlen + 1), self.last_frame)
+
+    def segments_for(self, start_frame, end_frame, timeout):
+        """Finished segments covering start_frame..end_frame, waiting up to timeout for the last one"""
+        def covering():
+            return [s for s in self.segments if s.end_frame >= start_frame and s.start_frame <= end_frame]
+
+        def ready():
+            return (self.written_frame is not None and self.written_frame >= end_frame
+                    and all(s.finished for s in covering()))
+
+        with self._finished:
+            self._finished.wait_for(ready, timeout=timeout)
+            return [s for s in covering() if s.finished]
+
+    def release(self, clip):
+        with self._lock:
+            if clip in self.leases:
+                self.leases.remove(clip)
+
+    def __len__(self):
+        return 0 if self.last_frame is None else min(self.maxlen, self.last_frame + 1)
+
+    def flush(self):
+        """Finish the segment being written so clips waiting for it can be saved"""
+        self._queue.put(_FLUSH)
+
+    def stats(self):
+        with self._lock:
+            nbytes = sum(os.path.getsize(s.path) for s in self.segments if os.path.exists(s.path))
+            return {'frames': len(self), 'segments': len(self.segments), 'bytes': nbytes}
+
+    def close(self):
+        """Finish the current segment and stop the recording thread, segment files stay on disk"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
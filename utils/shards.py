@@ -0,0 +1,243 @@
+"""
+Retraining data packed into tar shards.
+
+One full-frame JPEG and a one-line label per violation adds up to millions of tiny
+objects, which are slow to list and download. ShardWriter packs the samples into
+tar shards of a bounded size, WebDataset style (the files of a sample share a base
+name: ``<key>.jpg``, ``<key>.txt``), and uploads whole shards. Each writer keeps a
+manifest of its shards under ``<prefix>manifests/``; readers merge the manifests
+instead of listing the shards. iter_samples streams the shards back, and
+write_yolo_dataset unpacks them into the image/label folders ultralytics trains on.
+"""
+
+import io
+import os
+import json
+import time
+import uuid
+import tarfile
+import tempfile
+import threading
+from datetime import datetime
+
+
+class ShardWriter:
+    """Pack samples into size-capped tar shards and upload each full shard.
+
+    Example:
+        writer = ShardWriter(get_storage(), max_bytes=64 * 1024 * 1024)
+        writer.add("train_12_20260101_120000", {'jpg': jpeg_bytes, 'txt': b"0 0.5 0.5 0.1 0.2"})
+        writer.close()  # uploads the last, partial shard and the manifest
+    """
+    def __init__(self, storage, bucket='retraining', prefix='shards/', max_bytes=64 * 1024 * 1024,
+                 max_samples=1000, max_age_seconds=600.0, spool=None):
+        """
+        Args:
+            storage (StorageBackend): Where shards and the manifest are stored.
+            bucket (str, optional): Key of storage.buckets or a bucket name. Defaults to 'retraining'.
+            prefix (str, optional): Object name prefix of the shards. Defaults to 'shards/'.
+            max_bytes (int, optional): A shard is uploaded once it reaches this size. Defaults to 64 MB.
+            max_samples (int, optional): ... or this many samples. Defaults to 1000.
+            max_age_seconds (float, optional): ... or when its first sample is this old, checked on add. Defaults to 600.
+            spool (EvidenceSpool, optional): Hand the shards to this spool instead of uploading them. Defaults to None.
+        """
+        self.storage = storage
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_samples = max_samples
+        self.max_age_seconds = max_age_seconds
+        self.spool = spool
+        self.run_id = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+        self.manifest = []
+        self.shards_written = 0
+        self._lock = threading.Lock()
+        self._tar = None
+
+    def _open_shard(self):
+        fd, self._path = tempfile.mkstemp(suffix='.tar', prefix='shard_')
+        self._file = os.fdopen(fd, 'wb')
+        self._tar = tarfile.open(fileobj=self._file, mode='w')
+        self._keys = []
+        self._bytes = 0
+        self._opened = time.time()
+
+    def add(self, key, files):
+        """Add one sample
+
+        Args:
+            key (str): Sample name, unique within the shard, without extension.
+            files (dict): {extension: bytes or str}, e.g. {'jpg': ..., 'txt': ...}
+        """
+        with self._lock:
+            if self._tar is None:
+                self._open_shard()
+            mtime = int(time.time())
+            for ext, data in files.items():
+                data = data.encode() if isinstance(data, str) else bytes(data)
+                info = tarfile.TarInfo(f"{key}.{ext}")
+                info.size = len(data)
+                info.mtime = mtime
+                self._tar.addfile(info, io.BytesIO(data))
+                # 512 byte header plus the data padded to 512 bytes
+                self._bytes += 512 + -(-len(data) // 512) * 512
+            self._keys.append(key)
+            full = (self._bytes >= self.max_bytes or len(self._keys) >= self.max_samples
+                    or time.time() - self._opened >= self.max_age_seconds)
+            if full:
+                self._finish_shard()
+
+    def _finish_shard(self):
+        self._tar.close()
+        self._file.close()
+        self._tar = None
+        name = f"{self.prefix}{self.run_id}-{self.shards_written:06d}.tar"
+        entry = {
+            'shard': name,
+            'samples': len(self._keys),
+            'bytes': os.path.getsize(self._path),
+            'first_key': self._keys[0],
+            'last_key': self._keys[-1],
+            'created': time.time(),
+        }
+        upload = {'bucket': self.bucket, 'key': name, 'path': self._path, 'content_type': 'application/x-tar'}
+        try:
+            ok = self._store(upload)
+        finally:
+            if os.path.exists(self._path):
+                os.remove(self._path)
+        self.shards_written += 1
+        if ok:
+            self.manifest.append(entry)
+            self._store({'bucket': self.bucket, 'key': self.manifest_key, 'content_type': 'application/json',
+                         'body': json.dumps({'run_id': self.run_id, 'shards': self.manifest}).encode()})
+        return ok
+
+    def _store(self, upload):
+        if self.spool is not None:
+            return self.spool.put(upload)
+        return self.storage.upload_many([upload])[0]
+
+    @property
+    def manifest_key(self):
+        return f"{self.prefix}manifests/{self.run_id}.json"
+
+    def flush(self):
+        """Upload the current shard even if it is not full"""
+        with self._lock:
+            if self._tar is not None:
+                self._finish_shard()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._keys) if self._tar is not None else 0
+        return {
+            'shards': len(self.manifest),
+            'samples': sum(entry['samples'] for entry in self.manifest),
+            'bytes': sum(entry['bytes'] for entry in self.manifest),
+            'pending_samples': pending,
+        }
+
+    def close(self):
+        self.flush()
+
+    @classmethod
+    def from_config(cls, shards_config, storage, spool=None):
+        """Writer configured by the violation.saver.shards section of config.yaml, None if disabled"""
+        shards_config = shards_config or {}
+        if not shards_config.get('enabled', False):
+            return None
+        return cls(
+            storage,
+            prefix=shards_config.get('prefix', 'shards/'),
+            max_bytes=int(shards_config.get('max_mb', 64) * 1024 * 1024),
+            max_samples=shards_config.get('max_samples', 1000),
+            max_age_seconds=shards_config.get('max_age_seconds', 600.0),
+            spool=spool
+        )
+
+
+def list_shards(storage, bucket='retraining', prefix='shards/'):
+    """Shards of every writer run, from the manifests, oldest first
+
+    Returns:
+        list: manifest entries {'shard', 'samples', 'bytes', 'first_key', 'last_key', 'created'}
+    """
+    bucket = storage.buckets.get(bucket, bucket)
+    shards = []
+    for key in storage.list_keys(bucket, prefix=f"{prefix}manifests/"):
+        shards.extend(json.loads(storage.get_object(bucket, key))['shards'])
+    return sorted(shards, key=lambda entry: (entry['created'], entry['shard']))
+
+
+def iter_samples(storage, shards, bucket='retraining'):
+    """Stream the samples of the shards, one shard open at a time
+
+    Args:
+        shards (list): manifest entries from list_shards, or shard object names.
+
+    Yields:
+        dict: {'__key__': sample name, 'jpg': bytes, 'txt': bytes, ...}
+    """
+    bucket = storage.buckets.get(bucket, bucket)
+    for shard in shards:
+        name = shard['shard'] if isinstance(shard, dict) else shard
+        stream = storage.open_object(bucket, name)
+        try:
+            sample = None
+            # Stream mode: members are read in order without seeking
+            with tarfile.open(fileobj=stream, mode='r|') as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    key, _, ext = member.name.rpartition('.')
+                    if sample is not None and sample['__key__'] != key:
+                        yield sample
+                        sample = None
+                    if sample is None:
+                        sample = {'__key__': key}
+                    sample[ext] = tar.extractfile(member).read()
+            if sample is not None:
+                yield sample
+        finally:
+            stream.close()
+
+
+def write_yolo_dataset(samples, output_dir, val_every=10, names=('vehicle',)):
+    """Unpack samples into the images/ and labels/ folders and data yaml ultralytics trains on
+
+    Args:
+        samples (iterable): from iter_samples, with 'jpg' and 'txt' entries.
+        output_dir (str): Dataset directory.
+        val_every (int, optional): Every n-th sample goes to the validation split. Defaults to 10.
+        names (tuple, optional): Class names of the label ids. Defaults to ('vehicle',).
+
+    Returns:
+        (str, dict): path of the data yaml and the number of samples per split
+    """
+    import yaml
+
+    counts = {'train': 0, 'val': 0}
+    for split in counts:
+        os.makedirs(os.path.join(output_dir, 'images', split), exist_ok=True)
+        os.makedirs(os.path.join(output_dir, 'labels', split), exist_ok=True)
+    for i, sample in enumerate(samples):
+        if 'jpg' not in sample or 'txt' not in sample:
+            continue
+        split = 'val' if val_every and i % val_every == val_every - 1 else 'train'
+        name = os.path.basename(sample['__key__'])
+        with open(os.path.join(output_dir, 'images', split, f"{name}.jpg"), 'wb') as f:
+            f.write(sample['jpg'])
+        with open(os.path.join(output_dir, 'labels', split, f"{name}.txt"), 'wb') as f:
+            f.write(sample['txt'])
+        counts[split] += 1
+
+    data_yaml = os.path.join(output_dir, 'data.yaml')
+    with open(data_yaml, 'w') as f:
+        yaml.safe_dump({
+            'path': os.path.abspath(output_dir),
+            'train': 'images/train',
+            'val': 'images/val' if counts['val'] else 'images/train',
+            'names': dict(enumerate(names)),
+        }, f)
+    return data_yaml, counts
@@ -0,0 +1,237 @@
+"""
+Durable on-disk spool for violation evidence.
+
+Evidence is written to a local directory first: the payload as a file and a row in
+a SQLite journal. A background flusher uploads the spooled items in batches and
+deletes them once stored; failed uploads are retried with exponential backoff. When
+MinIO is slow or down the evidence waits on disk instead of in memory, and it
+survives a restart, since the journal is read again when the spool is opened.
+
+Object keys are fixed when an item is spooled, so an item uploaded again after a
+crash (uploaded but not yet deleted from the journal) overwrites the same object.
+"""
+
+import os
+import time
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+
+
+class EvidenceSpool:
+    """Disk-backed queue of uploads, flushed to storage by a background thread.
+
+    Example:
+        spool = EvidenceSpool("output/spool", client=MinioClient())
+        spool.put({'bucket': 'proofs', 'key': 'a.jpg', 'body': jpeg_bytes, 'content_type': 'image/jpeg'})
+        spool.stats()   # {'items', 'bytes', 'oldest_age_s', ...}
+        spool.close()   # items not uploaded yet stay on disk for the next start
+    """
+    def __init__(self, directory, client=None, max_bytes=None, batch_size=16,
+                 base_delay=1.0, max_delay=60.0, poll_interval=0.5):
+        """
+        Args:
+            directory (str): Spool directory, holds journal.sqlite and the payload files.
+            client (MinioClient, optional): Storage to flush to, None keeps everything spooled. Defaults to None.
+            max_bytes (int, optional): put() refuses new items while the spool holds more. Defaults to None (no limit).
+            batch_size (int, optional): Items uploaded concurrently per flush. Defaults to 16.
+            base_delay (float, optional): First retry delay in seconds, doubled on every failure. Defaults to 1.0.
+            max_delay (float, optional): Longest retry delay. Defaults to 60.0.
+            poll_interval (float, optional): Flusher wake-up interval while idle. Defaults to 0.5.
+        """
+        self.directory = directory
+        self.data_dir = os.path.join(directory, "data")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.client = client
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "journal.sqlite"), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(SCHEMA)
+            # Items left by a previous run are retried right away
+            self._db.execute("UPDATE items SET next_attempt = 0")
+        self._remove_orphans()
+
+        self.uploaded = 0
+        self.failed_attempts = 0
+        self.rejected = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if client is not None:
+            self._thread = threading.Thread(target=self._run, name="evidence-spool", daemon=True)
+            self._thread.start()
+
+    def _remove_orphans(self):
+        """Payload files without a journal row, left by a crash between the two writes"""
+        with self._lock:
+            known = {row[0] for row in self._db.execute("SELECT path FROM items")}
+        for name in os.listdir(self.data_dir):
+            path = os.path.join(self.data_dir, name)
+            if path not in known:
+                os.remove(path)
+
+    def put(self, upload):
+        """Spool one upload
+
+        Args:
+            upload (dict): {'bucket', 'key', 'body' or 'path', 'content_type'} as made by
+                utils.evidence.encode_evidence. A 'path' file is moved into the spool.
+
+        Returns:
+            bool: False if the spool is full (max_bytes) and the item was not taken
+        """
+        size = os.path.getsize(upload['path']) if 'path' in upload else len(upload['body'])
+        if self.max_bytes is not None and self.stats()['bytes'] + size > self.max_bytes:
+            self.rejected += 1
+            return False
+
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(upload['key'])[1], dir=self.data_dir)
+        if 'path' in upload:
+            os.close(fd)
+            shutil.move(upload['path'], path)
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(upload['body'])
+                f.flush()
+                os.fsync(f.fileno())
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO items (bucket, key, path, size, content_type, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (upload['bucket'], upload['key'], path, size, upload.get('content_type'), time.time()))
+        self._wake.set()
+        return True
+
+    def put_many(self, uploads):
+        """Spool several uploads, returns the success of each"""
+        return [self.put(upload) for upload in uploads]
+
+    def _due(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, bucket, key, path, content_type, attempts FROM items "
+                "WHERE next_attempt <= ? ORDER BY id LIMIT ?", (time.time(), self.batch_size)).fetchall()
+
+    def flush_once(self):
+        """Upload one batch of due items
+
+        Returns:
+            int: items uploaded
+        """
+        rows = self._due()
+        if not rows:
+            return 0
+        uploads = [{'bucket': bucket, 'key': key, 'path': path, 'content_type': content_type}
+                   for _, bucket, key, path, content_type, _ in rows]
+        try:
+            results = self.client.upload_many(uploads)
+        except Exception:
+            results = [False] * len(rows)
+
+        done = 0
+        now = time.time()
+        with self._lock, self._db:
+            for (item_id, _, _, path, _, attempts), success in zip(rows, results):
+                if success:
+                    self._db.execute("DELETE FROM items WHERE id = ?", (item_id,))
+                    if os.path.exists(path):
+                        os.remove(path)
+                    done += 1
+                else:
+                    delay = min(self.max_delay, self.base_delay * 2 ** attempts)
+                    # Jitter so the items of a batch do not all retry at the same instant
+                    delay *= random.uniform(0.8, 1.2)
+                    self._db.execute("UPDATE items SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                                     (attempts + 1, now + delay, "upload failed", item_id))
+        self.uploaded += done
+        self.failed_attempts += len(rows) - done
+        return done
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._due():
+                self.flush_once()
+                continue
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def stats(self):
+        """{'items', 'bytes', 'oldest_age_s', 'retrying', 'uploaded', 'failed_attempts', 'rejected'}"""
+        with self._lock:
+            items, nbytes, oldest, retrying = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(created), COALESCE(SUM(attempts > 0), 0) FROM items").fetchone()
+        return {
+            'items': items,
+            'bytes': nbytes,
+            'oldest_age_s': time.time() - oldest if oldest is not None else 0.0,
+            'retrying': retrying,
+            'uploaded': self.uploaded,
+            'failed_attempts': self.failed_attempts,
+            'rejected': self.rejected,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"{stats['items']} items spooled ({stats['bytes'] / 1e6:.1f} MB, oldest {stats['oldest_age_s']:.0f} s, "
+                f"{stats['retrying']} retrying), {stats['uploaded']} uploaded, {stats['rejected']} rejected")
+
+    def drain(self, timeout=10.0):
+        """Wait up to timeout for the spool to empty
+
+        Returns:
+            bool: True if nothing is left
+        """
+        deadline = time.time() + timeout
+        while self.stats()['items'] and time.time() < deadline:
+            self._wake.set()
+            time.sleep(0.05)
+        return self.stats()['items'] == 0
+
+    def close(self, drain_timeout=10.0):
+        """Give the flusher drain_timeout seconds to empty the spool, then stop it; the rest stays on disk"""
+        if self._thread is not None:
+            self.drain(drain_timeout)
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._db.close()
+
+    @classmethod
+    def from_config(cls, spool_config, client=None):
+        """Spool configured by the violation.saver.spool section of config.yaml, None if disabled"""
+        spool_config = spool_config or {}
+        if not spool_config.get('enabled', False):
+            return None
+        max_mb = spool_config.get('max_mb')
+        return cls(
+            spool_config.get('dir', 'output/spool'),
+            client=client,
+            max_bytes=int(max_mb * 1e6) if max_mb else None,
+            batch_size=spool_config.get('batch_size', 16),
+            max_delay=spool_config.get('max_backoff_seconds', 60.0)
+        )
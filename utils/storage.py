@@ -1,62 +1,171 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError
 import os
+import time
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from io import BytesIO
 from datetime import datetime
 from dotenv import load_dotenv
+from utils.evidence import draw_violation_box, evidence_names, segment_evidence, write_video_proof, yolo_label
 
-class MinioClient:
-    _instance = None
+MB = 1024 * 1024
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(MinioClient, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
 
-    def _initialize(self):
-        load_dotenv()
-        self.endpoint_url = "http://localhost:9000"
-        self.access_key = "minioadmin"
-        self.secret_key = "minioadmin"
-        
-        # Try to load from env if available
-        # In a real app, use python-dotenv or os.environ
-        self.endpoint_url = os.environ.get("MINIO_ENDPOINT", "http://localhost:9000")
-        self.access_key = os.environ.get("MINIO_ACCESS_KEY", "minioadmin")
-        self.secret_key = os.environ.get("MINIO_SECRET_KEY", "minioadmin")
+class UploadMeter:
+    """Latency and throughput of the uploads of a MinioClient"""
+    def __init__(self, window=1000):
+        """
+        Args:
+            window (int, optional): Latencies kept for the percentiles. Defaults to 1000.
+        """
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.uploads = 0
+        self.failed = 0
+        self.bytes = 0
+        self.first_start = None
+        self.last_end = None
 
-        self.s3 = boto3.client(
-            's3',
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key
-        )
-        self.buckets = {
-            'proofs': 'proofs',
-            'retraining': 'retraining-data',
-            'models': 'models'
-        }
+    def record(self, nbytes, start, end, ok=True):
+        """One upload of nbytes that ran from start to end (time.perf_counter())"""
+        with self._lock:
+            self.uploads += 1
+            self.failed += 0 if ok else 1
+            self.bytes += nbytes if ok else 0
+            self.latencies.append(end - start)
+            self.first_start = start if self.first_start is None else min(self.first_start, start)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    def stats(self):
+        """{'uploads', 'failed', 'bytes', 'mean_ms', 'p95_ms', 'mb_per_s'}, throughput over the wall time spent uploading"""
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            elapsed = (self.last_end - self.first_start) if self.uploads else 0.0
+            return {
+                'uploads': self.uploads,
+                'failed': self.failed,
+                'bytes': self.bytes,
+                'mean_ms': float(latencies.mean()) if latencies.size else 0.0,
+                'p95_ms': float(np.percentile(latencies, 95)) if latencies.size else 0.0,
+                'mb_per_s': self.bytes / MB / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"{stats['uploads']} uploads ({stats['failed']} failed), {stats['bytes'] / MB:.1f} MB, "
+                f"latency mean {stats['mean_ms']:.0f} ms / p95 {stats['p95_ms']:.0f} ms, {stats['mb_per_s']:.1f} MB/s")
+
+
+class StorageBackend:
+    """Where violation evidence is stored.
+
+    Subclasses implement _put_bytes, _put_file, get_object and list_keys; the save_*
+    methods, the concurrent uploads and the upload statistics are shared. Buckets are
+    the logical buckets of the evidence (proofs, retraining data, models).
+    """
+    buckets = {
+        'proofs': 'proofs',
+        'retraining': 'retraining-data',
+        'models': 'models'
+    }
+
+    def _setup_transfers(self, upload_threads=8):
+        if getattr(self, 'executor', None) is not None:
+            self.executor.shutdown(wait=False)
+        self.executor = ThreadPoolExecutor(max_workers=upload_threads, thread_name_prefix="storage-upload")
+        self.upload_meter = UploadMeter()
+
+    def _put_bytes(self, data, bucket_name, object_name, content_type):
+        raise NotImplementedError
+
+    def _put_file(self, file_path, bucket_name, object_name, content_type):
+        raise NotImplementedError
+
+    def get_object(self, bucket_name, object_name):
+        """Content of a stored object as bytes"""
+        raise NotImplementedError
+
+    def open_object(self, bucket_name, object_name):
+        """Readable file object streaming a stored object, closed by the caller"""
+        return BytesIO(self.get_object(bucket_name, object_name))
+
+    def list_keys(self, bucket_name, prefix=""):
+        """Sorted keys of the objects of a bucket starting with prefix"""
+        raise NotImplementedError
 
-    def upload_file(self, file_path, bucket_name, object_name=None):
+    def flush(self):
+        """Make the stored objects durable, for backends that batch it"""
+
+    def upload_file(self, file_path, bucket_name, object_name=None, content_type=None):
         if object_name is None:
             object_name = os.path.basename(file_path)
+        start = time.perf_counter()
+        nbytes = 0
         try:
-            self.s3.upload_file(file_path, bucket_name, object_name)
+            nbytes = os.path.getsize(file_path)
+            self._put_file(file_path, bucket_name, object_name, content_type)
+            self.upload_meter.record(nbytes, start, time.perf_counter())
             print(f"\nFile {file_path} uploaded to {bucket_name}/{object_name}")
             return True
         except FileNotFoundError:
             print("\nThe file was not found")
-            return False
         except NoCredentialsError:
             print("\nCredentials not available")
+        except Exception as e:
+            print(f"\nError uploading {object_name}: {e}")
+        self.upload_meter.record(nbytes, start, time.perf_counter(), ok=False)
+        return False
+
+    def upload_bytes(self, data, bucket_name, object_name, content_type='application/octet-stream'):
+        """
+        Upload already encoded bytes (e.g. from utils.evidence.encode_evidence)
+        """
+        start = time.perf_counter()
+        try:
+            self._put_bytes(data, bucket_name, object_name, content_type)
+            self.upload_meter.record(len(data), start, time.perf_counter())
+            return True
+        except Exception as e:
+            print(f"\nError uploading {object_name}: {e}")
+            self.upload_meter.record(len(data), start, time.perf_counter(), ok=False)
             return False
 
+    def submit_upload(self, upload):
+        """Start an upload on the backend's thread pool
+
+        Args:
+            upload (dict): {'bucket', 'key', 'body' or 'path', 'content_type'} as made by
+                utils.evidence.encode_evidence, 'bucket' a key of self.buckets or a bucket name.
+
+        Returns:
+            Future: of the upload's success (bool)
+        """
+        bucket = self.buckets.get(upload['bucket'], upload['bucket'])
+        if 'path' in upload:
+            return self.executor.submit(self.upload_file, upload['path'], bucket, upload['key'], upload.get('content_type'))
+        return self.executor.submit(self.upload_bytes, upload['body'], bucket, upload['key'],
+                                    upload.get('content_type', 'application/octet-stream'))
+
+    def upload_many(self, uploads):
+        """Upload concurrently and wait for all of them
+
+        Returns:
+            list: success (bool) of each upload, in order
+        """
+        futures = [self.submit_upload(upload) for upload in uploads]
+        return [future.result() for future in futures]
+
     def upload_image_from_memory(self, image_np, bucket_name, object_name):
         """
-        Upload a numpy image (OpenCV format) directly to MinIO
+        Upload a numpy image (OpenCV format) directly to storage
         """
         try:
             # Encode image to jpg
@@ -65,8 +174,8 @@ class MinioClient:
                 print("\nFailed to encode image")
                 return False
             
-            io_buf = BytesIO(buffer)
-            self.s3.upload_fileobj(io_buf, bucket_name, object_name, ExtraArgs={'ContentType': 'image/jpeg'})
+            if not self.upload_bytes(buffer.tobytes(), bucket_name, object_name, 'image/jpeg'):
+                return False
             print(f"\nImage uploaded to {bucket_name}/{object_name}")
             return True
         except Exception as e:
@@ -75,7 +184,7 @@ class MinioClient:
 
     def save_proof(self, frame, vehicle_id, violation_type):
         """
-        Save violation proof to MinIO
+        Save violation proof to storage
         """
         time_now = datetime.now()
         date_folder = time_now.strftime("%Y_%m")
@@ -95,29 +204,13 @@ class MinioClient:
         if self.upload_image_from_memory(frame, self.buckets['retraining'], filename):
             # Create and upload label (dummy example for YOLO format)
             # class x_center y_center width height
-            h, w, _ = frame.shape
-            x1, y1, x2, y2 = bbox
-            
-            # Normalize coordinates
-            xc = ((x1 + x2) / 2) / w
-            yc = ((y1 + y2) / 2) / h
-            bw = (x2 - x1) / w
-            bh = (y2 - y1) / h
-            
-            label_content = f"0 {xc:.6f} {yc:.6f} {bw:.6f} {bh:.6f}"
+            label_content = yolo_label(bbox, frame.shape)
             label_filename = filename.replace(".jpg", ".txt")
             
-            try:
-                self.s3.put_object(
-                    Bucket=self.buckets['retraining'],
-                    Key=label_filename,
-                    Body=label_content
-                )
-                print(f"\nLabel uploaded to {self.buckets['retraining']}/{label_filename}")
-                return True
-            except Exception as e:
-                print(f"\nError uploading label: {e}")
+            if not self.upload_bytes(label_content.encode(), self.buckets['retraining'], label_filename, 'text/plain'):
                 return False
+            print(f"\nLabel uploaded to {self.buckets['retraining']}/{label_filename}")
+            return True
         return False
 
     def save_labeled_proof(self, frame, vehicle_id, violation_type, bbox):
@@ -130,14 +223,31 @@ class MinioClient:
         filename = f"{date_folder}/{violation_type}_{vehicle_id}_{timestamp}_labeled.jpg"
         
         # Draw bbox
-        labeled_frame = frame.copy()
-        x1, y1, x2, y2 = map(int, bbox)
-        cv2.rectangle(labeled_frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-        cv2.putText(labeled_frame, f"ID: {vehicle_id} {violation_type}", (x1, y1 - 10), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+        labeled_frame = draw_violation_box(frame.copy(), bbox, vehicle_id, violation_type)
         
         return self.upload_image_from_memory(labeled_frame, self.buckets['proofs'], filename)
 
+    def save_segment_proof(self, clip, vehicle_id, violation_type, bboxes):
+        """
+        Save a video proof recorded by the SegmentRecorder: the segments are joined
+        without re-encoding and the vehicle boxes go to a JSON sidecar.
+        """
+        names = evidence_names(vehicle_id, vehicle_id, violation_type)
+        uploads = []
+        try:
+            uploads = segment_evidence(clip, names, vehicle_id, violation_type, bboxes)
+            if not uploads:
+                print("\nNo recorded segment covers the violation")
+                return False
+            return all(self.upload_many(uploads))
+        except Exception as e:
+            print(f"\nError uploading segment proof: {e}")
+            return False
+        finally:
+            for upload in uploads:
+                if 'path' in upload and os.path.exists(upload['path']):
+                    os.remove(upload['path'])
+
     def save_video_proof(self, frames, vehicle_id, violation_type, bboxes, fps=30):
         """
         Save a video clip as proof.
@@ -145,9 +255,6 @@ class MinioClient:
         if not frames:
             return False
         
-        if bboxes:
-            bbox_map = {i: bbox for i, bbox in bboxes}
-        
         time_now = datetime.now()
         date_folder = time_now.strftime("%Y_%m")
         timestamp = time_now.strftime("%Y%m%d_%H%M%S")
@@ -159,32 +266,7 @@ class MinioClient:
             temp_path = tmp_file.name
             
         try:
-            h, w, _ = frames[0][1].shape
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(temp_path, fourcc, fps, (w, h))
-            
-            for frame_counter, frame in frames:
-                draw_frame = frame.copy()
-                if bboxes:
-                    if frame_counter in bbox_map:
-                        bbox = bbox_map[frame_counter]
-                        x1, y1, x2, y2 = map(int, bbox)
-                        cv2.rectangle(draw_frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                        cv2.putText(draw_frame, f"ID: {vehicle_id} {violation_type}", (x1, y1 - 10), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
-                    else:
-                        # No bbox for this frame, draw using last known bbox
-                        previous = [k for k in bbox_map.keys() if k <= frame_counter]
-                        bbox = None
-                        if len(previous) > 0:
-                            bbox = bbox_map.get(max(previous), None)
-                        if bbox:
-                            x1, y1, x2, y2 = map(int, bbox)
-                            cv2.rectangle(draw_frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                            cv2.putText(draw_frame, f"ID: {vehicle_id} {violation_type}", (x1, y1 - 10), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
-                out.write(draw_frame)
-            out.release()
+            write_video_proof(frames, temp_path, vehicle_id, violation_type, bboxes, fps)
             
             # Upload
             success = self.upload_file(temp_path, self.buckets['proofs'], filename)
@@ -195,3 +277,268 @@ class MinioClient:
         finally:
             if os.path.exists(temp_path):
                 os.remove(temp_path)
+
+
+class MinioClient(StorageBackend):
+    """S3 / MinIO storage through one shared boto3 client"""
+    _instance = None
+    # The client is created on a loader thread while other threads may ask for it
+    _lock = threading.Lock()
+    # storage section of config.yaml, see configure()
+    _settings = {}
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                instance = super(MinioClient, cls).__new__(cls)
+                instance._initialize()
+                cls._instance = instance
+        return cls._instance
+
+    @classmethod
+    def configure(cls, storage_config):
+        """Set the connection pool, multipart and upload thread settings (storage section of config.yaml)
+
+        Call before the first MinioClient(); an existing client is rebuilt with the new settings.
+        """
+        with cls._lock:
+            cls._settings = dict(storage_config or {})
+            instance = cls._instance
+        if instance is not None:
+            instance._initialize()
+
+    @classmethod
+    def from_s3_client(cls, s3, buckets=None):
+        """Client around an existing boto3 S3 client (e.g. a moto or local MinIO one), not the shared instance"""
+        instance = super(MinioClient, cls).__new__(cls)
+        instance.s3 = s3
+        instance.buckets = buckets or dict(StorageBackend.buckets)
+        instance._setup_transfers()
+        return instance
+
+    def _initialize(self):
+        load_dotenv()
+        self.endpoint_url = "http://localhost:9000"
+        self.access_key = "minioadmin"
+        self.secret_key = "minioadmin"
+        
+        # Try to load from env if available
+        # In a real app, use python-dotenv or os.environ
+        self.endpoint_url = os.environ.get("MINIO_ENDPOINT", "http://localhost:9000")
+        self.access_key = os.environ.get("MINIO_ACCESS_KEY", "minioadmin")
+        self.secret_key = os.environ.get("MINIO_SECRET_KEY", "minioadmin")
+
+        settings = self._settings
+        upload_threads = settings.get('upload_threads', 8)
+        max_concurrency = settings.get('max_concurrency', 4)
+        # Every upload thread may run a multipart transfer with max_concurrency parts in flight
+        pool_size = settings.get('max_pool_connections') or max(10, upload_threads * max_concurrency)
+        self.s3 = boto3.client(
+            's3',
+            endpoint_url=self.endpoint_url,
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            config=Config(max_pool_connections=pool_size,
+                          retries={'max_attempts': settings.get('max_attempts', 3), 'mode': 'standard'})
+        )
+        self.buckets = dict(StorageBackend.buckets)
+        self._setup_transfers()
+
+    def _setup_transfers(self):
+        settings = self._settings
+        self.multipart_threshold = int(settings.get('multipart_threshold_mb', 8) * MB)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=int(settings.get('multipart_chunksize_mb', 8) * MB),
+            max_concurrency=settings.get('max_concurrency', 4)
+        )
+        super()._setup_transfers(settings.get('upload_threads', 8))
+
+    def _put_bytes(self, data, bucket_name, object_name, content_type):
+        if len(data) < self.multipart_threshold:
+            self.s3.put_object(Bucket=bucket_name, Key=object_name, Body=data, ContentType=content_type)
+        else:
+            self.s3.upload_fileobj(BytesIO(data), bucket_name, object_name,
+                                   ExtraArgs={'ContentType': content_type}, Config=self.transfer_config)
+
+    def _put_file(self, file_path, bucket_name, object_name, content_type):
+        # Files above the multipart threshold are sent in parallel parts
+        extra_args = {'ContentType': content_type} if content_type else None
+        self.s3.upload_file(file_path, bucket_name, object_name, ExtraArgs=extra_args, Config=self.transfer_config)
+
+    def get_object(self, bucket_name, object_name):
+        return self.s3.get_object(Bucket=bucket_name, Key=object_name)['Body'].read()
+
+    def open_object(self, bucket_name, object_name):
+        return self.s3.get_object(Bucket=bucket_name, Key=object_name)['Body']
+
+    def list_keys(self, bucket_name, prefix=""):
+        keys = []
+        for page in self.s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, Prefix=prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return sorted(keys)
+
+
+class LocalStorage(StorageBackend):
+    """Evidence written to a local directory, one sub-directory per bucket.
+
+    Objects are written to a temporary file and renamed into place, so a reader never
+    sees a partial object. fsync is batched: every fsync_batch objects the written
+    files and their directories are synced together, instead of one fsync per object.
+    """
+    def __init__(self, root, fsync_batch=32, upload_threads=8):
+        """
+        Args:
+            root (str): Storage directory.
+            fsync_batch (int, optional): Objects written between fsyncs, 1 syncs every object,
+                0 leaves it to the OS. Defaults to 32.
+            upload_threads (int, optional): Threads of upload_many. Defaults to 8.
+        """
+        self.root = root
+        self.fsync_batch = fsync_batch
+        self.buckets = dict(StorageBackend.buckets)
+        self.syncs = 0
+        self._pending = []
+        self._sync_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._setup_transfers(upload_threads)
+
+    def _path(self, bucket_name, object_name):
+        bucket_dir = os.path.abspath(os.path.join(self.root, bucket_name))
+        path = os.path.abspath(os.path.join(bucket_dir, object_name))
+        if not path.startswith(bucket_dir + os.sep):
+            raise ValueError(f"Object name escapes the bucket: {object_name}")
+        return path
+
+    def _write(self, bucket_name, object_name, write):
+        path = self._path(bucket_name, object_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if self.fsync_batch:
+            with self._sync_lock:
+                self._pending.append(path)
+                full = len(self._pending) >= self.fsync_batch
+            if full:
+                self.flush()
+
+    def _put_bytes(self, data, bucket_name, object_name, content_type):
+        self._write(bucket_name, object_name, lambda f: f.write(data))
+
+    def _put_file(self, file_path, bucket_name, object_name, content_type):
+        def copy(f):
+            with open(file_path, 'rb') as src:
+                shutil.copyfileobj(src, f, length=MB)
+        self._write(bucket_name, object_name, copy)
+
+    def flush(self):
+        """fsync the objects written since the last sync, then their directories"""
+        with self._sync_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        for path in pending + sorted({os.path.dirname(path) for path in pending}):
+            # Directories last: the renames are durable once they are synced
+            if os.path.exists(path):
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self.syncs += 1
+
+    def get_object(self, bucket_name, object_name):
+        with open(self._path(bucket_name, object_name), 'rb') as f:
+            return f.read()
+
+    def open_object(self, bucket_name, object_name):
+        return open(self._path(bucket_name, object_name), 'rb')
+
+    def list_keys(self, bucket_name, prefix=""):
+        bucket_dir = os.path.join(self.root, bucket_name)
+        keys = []
+        for directory, _, files in os.walk(bucket_dir):
+            for name in files:
+                if name.startswith(".tmp_"):
+                    continue
+                key = os.path.relpath(os.path.join(directory, name), bucket_dir).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+
+class MemoryStorage(StorageBackend):
+    """Evidence kept in a dict, for tests and for measuring the pipeline without storage cost"""
+    def __init__(self, upload_threads=8):
+        self.buckets = dict(StorageBackend.buckets)
+        self.objects = {}
+        self._lock = threading.Lock()
+        self._setup_transfers(upload_threads)
+
+    def _put_bytes(self, data, bucket_name, object_name, content_type):
+        with self._lock:
+            self.objects[(bucket_name, object_name)] = bytes(data)
+
+    def _put_file(self, file_path, bucket_name, object_name, content_type):
+        with open(file_path, 'rb') as f:
+            self._put_bytes(f.read(), bucket_name, object_name, content_type)
+
+    def get_object(self, bucket_name, object_name):
+        with self._lock:
+            return self.objects[(bucket_name, object_name)]
+
+    def list_keys(self, bucket_name, prefix=""):
+        with self._lock:
+            return sorted(key for bucket, key in self.objects if bucket == bucket_name and key.startswith(prefix))
+
+
+BACKENDS = {'minio': MinioClient, 'local': LocalStorage, 'memory': MemoryStorage}
+# storage section of config.yaml, and the local and memory backends created from it
+_storage_settings = {}
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def configure_storage(storage_config):
+    """Select and tune the storage backend (storage section of config.yaml), call before get_storage()"""
+    global _storage_settings
+    with _storages_lock:
+        _storage_settings = dict(storage_config or {})
+        _storages.clear()
+    MinioClient.configure(storage_config)
+
+
+def get_storage(backend=None):
+    """The shared storage backend
+
+    Args:
+        backend (str, optional): 'minio', 'local' or 'memory'. Defaults to storage.backend of the
+            configuration given to configure_storage(), 'minio' if none.
+
+    Returns:
+        StorageBackend
+    """
+    settings = _storage_settings
+    backend = backend or settings.get('backend', 'minio')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}. Choose from {tuple(BACKENDS)}")
+    if backend == 'minio':
+        return MinioClient()
+    with _storages_lock:
+        if backend not in _storages:
+            upload_threads = settings.get('upload_threads', 8)
+            if backend == 'local':
+                local = settings.get('local', {})
+                _storages[backend] = LocalStorage(local.get('dir', 'output/storage'),
+                                                  fsync_batch=local.get('fsync_batch', 32),
+                                                  upload_threads=upload_threads)
+            else:
+                _storages[backend] = MemoryStorage(upload_threads=upload_threads)
+        return _storages[backend]
@@ -0,0 +1,246 @@
+"""
+Violation save queue bounded by items and bytes.
+
+A queued violation holds its full frame, the proof crop and the proof clip, which
+is up to a few hundred frames when the clip lives in process memory. With an
+unbounded queue.Queue a saver that falls behind lets these pile up until the
+process runs out of memory. ViolationQueue keeps a running total of the bytes
+it holds. When a violation would go over max_bytes or max_items, one of these
+policies applies:
+
+- ``block``: put waits for the saver to take items off the queue.
+- ``drop_oldest``: the oldest queued violations are dropped, and their clips released.
+- ``degrade``: the clip of the new violation is thinned (half the frames at half the
+  fps) down to min_fps, then cut to its last frames, before put blocks.
+- ``spill``: the violation is pickled to spill_dir and read back by get.
+
+Clips leased from the shared frame ring or recorded to segments are not counted,
+since their memory is bounded by the ring and the recorder.
+"""
+
+import os
+import time
+import queue
+import pickle
+import tempfile
+from concurrent.futures import Future
+
+import numpy as np
+
+from utils.proof_buffer import EncodedClip
+
+POLICIES = ('block', 'drop_oldest', 'degrade', 'spill')
+
+
+class SpilledItem:
+    """Queue placeholder of a violation pickled to disk"""
+    def __init__(self, path, nbytes):
+        self.path = path
+        self.nbytes = nbytes
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            item = pickle.load(f)
+        os.remove(self.path)
+        return item
+
+
+def _clip_nbytes(clip, frame_nbytes):
+    if isinstance(clip, EncodedClip):
+        # A frame still being encoded is counted at its raw size
+        return sum(frame_nbytes if isinstance(data, Future) else data.nbytes for _, data in clip.entries)
+    if isinstance(clip, list):
+        return sum(frame.nbytes for _, frame in clip)
+    return 0
+
+
+def item_nbytes(item):
+    """Bytes of process memory a queued violation keeps alive"""
+    if isinstance(item, SpilledItem) or not isinstance(item, dict):
+        return 0
+    total = 0
+    frame_nbytes = 0
+    for name in ('frame', 'proof_crop'):
+        if isinstance(item.get(name), np.ndarray):
+            total += item[name].nbytes
+    if isinstance(item.get('frame'), np.ndarray):
+        frame_nbytes = item['frame'].nbytes
+    return total + _clip_nbytes(item.get('frame_buffer'), frame_nbytes)
+
+
+def _release(item):
+    clip = item.get('frame_buffer') if isinstance(item, dict) else None
+    if hasattr(clip, 'release'):
+        clip.release()
+
+
+class ViolationQueue(queue.Queue):
+    """queue.Queue of violations bounded by count and bytes, with a policy for when it is full.
+
+    Drop-in for the queue.Queue given to violation_save_worker: put, get, task_done,
+    join and qsize behave the same, and the None stop signal is always accepted.
+
+    Example:
+        violation_queue = ViolationQueue(max_items=256, max_bytes=1 << 30, policy='drop_oldest')
+        violation_queue.put(violation_data)
+        violation_queue.stats()   # {'items', 'bytes', 'dropped', 'degraded', 'spilled', ...}
+    """
+    def __init__(self, max_items=0, max_bytes=None, policy='block', spill_dir='output/violation_spill', min_fps=5):
+        """
+        Args:
+            max_items (int, optional): Violations queued at most, 0 for no limit. Defaults to 0.
+            max_bytes (int, optional): Bytes of queued violations at most, see item_nbytes. Defaults to None (no limit).
+            policy (str, optional): 'block', 'drop_oldest', 'degrade' or 'spill'. Defaults to 'block'.
+            spill_dir (str, optional): Directory of spilled violations. Defaults to 'output/violation_spill'.
+            min_fps (int, optional): The degrade policy does not thin clips below this fps. Defaults to 5.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown violation queue policy '{policy}', expected one of {POLICIES}")
+        super().__init__(maxsize=max_items)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.min_fps = min_fps
+        self.bytes = 0
+        self.counters = {'put': 0, 'blocked': 0, 'blocked_s': 0.0, 'dropped': 0, 'dropped_bytes': 0,
+                         'degraded': 0, 'spilled': 0, 'max_bytes_seen': 0}
+
+    # Called by queue.Queue with self.mutex held
+    def _put(self, entry):
+        self.queue.append(entry)
+        self.bytes += entry[1]
+        self.counters['max_bytes_seen'] = max(self.counters['max_bytes_seen'], self.bytes)
+
+    def _get(self):
+        item, nbytes = self.queue.popleft()
+        self.bytes -= nbytes
+        return item
+
+    def _fits(self, nbytes):
+        # A violation larger than the whole budget still goes through an empty queue
+        items_ok = self.maxsize <= 0 or self._qsize() < self.maxsize
+        bytes_ok = self.max_bytes is None or not self.queue or self.bytes + nbytes <= self.max_bytes
+        return items_ok and bytes_ok
+
+    def put(self, item, block=True, timeout=None):
+        """Queue a violation, applying the policy when the queue is full
+
+        Raises:
+            queue.Full: if block is False or timeout expires while the 'block' policy
+                (or 'degrade' after thinning) waits for room.
+        """
+        nbytes = item_nbytes(item)
+        with self.mutex:
+            full = item is not None and not self._fits(nbytes)
+            if full and self.policy == 'drop_oldest':
+                self._drop_until_fits(nbytes)
+                full = False
+        if full and self.policy == 'degrade':
+            item, nbytes = self._degrade(item, nbytes)
+        elif full and self.policy == 'spill':
+            item, nbytes = self._spill(item, nbytes)
+
+        with self.not_full:
+            if item is not None and not self._fits(nbytes):
+                if not block:
+                    raise queue.Full
+                self.counters['blocked'] += 1
+                start = time.perf_counter()
+                ok = self.not_full.wait_for(lambda: self._fits(nbytes), timeout)
+                self.counters['blocked_s'] += time.perf_counter() - start
+                if not ok:
+                    raise queue.Full
+            self._put((item, nbytes))
+            self.unfinished_tasks += 1
+            if item is not None:
+                self.counters['put'] += 1
+            self.not_empty.notify()
+
+    def get(self, block=True, timeout=None):
+        item = super().get(block, timeout)
+        if isinstance(item, SpilledItem):
+            item = item.load()
+        return item
+
+    def _drop_until_fits(self, nbytes):
+        while self.queue and not self._fits(nbytes):
+            item, dropped_bytes = self.queue[0]
+            if item is None:
+                break
+            self._get()
+            _release(item)
+            if isinstance(item, SpilledItem) and os.path.exists(item.path):
+                os.remove(item.path)
+            self.counters['dropped'] += 1
+            self.counters['dropped_bytes'] += dropped_bytes
+            # A dropped violation is never handed to the saver, count it as done for join()
+            self.unfinished_tasks -= 1
+            if self.unfinished_tasks == 0:
+                self.all_tasks_done.notify_all()
+
+    def _room(self):
+        with self.mutex:
+            return None if self.max_bytes is None else self.max_bytes - self.bytes
+
+    def _degrade(self, item, nbytes):
+        clip = item.get('frame_buffer')
+        room = self._room()
+        if room is None or nbytes <= room or not isinstance(clip, (EncodedClip, list)) or len(clip) < 2:
+            # Full on max_items, or nothing to thin: put blocks
+            return item, nbytes
+        entries = list(clip.entries if isinstance(clip, EncodedClip) else clip)
+        fps = item.get('fps', 30)
+        degraded = dict(item)
+        while True:
+            degraded['frame_buffer'] = EncodedClip(entries) if isinstance(clip, EncodedClip) else entries
+            degraded['fps'] = fps
+            nbytes = item_nbytes(degraded)
+            if nbytes <= room or len(entries) < 2:
+                break
+            if fps // 2 >= self.min_fps:
+                # Every other frame at half the fps, the clip keeps its duration
+                entries = entries[1::2]
+                fps //= 2
+            else:
+                # The frames right before the violation matter most
+                entries = entries[len(entries) // 2:]
+        with self.mutex:
+            self.counters['degraded'] += 1
+        return degraded, nbytes
+
+    def _spill(self, item, nbytes):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        clip = item.get('frame_buffer')
+        if isinstance(clip, EncodedClip):
+            item = dict(item, frame_buffer=clip.resolved())
+        fd, path = tempfile.mkstemp(suffix='.pkl', prefix='violation_', dir=self.spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.mutex:
+            self.counters['spilled'] += 1
+        return SpilledItem(path, nbytes), 0
+
+    def stats(self):
+        """{'items', 'bytes', 'max_items', 'max_bytes', 'policy'} and the policy counters"""
+        with self.mutex:
+            return dict(self.counters, items=self._qsize(), bytes=self.bytes, max_items=self.maxsize,
+                        max_bytes=self.max_bytes, policy=self.policy)
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"{stats['items']} queued ({stats['bytes'] / 1e6:.1f} MB, peak {stats['max_bytes_seen'] / 1e6:.1f} MB), "
+                f"policy {stats['policy']}: {stats['blocked']} blocked ({stats['blocked_s']:.1f} s), "
+                f"{stats['dropped']} dropped, {stats['degraded']} degraded, {stats['spilled']} spilled")
+
+    @classmethod
+    def from_config(cls, queue_config):
+        """Queue configured by the violation.queue section of config.yaml"""
+        queue_config = queue_config or {}
+        max_mb = queue_config.get('max_mb')
+        return cls(
+            max_items=queue_config.get('max_items', 0),
+            max_bytes=int(max_mb * 1e6) if max_mb else None,
+            policy=queue_config.get('policy', 'block'),
+            spill_dir=queue_config.get('spill_dir', 'output/violation_spill'),
+            min_fps=queue_config.get('min_fps', 5)
+        )
@@ -5,21 +5,238 @@ This module contains worker functions that run in background threads
 for async processing of tasks like saving violations.
 """
 
+import os
+import time
 import queue
-from utils import MinioClient, get_logger, log_violation, log_upload
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+import numpy as np
 
-def violation_save_worker(save_queue: queue.Queue) -> None:
+from utils import get_storage, get_logger, log_violation, log_upload
+from utils.evidence import encode_evidence, evidence_names, segment_evidence, attach_rings
+from utils.spool import EvidenceSpool
+from utils.shards import ShardWriter
+from utils.frame_ring import RingClip, get_ring
+from utils.proof_buffer import EncodedClip
+from utils.segment_recorder import SegmentClip
+
+
+class EvidenceSaver:
+    """Save violations with encoding in worker processes and uploads on I/O threads.
+
+    Each violation is encoded by utils.evidence.encode_evidence in a process pool (JPEG
+    and MP4 encoding do not scale on threads of one interpreter) and its files are
+    uploaded from a thread pool. Per-violation timings are kept in metrics.
+
+    Example:
+        saver = EvidenceSaver(get_storage(), processes=2, upload_threads=4)
+        saver.submit(violation_data, on_done=save_queue.task_done)
+        saver.close()
+        print(saver.format_stats())
+    """
+    def __init__(self, client, processes=2, upload_threads=4, max_in_flight=None, logger=None, spool=None,
+                 shards=None):
+        """
+        Args:
+            client (StorageBackend): Storage, shared by the upload threads.
+            processes (int, optional): Encoder processes, 0 encodes on the upload threads. Defaults to 2.
+            upload_threads (int, optional): Upload threads. Defaults to 4.
+            max_in_flight (int, optional): Violations being saved at once before submit blocks,
+                the rest wait on the violation queue. Defaults to 2 * processes + upload_threads.
+            logger (logging.Logger, optional): Defaults to the violation_worker logger.
+            spool (EvidenceSpool, optional): Write the evidence to this disk spool, which uploads it
+                in the background, instead of uploading directly. Defaults to None.
+            shards (ShardWriter, optional): Pack the retraining image and label into tar shards
+                instead of uploading them as two objects. Defaults to None.
+        """
+        self.client = client
+        self.spool = spool
+        self.shards = shards
+        self.processes = processes
+        self.max_in_flight = max_in_flight or 2 * max(1, processes) + upload_threads
+        self.logger = logger or get_logger("violation_worker", file_logging=True)
+        self.upload_pool = ThreadPoolExecutor(max_workers=upload_threads, thread_name_prefix="evidence-upload")
+        # Created on the first violation, so it can attach to the shared frame ring in use
+        self.encode_pool = None
+        self._ring_name = None
+        self.metrics = []
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    def _encoder(self, clip):
+        """Process pool able to read the clip, restarted when the clips come from a new frame ring"""
+        ring_name = clip.ring_name if isinstance(clip, RingClip) and clip.indices else self._ring_name
+        if self.encode_pool is None or ring_name != self._ring_name:
+            if self.encode_pool is not None:
+                self.encode_pool.shutdown(wait=False)
+            specs = [get_ring(ring_name).spec()] if ring_name else []
+            # The default context, the ring lock cannot be shared with spawned processes
+            self.encode_pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=mp.get_context(),
+                                                   initializer=attach_rings, initargs=(specs,))
+            self._ring_name = ring_name
+        return self.encode_pool
+
+    def submit(self, data, on_done=None):
+        """Start saving one violation, blocks while max_in_flight violations are being saved
+
+        Args:
+            data (dict): violation queue item, see violation_save_worker.
+            on_done (callable, optional): called once the violation is saved or failed.
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: self._in_flight < self.max_in_flight)
+            self._in_flight += 1
+
+        record = {'identifier': data['identifier'], 'violation_type': data['violation_type'],
+                  'start': time.perf_counter(),
+                  'wait_s': time.time() - data['queued_at'] if data.get('queued_at') else 0.0}
+        clip = data.get('frame_buffer')
+        try:
+            job = dict(data, names=evidence_names(data['identifier'], data['vehicle_id'], data['violation_type']))
+            if isinstance(clip, SegmentClip):
+                # Recorded segments are joined as they are on the upload thread, nothing to encode
+                job['frame_buffer'] = None
+            elif isinstance(clip, EncodedClip):
+                job['frame_buffer'] = clip.resolved()
+            elif isinstance(clip, RingClip) and self.processes > 0:
+                # The job is pickled later on the pool's feeder thread, it gets its own
+                # reference so marking the original released below does not reach the process
+                job['frame_buffer'] = RingClip(clip.ring_name, clip.indices)
+
+            if self.processes > 0:
+                future = self._encoder(clip).submit(encode_evidence, job)
+                if isinstance(clip, RingClip):
+                    # The encoder process reads and releases the leased frames
+                    clip.released = True
+                future.add_done_callback(
+                    lambda f: self.upload_pool.submit(self._upload, f.result, job, clip, record, on_done))
+            else:
+                self.upload_pool.submit(self._upload, lambda: encode_evidence(job), job, clip, record, on_done)
+        except Exception as e:
+            self.logger.error(f"Error saving violation: {e}")
+            self._finish(clip, record, on_done, ok=False)
+
+    def _upload(self, encoded, job, clip, record, on_done):
+        identifier = job['identifier']
+        violation_type = job['violation_type']
+        uploads = []
+        ok = False
+        try:
+            result = encoded()
+            uploads = list(result['uploads'])
+            record['encode_s'] = result['encode_s']
+            upload_start = time.perf_counter()
+            if isinstance(clip, SegmentClip):
+                segment_uploads = segment_evidence(clip, job['names'], identifier, violation_type, job['bboxes'])
+                if not segment_uploads:
+                    self.logger.warning(f"No recorded segment covers violation ID: {identifier}")
+                uploads += segment_uploads
+            if self.shards is not None:
+                uploads = self._add_to_shards(uploads)
+
+            if self.spool is not None:
+                # Stored on disk, the spool uploads it when storage is reachable
+                results = self.spool.put_many(uploads)
+                for upload, success in zip(uploads, results):
+                    if not success:
+                        self.logger.error(f"Evidence spool full, dropped {upload['key']}")
+            else:
+                # The files of the violation go up concurrently on the client's upload pool
+                results = self.client.upload_many(uploads)
+                for upload, success in zip(uploads, results):
+                    log_upload(self.logger, self.client.buckets.get(upload['bucket'], upload['bucket']), upload['key'], success)
+            ok = all(results)
+            record['upload_s'] = time.perf_counter() - upload_start
+        except Exception as e:
+            self.logger.error(f"Error saving violation: {e}")
+        finally:
+            # Temporary files that were not moved into the spool
+            for upload in uploads:
+                if 'path' in upload and os.path.exists(upload['path']):
+                    os.remove(upload['path'])
+            self._finish(clip, record, on_done, ok)
+
+    def _add_to_shards(self, uploads):
+        """Add the retraining files to the shard writer, returns the other uploads"""
+        samples = {}
+        rest = []
+        for upload in uploads:
+            if upload['bucket'] != 'retraining':
+                rest.append(upload)
+                continue
+            key, _, ext = upload['key'].rpartition('.')
+            samples.setdefault(key, {})[ext] = upload['body']
+        for key, files in samples.items():
+            self.shards.add(key, files)
+        return rest
+
+    def _finish(self, clip, record, on_done, ok):
+        # Frames leased from the shared frame ring or the segment recorder can be reused
+        if hasattr(clip, 'release'):
+            clip.release()
+        record['total_s'] = time.perf_counter() - record.pop('start')
+        record['ok'] = ok
+        self.metrics.append(record)
+        if ok:
+            self.logger.info(
+                f"Saved all proofs for violation ID: {record['identifier']} "
+                f"(encode {record.get('encode_s', 0) * 1000:.0f} ms, upload {record.get('upload_s', 0) * 1000:.0f} ms, "
+                f"total {record['total_s'] * 1000:.0f} ms, queued {record['wait_s'] * 1000:.0f} ms)")
+        try:
+            if on_done is not None:
+                on_done()
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify_all()
+
+    def stats(self):
+        """{'violations', 'failed', and mean/p95/max ms of 'wait', 'encode', 'upload', 'total'}"""
+        records = list(self.metrics)
+        stats = {'violations': len(records), 'failed': sum(1 for r in records if not r['ok'])}
+        for name in ('wait', 'encode', 'upload', 'total'):
+            values = np.array([r[f'{name}_s'] for r in records if f'{name}_s' in r]) * 1000
+            stats[name] = {
+                'mean_ms': float(values.mean()) if values.size else 0.0,
+                'p95_ms': float(np.percentile(values, 95)) if values.size else 0.0,
+                'max_ms': float(values.max()) if values.size else 0.0,
+            }
+        return stats
+
+    def format_stats(self):
+        stats = self.stats()
+        parts = ", ".join(f"{name} {stats[name]['mean_ms']:.0f}/{stats[name]['p95_ms']:.0f} ms"
+                          for name in ('wait', 'encode', 'upload', 'total'))
+        return f"Saved {stats['violations']} violations ({stats['failed']} failed), mean/p95: {parts}"
+
+    def close(self):
+        """Wait for the violations in flight and stop the pools"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._in_flight == 0)
+        if self.encode_pool is not None:
+            self.encode_pool.shutdown(wait=True)
+        self.upload_pool.shutdown(wait=True)
+        if self.shards is not None:
+            # The last, partial shard
+            self.shards.close()
+
+
+def violation_save_worker(save_queue: queue.Queue, saver_config: dict = None) -> None:
     """
     Background worker for saving violation data to storage.
 
-    This worker runs in a separate thread and processes violation data
-    from the queue, uploading proofs, retraining data, and video clips
-    to MinIO storage.
+    This worker runs in a separate thread and hands violation data from the
+    queue to an EvidenceSaver, which encodes the proofs, retraining data and
+    video clips in worker processes and uploads them to the storage backend from
+    I/O threads. Queue items are marked done once their evidence is saved.
 
     Args:
         save_queue: Queue containing violation data dictionaries.
                     Send None to stop the worker.
+        saver_config: violation.saver section of config.yaml
+                      ({'processes': int, 'upload_threads': int, 'spool': {...}, 'shards': {...}}).
 
     Expected queue item format:
         {
@@ -29,61 +246,49 @@ def violation_save_worker(save_queue: queue.Queue) -> None:
             'frame': np.ndarray,
             'bbox': tuple,
             'bboxes': list,
-            'frame_buffer': list,
+            'frame_buffer': EncodedClip, RingClip or SegmentClip,
             'fps': int,
-            'proof_crop': np.ndarray
+            'proof_crop': np.ndarray,
+            'queued_at': float  # optional, time.time() of the violation
         }
     """
     logger = get_logger("violation_worker", file_logging=True)
-    
+    saver_config = saver_config or {}
+
     try:
-        client = MinioClient()
+        client = get_storage()
     except Exception as e:
-        logger.error(f"Failed to initialize MinIO client: {e}")
+        logger.error(f"Failed to initialize storage backend: {e}")
         return
 
+    spool = EvidenceSpool.from_config(saver_config.get('spool'), client=client)
+    shards = ShardWriter.from_config(saver_config.get('shards'), client, spool=spool)
+    saver = EvidenceSaver(
+        client,
+        processes=saver_config.get('processes', 2),
+        upload_threads=saver_config.get('upload_threads', 4),
+        logger=logger,
+        spool=spool,
+        shards=shards
+    )
+
     while True:
         data = save_queue.get()
-        
+
         # None is the signal to stop the worker
         if data is None:
             logger.info("Received stop signal, shutting down worker")
             break
 
-        try:
-            vehicle_id = data['vehicle_id']
-            identifier = data['identifier']
-            violation_type = data['violation_type']
-            frame = data['frame']
-            bbox = data['bbox']
-            bboxes = data['bboxes']
-            frame_buffer = data['frame_buffer']
-            fps = data['fps']
-            proof_crop = data['proof_crop']
-
-            # Log the violation
-            log_violation(logger, vehicle_id, violation_type, identifier)
-
-            # Save proof crop
-            success = client.save_proof(proof_crop, identifier, violation_type)
-            log_upload(logger, "proofs", f"{violation_type}_{identifier}", success)
-            
-            # Save retraining data
-            success = client.save_retraining_data(frame, vehicle_id, bbox)
-            log_upload(logger, "retraining", f"train_{vehicle_id}", success)
-            
-            # Save labeled proof
-            success = client.save_labeled_proof(frame, identifier, violation_type, bbox)
-            log_upload(logger, "proofs", f"{violation_type}_{identifier}_labeled", success)
-            
-            # Save video proof if buffer available
-            if frame_buffer:
-                success = client.save_video_proof(frame_buffer, identifier, violation_type, bboxes, fps)
-                log_upload(logger, "proofs", f"{violation_type}_{identifier}.mp4", success)
-            
-            logger.info(f"Saved all proofs for violation ID: {identifier}")
-            
-        except Exception as e:
-            logger.error(f"Error saving violation: {e}")
-        finally:
-            save_queue.task_done()
+        log_violation(logger, data['vehicle_id'], data['violation_type'], data['identifier'])
+        saver.submit(data, on_done=save_queue.task_done)
+
+    saver.close()
+    logger.info(saver.format_stats())
+    if shards is not None:
+        stats = shards.stats()
+        logger.info(f"Retraining shards: {stats['shards']} shards, {stats['samples']} samples, {stats['bytes'] / 1e6:.1f} MB")
+    if spool is not None:
+        spool.close(drain_timeout=saver_config['spool'].get('drain_seconds', 10.0))
+        logger.info(f"Spool: {spool.format_stats()}")
+    logger.info(f"Uploads: {client.upload_meter.format_stats()}")